@@ -0,0 +1,107 @@
+"""
+Load benchmark of the sync and async database stacks.
+
+Boots the app in-process once per stack (ASYNC_DB_ENABLED=false / true), then fires
+`--requests` authenticated requests at one endpoint with `--concurrency` in flight and
+reports throughput and latency percentiles. Sync routes are bounded by Starlette's
+threadpool, async routes by the async connection pool.
+
+    python -m benchmarks.bench_db_stacks --db-url sqlite:///./bench.db --endpoint profile
+    python -m benchmarks.bench_db_stacks --db-url postgresql://... --concurrency 400
+
+The async stack needs its driver installed (asyncpg or aiosqlite).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENDPOINTS = {
+    "profile": ("GET", "/api/user/"),
+    "leaderboard": ("GET", "/api/leaderboard/"),
+    "new_game": ("GET", "/api/game/new_game/easy"),
+}
+
+
+async def run_stack(args):
+    import httpx
+    from src.main import app, ASYNC_DB_ENABLED
+
+    async with app.router.lifespan_context(app):
+        # Server errors (e.g. pool timeouts) are counted, not raised
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            headers = []
+            for i in range(args.users):
+                response = await client.post("/api/auth/register", json={
+                    "username": f"bench{i}-{os.getpid()}",
+                    "email": f"bench{i}-{os.getpid()}@example.com",
+                    "password": "benchmark-password"
+                })
+                headers.append({"Authorization": f"Bearer {response.json()['token']}"})
+
+            method, path = ENDPOINTS[args.endpoint]
+            in_flight = asyncio.Semaphore(args.concurrency)
+            latencies = []
+            errors = 0
+
+            async def one(i):
+                nonlocal errors
+                async with in_flight:
+                    start = time.perf_counter()
+                    response = await client.request(method, path, headers=headers[i % len(headers)])
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code >= 400:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+    stack = "async" if ASYNC_DB_ENABLED else "sync"
+    print(
+        f"{stack:>5}: {args.requests / elapsed:8.1f} req/s   "
+        f"p50 {p(0.50):7.1f} ms   p99 {p(0.99):7.1f} ms   "
+        f"mean {statistics.mean(latencies) * 1000:7.1f} ms   errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default="sqlite:///./bench.db")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="profile")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--stack", choices=["sync", "async"], help="run a single stack (used internally)")
+    args = parser.parse_args()
+
+    if args.stack:
+        asyncio.run(run_stack(args))
+        return
+
+    print(f"{args.requests} x {args.endpoint} at concurrency {args.concurrency} on {args.db_url}")
+    for stack in ("sync", "async"):
+        # Each stack runs in a fresh process, the routes are chosen when the app is imported
+        env = dict(
+            os.environ,
+            DB_URL=args.db_url,
+            ASYNC_DB_ENABLED="true" if stack == "async" else "false",
+            RATE_LIMIT_ENABLED="false",
+            PASSWORD_HASH_WORKERS="0",
+            BCRYPT_ROUNDS="4",
+            PUZZLES_TO_GENERATE_PER_JOB="2",
+        )
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_stacks", *sys.argv[1:], "--stack", stack],
+            env=env, check=True, stdout=sys.stdout
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Micro-benchmark of encoding the game history and leaderboard page responses.
+
+Compares the response_model path, where the controller builds Pydantic models and
+FastAPI validates and serializes them again against the route's response_model before
+JSONResponse encodes them, with the fast path, where the controller builds dicts in
+the schema's shape and FastJSONResponse encodes them directly. No database involved,
+only the shaping and encoding of `--items` history items and leaderboard entries.
+
+    python -m benchmarks.bench_json_responses --items 50 --rounds 300
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.API import responses
+from src.API.responses import FastJSONResponse
+from src.Schemas.game_schema import GameHistoryItem, PuzzleBase
+from src.Schemas.leaderboard_schema import LeaderboardEntry, LeaderboardPageData, LeaderboardPageResponse
+
+
+def history_rows(items: int) -> List[dict]:
+    now = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    return [
+        {
+            "id": uuid.uuid4(), "difficulty": "medium", "duration_seconds": 300 + i,
+            "completed_at": now - timedelta(hours=i),
+            "puzzle": {"id": uuid.uuid4(), "gameId": uuid.uuid4(), "difficulty": "medium", "board_string": "0" * 81, "solution_string": None},
+            "was_completed": True, "final_score": 900 - i, "errors_made": 1, "hints_used": 0, "is_challenge": False,
+            "challenger_id": None, "opponent_id": None, "challenger_username": None, "opponent_username": None,
+            "winner_id": None, "challenger_duration": None, "opponent_duration": None, "current_state": None,
+        }
+        for i in range(items)
+    ]
+
+
+def page_rows(items: int) -> List[dict]:
+    return [{"user_id": uuid.uuid4(), "username": f"player{i}", "total_score": 10000 - i, "rank": i + 1} for i in range(items)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--no-orjson", action="store_true", help="measure the pydantic-core fallback encoder")
+    args = parser.parse_args()
+    if args.no_orjson:
+        responses.orjson = None
+
+    history = history_rows(args.items)
+    entries = page_rows(args.items)
+    history_field = create_model_field(name="Response", type_=List[GameHistoryItem], mode="serialization")
+    page_field = create_model_field(name="Response", type_=LeaderboardPageResponse, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def response_model_path(field, content) -> bytes:
+        serialized = loop.run_until_complete(serialize_response(field=field, response_content=content, is_coroutine=False))
+        return JSONResponse(serialized).body
+
+    def history_models() -> bytes:
+        items = [GameHistoryItem(**{**row, "puzzle": PuzzleBase(**row["puzzle"])}) for row in history]
+        return response_model_path(history_field, items)
+
+    def history_fast() -> bytes:
+        return FastJSONResponse([{**row, "puzzle": {**row["puzzle"]}} for row in history]).body
+
+    def page_models() -> bytes:
+        data = LeaderboardPageData(difficulty="easy", timespan="weekly", page=1, page_size=args.items,
+                                   entries=[LeaderboardEntry(**row) for row in entries])
+        return response_model_path(page_field, LeaderboardPageResponse(status="success", message="ok", data=data))
+
+    def page_fast() -> bytes:
+        data = {"difficulty": "easy", "timespan": "weekly", "page": 1, "page_size": args.items,
+                "entries": [{**row} for row in entries], "is_exact": True}
+        return FastJSONResponse({"status": "success", "message": "ok", "data": data}).body
+
+    assert history_models() == history_fast() and page_models() == page_fast()
+
+    def timed(build) -> float:
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            build()
+        return (time.perf_counter() - start) / args.rounds
+
+    print(f"{args.items} items per response, {args.rounds} rounds, encoder: {'orjson' if responses.orjson else 'pydantic-core'}")
+    for name, models, fast in [("game history", history_models, history_fast), ("leaderboard page", page_models, page_fast)]:
+        model_cost, fast_cost = timed(models), timed(fast)
+        print(f"  {name + ':':18} response_model {model_cost * 1e6:9.1f} us   fast path {fast_cost * 1e6:9.1f} us   "
+              f"({model_cost / fast_cost:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
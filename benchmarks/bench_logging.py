@@ -0,0 +1,93 @@
+"""
+Micro-benchmark of the per-request logging cost of update_game.
+
+Compares, on the request thread, the diagnostics update_game used to print (nine lines
+per request, two of them full 81-character boards, written to an unbuffered stdout
+like in a container) with the same diagnostics on the queued logging pipeline: at
+the default INFO level, where they are skipped, with DEBUG enabled, where they are
+queued for the writer thread, and with DEBUG sampled at `--sample-rate`.
+
+    python -m benchmarks.bench_logging --requests 20000 --sample-rate 0.01
+"""
+import argparse
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+from src.Config import logging_config
+from src.Config.logging_config import BackgroundQueueHandler, JsonFormatter, sample_debug
+
+BOARD = "530070000600195000098000060800060003400802001700020006060000280000419005000080079"
+
+
+def printed(out, game_id):
+    print(f"--- PRE-UPDATE (Game ID: {game_id}) ---", file=out, flush=True)
+    print(f"DB duration_seconds: {120}", file=out, flush=True)
+    print(f"DB current_state: {BOARD}", file=out, flush=True)
+    print(f"INCOMING duration_seconds: {125}", file=out, flush=True)
+    print(f"INCOMING current_state: {BOARD}", file=out, flush=True)
+    print(f"--- POST-UPDATE (Game ID: {game_id}) ---", file=out, flush=True)
+    print(f"SAVING duration_seconds: {125}", file=out, flush=True)
+    print(f"SAVING current_state: {BOARD}", file=out, flush=True)
+    print("--- COMMIT SUCCESSFUL ---", file=out, flush=True)
+
+
+def logged(logger, game_id):
+    if sample_debug(logger):
+        logger.debug("Updating game %s", game_id, extra={
+            "db_duration_seconds": 120, "db_current_state": BOARD,
+            "incoming_duration_seconds": 125, "incoming_current_state": BOARD,
+        })
+    if sample_debug(logger):
+        logger.debug("Saving game %s", game_id, extra={"duration_seconds": 125, "current_state": BOARD})
+
+
+def timed(requests: int, call) -> float:
+    start = time.perf_counter()
+    for game_id in range(requests):
+        call(game_id)
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile("w") as out:
+        print_cost = timed(args.requests, lambda game_id: printed(out, game_id))
+
+        writer = logging.StreamHandler(out)
+        writer.setFormatter(JsonFormatter())
+        records = queue.SimpleQueue()
+        handler = BackgroundQueueHandler(records)
+        logger = logging.getLogger("bench_logging")
+        logger.addHandler(handler)
+        logger.propagate = False
+        listener = QueueListener(records, writer)
+        listener.start()
+        try:
+            logger.setLevel(logging.INFO)
+            info_cost = timed(args.requests, lambda game_id: logged(logger, game_id))
+            logger.setLevel(logging.DEBUG)
+            debug_cost = timed(args.requests, lambda game_id: logged(logger, game_id))
+            # Lets the writer catch up, so the sampled run does not compete with its backlog
+            listener.stop()
+            listener.start()
+            logging_config.settings = logging_config.settings.model_copy(update={"LOG_DEBUG_SAMPLE_RATE": args.sample_rate})
+            sampled_cost = timed(args.requests, lambda game_id: logged(logger, game_id))
+        finally:
+            listener.stop()
+
+    print(f"{args.requests} update_game requests, time spent logging on the request thread")
+    print(f"  print() to stdout:       {print_cost * 1e6:8.2f} us/request")
+    print(f"  queued logging, INFO:    {info_cost * 1e6:8.2f} us/request")
+    print(f"  queued logging, DEBUG:   {debug_cost * 1e6:8.2f} us/request")
+    print(f"  DEBUG sampled at {args.sample_rate:<6}: {sampled_cost * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
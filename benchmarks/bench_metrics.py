@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the per-request cost of MetricsMiddleware.
+
+Sends `--requests` requests through a bare ASGI app that answers immediately, with and
+without the middleware in front of it, over `--routes` distinct route labels, and
+reports the overhead the middleware adds to each request.
+
+    python -m benchmarks.bench_metrics --requests 200000 --routes 20
+"""
+import argparse
+import asyncio
+import time
+
+from src.API.Middleware.metrics import MetricsMiddleware
+
+
+async def app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send(message):
+    pass
+
+
+async def run(handler, scopes) -> float:
+    start = time.perf_counter()
+    for scope in scopes:
+        await handler(scope, None, send)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--routes", type=int, default=20)
+    args = parser.parse_args()
+
+    endpoints = [type(f"endpoint_{i}", (), {"__call__": lambda self: None})() for i in range(args.routes)]
+    router = type("Router", (), {"routes": [
+        type("Route", (), {"endpoint": endpoint, "path": f"/route/{i}"})() for i, endpoint in enumerate(endpoints)
+    ]})()
+    scopes = [
+        {"type": "http", "method": "GET", "endpoint": endpoints[i % args.routes], "app": router}
+        for i in range(args.requests)
+    ]
+
+    bare = asyncio.run(run(app, scopes))
+    measured = asyncio.run(run(MetricsMiddleware(app), scopes))
+
+    print(f"{args.requests} requests over {args.routes} routes")
+    print(f"  bare app:           {bare / args.requests * 1e6:8.2f} us/request")
+    print(f"  with metrics:       {measured / args.requests * 1e6:8.2f} us/request")
+    print(f"  middleware overhead:{(measured - bare) / args.requests * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of access token verification with and without the decoded-token cache.
+
+Simulates `--players` active players each sending `--requests` authenticated requests
+with the same token in interleaved order, and reports the mean cost per request.
+
+    python -m benchmarks.bench_token_cache --players 1000 --requests 40
+"""
+import argparse
+import random
+import time
+import uuid
+
+from jose import jwt
+
+from src.Config.settings import settings
+from src.Schemas.auth_schema import TokenPayload
+from src.Security import security
+
+
+def decode_uncached(token: str) -> TokenPayload:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return TokenPayload(**payload)
+
+
+def run(decode, tokens) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        decode(token)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=40, help="requests per token lifetime")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    tokens = [
+        security.create_access_token({"sub": f"player{i}", "email": f"player{i}@example.com", "id": str(uuid.uuid4())})
+        for i in range(args.players)
+    ]
+    traffic = tokens * args.requests
+    random.Random(args.seed).shuffle(traffic)
+
+    security._decoded_tokens.clear()
+    uncached = run(decode_uncached, traffic)
+    cached = run(security.decode_access_token, traffic)
+
+    requests = len(traffic)
+    print(f"{requests} requests from {args.players} tokens (cache size {settings.TOKEN_CACHE_MAX_SIZE})")
+    print(f"  jwt.decode + TokenPayload: {uncached / requests * 1e6:8.2f} us/request")
+    print(f"  decode_access_token:       {cached / requests * 1e6:8.2f} us/request ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Cold-start profile of the API.
+
+Starts fresh interpreters and reports
+  - the slowest modules imported by `import src.main` (python -X importtime), by own
+    and cumulative time, and the import time per top-level package
+  - time to first request: interpreter start, `import src.main`, the critical startup
+    phase of the lifespan and a first GET /health/live, median over `--runs`
+
+    python -m benchmarks.profile_startup
+    python -m benchmarks.profile_startup --top 30 --runs 5 --budget 3.0
+
+Exits with status 1 when the median time to first request exceeds the budget, or the
+import of src.main exceeds its own budget. test/test_startup.py holds the import to its
+budget in the suite and checks the budget logic against fixed measurements.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds from spawning the interpreter to the first response
+COLD_START_BUDGET_SECONDS = 4.0
+# Cumulative seconds of `import src.main` reported by -X importtime, most of a cold start
+IMPORT_BUDGET_SECONDS = 2.5
+
+
+def child_env(db_path: str) -> Dict[str, str]:
+    return dict(
+        os.environ,
+        DB_URL=f"sqlite:///{db_path}",
+        PASSWORD_HASH_WORKERS="0",
+        PUZZLES_TO_GENERATE_PER_JOB="2",
+        # The child reports on stdout, its logs would interleave with the report
+        LOG_FILE=os.devnull,
+    )
+
+
+def import_profile(env: Dict[str, str]) -> List[Tuple[str, int, int]]:
+    """(module, own microseconds, cumulative microseconds) for every module imported by src.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+def import_seconds(modules: List[Tuple[str, int, int]]) -> float:
+    """Cumulative import time of src.main, in seconds, from an import_profile."""
+    return next(cumulative for name, _, cumulative in modules if name == "src.main") / 1e6
+
+
+def budget_failures(modules: List[Tuple[str, int, int]], runs: List[Dict[str, float]],
+                    budget: float, import_budget: float) -> List[str]:
+    """The budgets exceeded by an import profile and cold start runs, as messages."""
+    failures = []
+    imported = import_seconds(modules)
+    if imported > import_budget:
+        failures.append(f"{imported:.2f}s to import src.main, the budget is {import_budget:.2f}s")
+    median = statistics.median(run["time_to_first_request"] for run in runs)
+    if median > budget:
+        failures.append(f"{median:.2f}s to the first request, the budget is {budget:.2f}s")
+    return failures
+
+
+def measure_cold_start(env: Dict[str, str]) -> Dict[str, float]:
+    """Runs one cold start in a fresh interpreter and returns its phases in seconds."""
+    env = dict(env, PROFILE_STARTUP_SPAWNED_AT=repr(time.time()))
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.profile_startup", "--child"],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+async def _child():
+    spawned_at = float(os.environ["PROFILE_STARTUP_SPAWNED_AT"])
+    interpreter = time.time() - spawned_at
+    started = time.perf_counter()
+
+    import httpx
+    from src.main import app
+    imported = time.perf_counter()
+
+    async with app.router.lifespan_context(app):
+        ready_to_serve = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://profile") as client:
+            response = await client.get("/health/live")
+        first_response = time.perf_counter()
+        time_to_first_request = time.time() - spawned_at
+        response.raise_for_status()
+        phases = {
+            "interpreter": interpreter,
+            "import": imported - started,
+            "startup": ready_to_serve - imported,
+            "first_request": first_response - ready_to_serve,
+            "time_to_first_request": time_to_first_request,
+        }
+    # Printed last, after the app's own startup and shutdown output
+    print(json.dumps(phases))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="modules to list")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to measure")
+    parser.add_argument("--budget", type=float, default=COLD_START_BUDGET_SECONDS)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_SECONDS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child())
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = child_env(os.path.join(tmp, "profile.db"))
+        modules = import_profile(env)
+        runs = [measure_cold_start(env) for _ in range(args.runs)]
+
+    print(f"Slowest imports (of {len(modules)} modules)")
+    print(f"  {'own ms':>8} {'cumulative ms':>14}  module")
+    for name, own, cumulative in sorted(modules, key=lambda module: module[1], reverse=True)[:args.top]:
+        print(f"  {own / 1000:8.1f} {cumulative / 1000:14.1f}  {name}")
+
+    per_package = defaultdict(int)
+    for name, own, _ in modules:
+        per_package[name.split(".")[0]] += own
+    print("\nImport time per package")
+    for package, own in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {own / 1000:8.1f} ms  {package}")
+
+    print(f"\nCold start, median of {len(runs)} runs")
+    for phase in ("interpreter", "import", "startup", "first_request", "time_to_first_request"):
+        print(f"  {phase:>22}: {statistics.median(run[phase] for run in runs) * 1000:8.1f} ms")
+
+    failures = budget_failures(modules, runs, args.budget, args.import_budget)
+    for failure in failures:
+        print(f"\nOver budget: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
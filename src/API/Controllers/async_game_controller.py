@@ -0,0 +1,133 @@
+# src/API/Controllers/async_game_controller.py
+# Async versions of the game controller's hot paths, used when the async DB stack is enabled.
+
+import datetime
+import logging
+import uuid
+
+from fastapi import BackgroundTasks, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.API.Controllers.game_controller import apply_completed_game_stats, apply_game_progress
+from src.Models.TableModels import Games, Puzzles, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Config.read_replicas import record_primary_write
+from src.Schemas.game_schema import GameBase, PuzzleBase, UpdateResponse
+from src.Services.game_generator import generate_and_save_puzzles_background_task
+from src.Services.leaderboard_services import record_score_bucket
+from src.Services.tracing import add_traced_task, traced
+
+logger = logging.getLogger(__name__)
+
+
+@traced()
+async def new_game(user: TokenPayload, db: AsyncSession, difficulty: str, background_tasks: BackgroundTasks) -> PuzzleBase:
+    """Same as game_controller.new_game, without holding a thread while waiting on the database."""
+    puzzle_count = await db.scalar(
+        select(func.count()).select_from(Puzzles).where(
+            Puzzles.difficulty == difficulty,
+            Puzzles.is_used == False
+        )
+    )
+
+    if puzzle_count < 2:
+        add_traced_task(background_tasks, generate_and_save_puzzles_background_task, difficulty)
+
+    try:
+        puzzle = (await db.execute(
+            select(Puzzles).where(
+                Puzzles.difficulty == difficulty,
+                Puzzles.is_used == False
+            ).limit(1).with_for_update() # Lock the row
+        )).scalars().first()
+
+        if not puzzle:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No available puzzles of difficulty '{difficulty}'. Please try again later."
+            )
+
+        puzzle.is_used = True
+
+        new_game_instance = Games(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            puzzle_id=puzzle.id,
+            current_state=puzzle.board_string # Initialize with puzzle board
+        )
+        db.add(new_game_instance)
+        await db.commit()
+        record_primary_write(user.id)
+
+        return PuzzleBase(
+            id=puzzle.id,
+            gameId=new_game_instance.id,
+            difficulty=puzzle.difficulty,
+            board_string=puzzle.board_string,
+            solution_string=puzzle.solution_string
+        )
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error starting new game: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Server error occurred while starting a new game."
+        )
+
+
+@traced()
+async def update_game(user: TokenPayload, db: AsyncSession, game_data: GameBase) -> UpdateResponse:
+    """Same as game_controller.update_game, without holding a thread while waiting on the database."""
+    try:
+        game_id_uuid = uuid.UUID(str(game_data.id)) if isinstance(game_data.id, str) else game_data.id
+
+        game_to_update = (await db.execute(
+            select(Games).where(
+                Games.id == game_id_uuid,
+                Games.user_id == user.id
+            )
+        )).scalars().first()
+
+        if not game_to_update:
+            logger.info("Game not found for update: game_id=%s, user_id=%s", game_id_uuid, user.id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Game not found or you do not have permission to update it."
+            )
+
+        apply_game_progress(game_to_update, game_data)
+
+        if game_data.was_completed:
+            user_stats = await db.get(User, user.id)
+            if not user_stats:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found for stats update.")
+
+            apply_completed_game_stats(user_stats, game_data)
+
+            # Lazy loads need an await, so read the puzzle's difficulty explicitly
+            difficulty = await db.scalar(
+                select(Puzzles.difficulty).where(Puzzles.id == game_to_update.puzzle_id)
+            ) or game_data.difficulty
+            completed_at = game_to_update.completed_at if isinstance(game_to_update.completed_at, datetime.datetime) else None
+            # The bucket upsert is plain ORM code, run it on the sync view of this session
+            await db.run_sync(record_score_bucket, user.id, difficulty, game_data.final_score, completed_at)
+
+        await db.commit()
+        record_primary_write(user.id)
+        return UpdateResponse(status="success", message="Game updated successfully")
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Unexpected error updating game, rolled back: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected server error occurred during game update."
+        )
@@ -0,0 +1,22 @@
+# src/API/Controllers/async_leaderboard_controller.py
+# Async entry point of the leaderboard, used when the async DB stack is enabled.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.API.Controllers import leaderboard_controller
+from src.Schemas.auth_schema import TokenPayload
+from src.Services.leaderboard_response_cache import get_cached_top_players_async
+from src.Services.tracing import traced
+
+
+@traced()
+async def get_full_leaderboard_json(db: AsyncSession, user: TokenPayload) -> bytes:
+    """
+    leaderboard_controller.get_full_leaderboard_json on the sync view of the async session:
+    the response caches and histogram helpers are shared with the sync stack, while every
+    query is awaited on the event loop instead of blocking a thread. Concurrent misses of
+    the Top 5 block wait for one build instead of each running it.
+    """
+    top_players = await get_cached_top_players_async(db, leaderboard_controller.encode_top_players)
+    user_ranks = await db.run_sync(leaderboard_controller.encode_user_ranks, user)
+    return leaderboard_controller.leaderboard_json(top_players, user_ranks)
@@ -0,0 +1,45 @@
+# src/API/Controllers/async_user_controller.py
+# Async version of the profile lookup, used when the async DB stack is enabled.
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.Models.TableModels import User, Challenges
+from src.Schemas.auth_schema import TokenPayload
+from src.Schemas.user_schema import UserData
+from src.Services.tracing import traced
+
+
+@traced()
+async def get_user_data(db: AsyncSession, user: TokenPayload) -> UserData:
+    """Same as user_controller.get_user_data, without holding a thread while waiting on the database."""
+    db_user = await db.get(User, user.id)
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    total_challenges_played = await db.scalar(
+        select(func.count()).select_from(Challenges).where(
+            Challenges.status == "completed",
+            or_(Challenges.challenger_id == user.id, Challenges.opponent_id == user.id)
+        )
+    )
+    total_challenges_won = await db.scalar(
+        select(func.count()).select_from(Challenges).where(
+            Challenges.status == "completed",
+            Challenges.winner_id == user.id
+        )
+    )
+
+    return UserData(
+        id=db_user.id,
+        username=db_user.username,
+        email=db_user.email,
+        total_games_played=db_user.total_games_played or 0,
+        total_score=db_user.total_score or 0,
+        best_score_easy=db_user.best_score_easy or 0,
+        best_score_medium=db_user.best_score_medium or 0,
+        best_score_hard=db_user.best_score_hard or 0,
+        total_challenges_played=total_challenges_played,
+        total_challenges_won=total_challenges_won
+    )
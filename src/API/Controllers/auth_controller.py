@@ -1,47 +1,75 @@
+import uuid
+from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
+from src.Config.read_replicas import record_primary_write
 from src.Models.TableModels import User
-from src.Schemas.auth_schema import AuthResponse, UserLogin, CreateUser
-from src.Security.security import get_password_hash, verify_password, create_access_token
+from src.Schemas.auth_schema import AuthResponse, UserLogin, CreateUser, RefreshRequest
+from src.Security.security import get_password_hash, verify_and_update_password, create_access_token
+from src.Security.refresh_tokens import create_refresh_token, rotate_refresh_token, RefreshTokenError
+from src.Services.tracing import traced
 
-def create_user(newUser: CreateUser, db: Session) -> AuthResponse:
-    existing_user = db.query(User).filter(User.email == newUser.email).first()
-    
-    if(existing_user):
-        raise HTTPException(status_code = status.HTTP_409_CONFLICT, detail = "User already exists")
-    
-    print(newUser.password)
-    hashed_password = get_password_hash(newUser.password)
+# Password hashing is awaited on the hashing pool, the database work around it runs in the threadpool
+
+def _email_taken(db: Session, email: str) -> bool:
+    existing_user = db.query(User.id).filter(User.email == email).first()
+    # Hand the connection back to the pool while bcrypt runs
+    db.rollback()
+    return existing_user is not None
 
 
-    new_user = User(username = newUser.username, email = newUser.email, hashed_password = hashed_password)
+def _insert_user(db: Session, newUser: CreateUser, hashed_password: str) -> AuthResponse:
+    new_user_id = uuid.uuid4()
+    new_user = User(id = new_user_id, username = newUser.username, email = newUser.email, hashed_password = hashed_password)
     db.add(new_user)
+    user_id = str(new_user_id)
+    claims = {'email': newUser.email, 'username': newUser.username, "id": user_id}
+    access_token = create_access_token(claims)
+    refresh_token = create_refresh_token(db, claims)
     db.commit()
-    db.refresh(new_user)
-    user_id = str(new_user.id)
-    access_token = create_access_token({'email': newUser.email, 'username': newUser.username, "id": str(new_user.id)})
+    # Replicas may not have the new user yet when the first profile read comes in
+    record_primary_write(new_user_id)
 
-    message = f"username: {newUser.username}, email: {newUser.email}, user_id: {new_user.id}"
+    message = f"username: {newUser.username}, email: {newUser.email}, user_id: {user_id}"
 
     return {
         "status": "success",
         "message": message,
         "token": access_token,
-        "userId": user_id
+        "userId": user_id,
+        "refresh_token": refresh_token
     }
 
 
-def login_user(user_credentials: UserLogin, db: Session) ->  AuthResponse:
-    user = db.query(User).filter(User.email == user_credentials.email).first()
-    
-    if(not user):
-        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "User not found")
-    
-    if(not verify_password(user_credentials.password, user.hashed_password)):
-        raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = "Incorrect password")
+@traced()
+async def create_user(newUser: CreateUser, db: Session) -> AuthResponse:
+    if await run_in_threadpool(_email_taken, db, newUser.email):
+        raise HTTPException(status_code = status.HTTP_409_CONFLICT, detail = "User already exists")
+
+    hashed_password = await get_password_hash(newUser.password)
+
+    return await run_in_threadpool(_insert_user, db, newUser, hashed_password)
+
+
+def _find_login(db: Session, email: str):
+    user = db.query(User.id, User.username, User.email, User.hashed_password).filter(User.email == email).first()
+    # Hand the connection back to the pool while bcrypt runs
+    db.rollback()
+    return user
+
+
+def _issue_tokens(db: Session, user, user_credentials: UserLogin, new_hash: Optional[str]) -> AuthResponse:
+    # The work factor changed since this hash was made, store the upgraded one
+    if new_hash:
+        db.query(User).filter(User.id == user.id).update({User.hashed_password: new_hash}, synchronize_session=False)
     
-    access_token = create_access_token({'email': user_credentials.email, 'username': user.username, "id": str(user.id)})
+    claims = {'email': user_credentials.email, 'username': user.username, "id": str(user.id)}
+    access_token = create_access_token(claims)
+    refresh_token = create_refresh_token(db, claims)
+    db.commit()
+    record_primary_write(user.id)
     user_id = str(user.id)
     message = f"username: {user.username}, email: {user.email}, user_id: {user.id}"
 
@@ -49,7 +77,38 @@ def login_user(user_credentials: UserLogin, db: Session) ->  AuthResponse:
         "status": "success",
         "message": message,
         "token": access_token,
-        "userId": user_id
+        "userId": user_id,
+        "refresh_token": refresh_token
+    }
+
+
+@traced()
+async def login_user(user_credentials: UserLogin, db: Session) ->  AuthResponse:
+    user = await run_in_threadpool(_find_login, db, user_credentials.email)
+    
+    if(not user):
+        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "User not found")
+
+    is_valid, new_hash = await verify_and_update_password(user_credentials.password, user.hashed_password)
+    if(not is_valid):
+        raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = "Incorrect password")
+
+    return await run_in_threadpool(_issue_tokens, db, user, user_credentials, new_hash)
+
+
+@traced()
+def refresh_access_token(request: RefreshRequest, db: Session) -> AuthResponse:
+    try:
+        claims, refresh_token = rotate_refresh_token(db, request.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = str(e))
+
+    return {
+        "status": "success",
+        "message": "Token refreshed",
+        "token": create_access_token(claims),
+        "userId": claims["id"],
+        "refresh_token": refresh_token
     }
 
 
@@ -4,19 +4,25 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_ # Import or_
 from fastapi import HTTPException, status
 from typing import List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 import datetime
+import logging
 from datetime import timedelta # Import timedelta
 
 # --- Project-Specific Imports ---
 from src.Models.TableModels import User, Puzzles, Challenges
 from src.Schemas.auth_schema import TokenPayload
+from src.Config.read_replicas import record_primary_write
 from src.Schemas.challenges_schema import (
     ChallengeCreate,
     ChallengeRespond,
     ChallengeComplete,
     ChallengeResponse
 )
+from src.Services.rivals_service import record_challenge_created, record_challenge_completed
+from src.Services.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 # --- Helper Function for Eager Loading ---
 def _get_challenge_query(db: Session):
@@ -28,8 +34,23 @@ def _get_challenge_query(db: Session):
         joinedload(Challenges.winner) # Winner might be None, but load it anyway
     )
 
+def _my_challenges_query(db: Session, user_id):
+    """
+    Incoming pending and outgoing pending/accepted challenges, served by the
+    challenger and opponent (id, status, created_at) indexes.
+    """
+    return _get_challenge_query(db).filter(
+        or_(
+            # Incoming: Opponent is user AND status is pending
+            (Challenges.opponent_id == user_id) & (Challenges.status == "pending"),
+            # Outgoing: Challenger is user AND status is pending OR accepted
+            (Challenges.challenger_id == user_id) & (Challenges.status.in_(['pending', 'accepted']))
+        )
+    ).order_by(Challenges.created_at.desc()) # Order by most recent first
+
 # --- Controller Functions ---
 
+@traced()
 def create_challenge(user: TokenPayload, db: Session, challenge_data: ChallengeCreate) -> ChallengeResponse:
     """
     Creates a new challenge from the current user to an opponent.
@@ -76,7 +97,9 @@ def create_challenge(user: TokenPayload, db: Session, challenge_data: ChallengeC
         # 2. Create New Challenge
         expires_at = datetime.datetime.utcnow() + timedelta(days=2) # Challenge expires in 48 hours
 
+        challenge_id = uuid4() # Known up front, reading it back after the commit would reload the row
         new_challenge = Challenges(
+            id=challenge_id,
             puzzle_id=challenge_data.puzzle_id,
             challenger_id=challenger_id,
             opponent_id=opponent_id,
@@ -86,12 +109,14 @@ def create_challenge(user: TokenPayload, db: Session, challenge_data: ChallengeC
         )
 
         db.add(new_challenge)
+        # Keep the rivals adjacency index in step with the challenge graph
+        record_challenge_created(db, challenger_id, opponent_id)
         db.commit()
-        db.refresh(new_challenge)
+        record_primary_write(user.id)
 
         # 3. Fetch the full data for the response
-        # We query it again using the helper to load all relationships
-        response_data = _get_challenge_query(db).filter(Challenges.id == new_challenge.id).first()
+        # We query it again using the helper to load all relationships in one query
+        response_data = _get_challenge_query(db).filter(Challenges.id == challenge_id).first()
 
         if not response_data:
              # This should not happen, but good to check
@@ -104,13 +129,14 @@ def create_challenge(user: TokenPayload, db: Session, challenge_data: ChallengeC
         raise http_exc
     except Exception as e:
         db.rollback()
-        print(f"Error creating challenge: {e}")
+        logger.error("Error creating challenge: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected server error occurred while creating the challenge."
         )
 
 # *** UPDATED FUNCTION ***
+@traced()
 def get_my_challenges(user: TokenPayload, db: Session) -> List[ChallengeResponse]:
     """
     Retrieves relevant challenges (incoming pending, outgoing pending/accepted)
@@ -122,26 +148,20 @@ def get_my_challenges(user: TokenPayload, db: Session) -> List[ChallengeResponse
         # Use the helper to get the base query with eager loading
         # Filter for challenges where the user is either the opponent (pending)
         # OR the challenger (pending or accepted)
-        challenges = _get_challenge_query(db).filter(
-            or_(
-                # Incoming: Opponent is user AND status is pending
-                (Challenges.opponent_id == user_id) & (Challenges.status == "pending"),
-                # Outgoing: Challenger is user AND status is pending OR accepted
-                (Challenges.challenger_id == user_id) & (Challenges.status.in_(['pending', 'accepted']))
-            )
-        ).order_by(Challenges.created_at.desc()).all() # Order by most recent first
+        challenges = _my_challenges_query(db, user_id).all()
 
         return challenges
 
     except Exception as e:
         db.rollback()
-        print(f"Error getting challenges: {e}")
+        logger.error("Error getting challenges: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected server error occurred while fetching challenges."
         )
 
 
+@traced()
 def respond_to_challenge(user: TokenPayload, db: Session, challenge_id: UUID, response_data: ChallengeRespond) -> ChallengeResponse:
     """
     Allows a user (opponent) to accept or reject a 'pending' challenge.
@@ -173,22 +193,25 @@ def respond_to_challenge(user: TokenPayload, db: Session, challenge_id: UUID, re
 
         db.add(challenge)
         db.commit()
-        db.refresh(challenge)
+        record_primary_write(user.id)
 
-        return challenge
+        # Re-query rather than refresh: the commit expired the relationships, reloading them
+        # lazily while serializing would cost one query each
+        return _get_challenge_query(db).filter(Challenges.id == challenge_id).first()
 
     except HTTPException as http_exc:
         db.rollback()
         raise http_exc
     except Exception as e:
         db.rollback()
-        print(f"Error responding to challenge: {e}")
+        logger.error("Error responding to challenge: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected server error occurred while responding to the challenge."
         )
 
 
+@traced()
 def complete_challenge(user: TokenPayload, db: Session, challenge_id: UUID, completion_data: ChallengeComplete) -> ChallengeResponse:
     """
     Allows the opponent to submit their score for an 'accepted' challenge.
@@ -222,20 +245,21 @@ def complete_challenge(user: TokenPayload, db: Session, challenge_id: UUID, comp
         # 3. Update status and completion timestamp
         challenge.status = "completed"
         challenge.completed_at = datetime.datetime.utcnow()
+        record_challenge_completed(db, challenge.challenger_id, challenge.opponent_id, challenge.winner_id)
 
         db.add(challenge)
         db.commit()
-        db.refresh(challenge)
+        record_primary_write(user.id)
 
-        # 4. Return the fully populated, completed challenge
-        return challenge
+        # 4. Return the fully populated, completed challenge, re-queried like in respond_to_challenge
+        return _get_challenge_query(db).filter(Challenges.id == challenge_id).first()
 
     except HTTPException as http_exc:
         db.rollback()
         raise http_exc
     except Exception as e:
         db.rollback()
-        print(f"Error completing challenge: {e}")
+        logger.error("Error completing challenge: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected server error occurred while completing the challenge."
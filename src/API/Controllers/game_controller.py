@@ -1,8 +1,9 @@
 # SudokuApp-Backend/src/API/Controllers/game_controller.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status, Depends, BackgroundTasks
 from typing import List, Dict
+import logging
 import uuid
 import datetime # Import datetime
 
@@ -11,9 +12,24 @@ from src.Security.security import validate_user
 from src.Models.TableModels import Games, Puzzles, User
 from src.Schemas.game_schema import GameBase, PuzzleBase, PuzzleCreate, GameCreate, UpdateResponse # Correct schemas from your file
 from src.Schemas.auth_schema import TokenPayload
+from src.Config.read_replicas import record_primary_write
 from src.Services.game_generator import generate_and_save_puzzles_background_task
+from src.Services.leaderboard_services import record_score_bucket
+from src.Services.tracing import add_traced_task, traced
+from src.Config.logging_config import sample_debug
 # leaderboard_services import is not needed here based on your uploaded controller file
 
+logger = logging.getLogger(__name__)
+
+def _unused_puzzles_query(db: Session, difficulty: str):
+    """Unused puzzles of one difficulty, served by ix_puzzles_difficulty_is_used."""
+    return db.query(Puzzles).filter(
+        Puzzles.difficulty == difficulty,
+        Puzzles.is_used == False
+    )
+
+
+@traced()
 def new_game(user: TokenPayload, db: Session, difficulty: str, background_tasks: BackgroundTasks) -> PuzzleBase:
     """
     Finds an unused puzzle, marks it used, creates a game record,
@@ -29,19 +45,13 @@ def new_game(user: TokenPayload, db: Session, difficulty: str, background_tasks:
     # if existing_game:
     #     raise HTTPException(status_code=400, detail="User already has an ongoing game. Complete or delete it first.")
 
-    puzzle_count = db.query(Puzzles).filter(
-        Puzzles.difficulty == difficulty,
-        Puzzles.is_used == False
-    ).count()
+    puzzle_count = _unused_puzzles_query(db, difficulty).count()
 
     if puzzle_count < 2:
-        background_tasks.add_task(generate_and_save_puzzles_background_task, difficulty)
+        add_traced_task(background_tasks, generate_and_save_puzzles_background_task, difficulty)
 
     try:
-        puzzle = db.query(Puzzles).filter(
-            Puzzles.difficulty == difficulty,
-            Puzzles.is_used == False
-        ).with_for_update().first() # Lock the row
+        puzzle = _unused_puzzles_query(db, difficulty).with_for_update().first() # Lock the row
 
         if not puzzle:
             raise HTTPException(
@@ -56,16 +66,14 @@ def new_game(user: TokenPayload, db: Session, difficulty: str, background_tasks:
 
         # *** FIX: Set initial current_state to the puzzle board string ***
         new_game_instance = Games(
+            id=uuid.uuid4(),
             user_id=user_id_uuid,
             puzzle_id=puzzle.id,
             current_state=puzzle.board_string # Initialize with puzzle board
         )
         db.add(new_game_instance)
-        db.flush() # Get the new game ID before commit
-        db.refresh(new_game_instance)
-
-        db.commit()
 
+        # Built before the commit, which expires both objects and would reload them
         puzzle_response = PuzzleBase(
             id=puzzle.id,
             gameId=new_game_instance.id, # Include game ID
@@ -73,19 +81,63 @@ def new_game(user: TokenPayload, db: Session, difficulty: str, background_tasks:
             board_string=puzzle.board_string,
             solution_string=puzzle.solution_string
         )
+
+        db.commit()
+        record_primary_write(user_id_uuid)
+
         return puzzle_response
 
     except Exception as e:
         db.rollback()
-        print(f"Error starting new game: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error starting new game: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Server error occurred while starting a new game."
         )
 
 
+def apply_game_progress(game: Games, game_data: GameBase):
+    """Copies an update's progress fields onto the game. Shared with the async controller."""
+    # *** FIX: Save the current board state if provided ***
+    if game_data.current_state and len(game_data.current_state) == 81:
+        game.current_state = game_data.current_state
+    elif not game_data.was_completed:
+        # If not completed and no state sent, maybe log a warning?
+        logger.warning("Game update for game %s received without current_state.", game.id)
+
+    # Update other fields from GameBase
+    game.was_completed = game_data.was_completed
+    game.duration_seconds = game_data.duration_seconds
+    game.errors_made = game_data.errors_made
+    game.hints_used = game_data.hints_used # Keep track even if 0
+    game.final_score = game_data.final_score
+    game.last_played = datetime.datetime.utcnow() # Update last played timestamp
+
+    if game_data.was_completed:
+        game.completed_at = game_data.completed_at or datetime.datetime.utcnow() # Use provided or now
+
+
+def apply_completed_game_stats(user_stats: User, game_data: GameBase):
+    """Adds a completed game to the user's totals and best scores. Shared with the async controller."""
+    # Ensure stats fields are not None before incrementing
+    user_stats.total_games_played = (user_stats.total_games_played or 0) + 1
+    user_stats.total_score = (user_stats.total_score or 0) + game_data.final_score
+
+    if game_data.difficulty == "easy":
+         current_best = user_stats.best_score_easy or 0
+         if game_data.final_score > current_best:
+              user_stats.best_score_easy = game_data.final_score
+    elif game_data.difficulty == "medium":
+         current_best = user_stats.best_score_medium or 0
+         if game_data.final_score > current_best:
+              user_stats.best_score_medium = game_data.final_score
+    elif game_data.difficulty == "hard":
+         current_best = user_stats.best_score_hard or 0
+         if game_data.final_score > current_best:
+              user_stats.best_score_hard = game_data.final_score
+
+
+@traced()
 def update_game(user: TokenPayload, db: Session, game_data: GameBase) -> UpdateResponse:
     """
     Updates an existing game record based on the provided GameBase data.
@@ -97,96 +149,69 @@ def update_game(user: TokenPayload, db: Session, game_data: GameBase) -> UpdateR
         game_id_uuid = uuid.UUID(str(game_data.id)) if isinstance(game_data.id, str) else game_data.id
 
         # *** FIX: Removed .with_for_update() to simplify the transaction ***
+        # The puzzle is joined in, completing a game reads its difficulty
         game_to_update = db.query(Games).filter(
             Games.id == game_id_uuid,
             Games.user_id == user_id_uuid
-        ).first()
+        ).options(joinedload(Games.puzzle)).first()
 
         if not game_to_update:
-            print(f"Game not found for update: game_id={game_id_uuid}, user_id={user_id_uuid}")
+            logger.info("Game not found for update: game_id=%s, user_id=%s", game_id_uuid, user_id_uuid)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Game not found or you do not have permission to update it."
             )
 
-        # *** FIX: Add server-side logging ***
-        print(f"--- PRE-UPDATE (Game ID: {game_id_uuid}) ---")
-        print(f"DB duration_seconds: {game_to_update.duration_seconds}")
-        print(f"DB current_state: {game_to_update.current_state}")
-        print(f"INCOMING duration_seconds: {game_data.duration_seconds}")
-        print(f"INCOMING current_state: {game_data.current_state}")
-        # --- End Logging ---
+        if sample_debug(logger):
+            logger.debug("Updating game %s", game_id_uuid, extra={
+                "db_duration_seconds": game_to_update.duration_seconds,
+                "db_current_state": game_to_update.current_state,
+                "incoming_duration_seconds": game_data.duration_seconds,
+                "incoming_current_state": game_data.current_state,
+            })
 
 
-        # *** FIX: Save the current board state if provided ***
-        if game_data.current_state and len(game_data.current_state) == 81:
-            game_to_update.current_state = game_data.current_state
-        elif not game_data.was_completed:
-            # If not completed and no state sent, maybe log a warning?
-            print(f"Warning: Game update for game {game_id_uuid} received without current_state.")
-
-
-        # Update other fields from GameBase
-        game_to_update.was_completed = game_data.was_completed
-        game_to_update.duration_seconds = game_data.duration_seconds
-        game_to_update.errors_made = game_data.errors_made
-        game_to_update.hints_used = game_data.hints_used # Keep track even if 0
-        game_to_update.final_score = game_data.final_score
-        game_to_update.last_played = datetime.datetime.utcnow() # Update last played timestamp
+        apply_game_progress(game_to_update, game_data)
 
 
         if game_data.was_completed:
-            game_to_update.completed_at = game_data.completed_at or datetime.datetime.utcnow() # Use provided or now
-
             # *** FIX: Removed .with_for_update() here as well ***
             user_stats = db.query(User).filter(User.id == user_id_uuid).first()
             if not user_stats:
                  db.rollback()
                  raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found for stats update.")
 
-            # Ensure stats fields are not None before incrementing
-            user_stats.total_games_played = (user_stats.total_games_played or 0) + 1
-            user_stats.total_score = (user_stats.total_score or 0) + game_data.final_score
-
-            if game_data.difficulty == "easy":
-                 current_best = user_stats.best_score_easy or 0
-                 if game_data.final_score > current_best:
-                      user_stats.best_score_easy = game_data.final_score
-            elif game_data.difficulty == "medium":
-                 current_best = user_stats.best_score_medium or 0
-                 if game_data.final_score > current_best:
-                      user_stats.best_score_medium = game_data.final_score
-            elif game_data.difficulty == "hard":
-                 current_best = user_stats.best_score_hard or 0
-                 if game_data.final_score > current_best:
-                      user_stats.best_score_hard = game_data.final_score
+            apply_completed_game_stats(user_stats, game_data)
             
             # *** FIX: Explicitly add user_stats to session if needed ***
             db.add(user_stats)
 
+            # Keep the hourly best-score bucket behind the windowed leaderboards up to date
+            completed_at = game_to_update.completed_at if isinstance(game_to_update.completed_at, datetime.datetime) else None
+            difficulty = game_to_update.puzzle.difficulty if game_to_update.puzzle else game_data.difficulty
+            record_score_bucket(db, user_id_uuid, difficulty, game_data.final_score, completed_at)
+
         # *** FIX: Explicitly add game_to_update to the session before commit ***
         # This tells SQLAlchemy the object is "dirty" and needs to be saved.
         db.add(game_to_update)
         
-        # *** FIX: Add server-side logging ***
-        print(f"--- POST-UPDATE (Game ID: {game_id_uuid}) ---")
-        print(f"SAVING duration_seconds: {game_to_update.duration_seconds}")
-        print(f"SAVING current_state: {game_to_update.current_state}")
-        # --- End Logging ---
+        if sample_debug(logger):
+            logger.debug("Saving game %s", game_id_uuid, extra={
+                "duration_seconds": game_to_update.duration_seconds,
+                "current_state": game_to_update.current_state,
+            })
 
         db.commit()
-        print("--- COMMIT SUCCESSFUL ---")
+        record_primary_write(user_id_uuid)
         return UpdateResponse(status="success", message="Game updated successfully") # Return UpdateResponse
 
     except HTTPException as http_exc:
         db.rollback()
-        print(f"--- HTTP EXCEPTION (ROLLBACK) ---: {http_exc.detail}")
+        logger.info("Game update rolled back: %s", http_exc.detail)
         raise http_exc
     except Exception as e:
         db.rollback()
-        print(f"--- UNEXPECTED ERROR (ROLLBACK) ---: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error updating game, rolled back: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected server error occurred during game update."
@@ -1,66 +1,427 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from sqlalchemy import and_, func, or_, tuple_
 from sqlalchemy.orm import Session
-from src.Models.TableModels import Leaderboard
+from src.Models.TableModels import Leaderboard, ChallengeRival, ScoreBucket, User
 from src.Schemas.auth_schema import TokenPayload
 from src.Schemas.leaderboard_schema import (
-    FullLeaderboardData, 
-    LeaderboardCategoryData, 
-    UserRankCategoryData
+    FullLeaderboardData,
+    LeaderboardCategoryData,
+    UserRankCategoryData,
+    UserRankEntry,
+    LeaderboardPageData,
+    LeaderboardWindowData,
+    RivalsLeaderboardData
 )
+from src.Services.leaderboard_response_cache import get_cached_top_players
+from src.Services.leaderboard_services import PERIODIC_TIMESPANS, get_user_scores, get_window_start
+from src.Services.leaderboard_histograms import Histogram, get_histogram
+from src.Services.tracing import traced
 
-def get_full_leaderboard(db: Session, user: TokenPayload) -> FullLeaderboardData:
-    
-    difficulties = ["easy", "medium", "hard"]
-    timespans = ["daily", "weekly", "all_time"]
-    
+DIFFICULTIES = ["easy", "medium", "hard"]
+TIMESPANS = ["daily", "weekly", "all_time"]
+# Every board that can be paged through, including the rolling windows
+BOARD_TIMESPANS = TIMESPANS + [timespan for timespan in PERIODIC_TIMESPANS if timespan not in TIMESPANS]
+
+_top_players_adapter = TypeAdapter(Dict[str, LeaderboardCategoryData])
+_user_ranks_adapter = TypeAdapter(Dict[str, UserRankCategoryData])
+
+
+def _get_top_players(db: Session) -> Dict[str, LeaderboardCategoryData]:
+    """The Top 5 block. It is identical for every user."""
     # --- 1. Efficiently query all Top 5 players at once ---
     top_5_query = db.query(Leaderboard).filter(
-        Leaderboard.difficulty.in_(difficulties),
-        Leaderboard.timespan.in_(timespans),
+        Leaderboard.difficulty.in_(DIFFICULTIES),
+        Leaderboard.timespan.in_(TIMESPANS),
         Leaderboard.rank <= 5
     ).order_by(Leaderboard.rank).all()
-    
+
     # Initialize a nested dictionary for top players
     top_players_data = {
-        diff: {"daily": [], "weekly": [], "all_time": []} for diff in difficulties
+        diff: {"daily": [], "weekly": [], "all_time": []} for diff in DIFFICULTIES
     }
-    
+
     # Sort the query results into the dictionary
     for entry in top_5_query:
         if entry.difficulty in top_players_data and entry.timespan in top_players_data[entry.difficulty]:
             top_players_data[entry.difficulty][entry.timespan].append(entry)
 
+    # This step ensures the data is correctly shaped and validated by Pydantic
+    return {
+        diff: LeaderboardCategoryData(**categories)
+        for diff, categories in top_players_data.items()
+    }
+
+
+def _get_user_ranks(db: Session, user: TokenPayload) -> Dict[str, UserRankCategoryData]:
+    """The requesting user's rank in every category."""
     # --- 2. Efficiently query all of the user's ranks at once ---
     user_ranks_query = db.query(Leaderboard).filter(
-        Leaderboard.difficulty.in_(difficulties),
-        Leaderboard.timespan.in_(timespans),
+        Leaderboard.difficulty.in_(DIFFICULTIES),
+        Leaderboard.timespan.in_(TIMESPANS),
         Leaderboard.user_id == user.id
     ).all()
 
     # Initialize a nested dictionary for user ranks
     user_ranks_data = {
-        diff: {"daily": None, "weekly": None, "all_time": None} for diff in difficulties
+        diff: {"daily": None, "weekly": None, "all_time": None} for diff in DIFFICULTIES
     }
-    
+
     # Sort the query results into the dictionary
     for entry in user_ranks_query:
         if entry.difficulty in user_ranks_data and entry.timespan in user_ranks_data[entry.difficulty]:
-            user_ranks_data[entry.difficulty][entry.timespan] = entry
+            histogram = get_histogram(db, entry.difficulty, entry.timespan)
+            user_ranks_data[entry.difficulty][entry.timespan] = UserRankEntry(
+                total_score=entry.total_score,
+                rank=entry.rank,
+                percentile=histogram.percentile(entry.rank) if histogram else None
+            )
 
-    # --- 3. Format the data into Pydantic models for a clean response ---
-    
-    # This step ensures the data is correctly shaped and validated by Pydantic
-    formatted_top_players = {
-        diff: LeaderboardCategoryData(**categories) 
-        for diff, categories in top_players_data.items()
-    }
-            
-    formatted_user_ranks = {
-        diff: UserRankCategoryData(**categories) 
+    # Players outside the exact top N are placed from the board's score histogram
+    missing = [
+        (diff, timespan) for diff in DIFFICULTIES for timespan in TIMESPANS
+        if user_ranks_data[diff][timespan] is None
+    ]
+    if missing:
+        for (diff, timespan), score in get_user_scores(db, user.id, missing).items():
+            histogram = get_histogram(db, diff, timespan)
+            if histogram is None or score <= 0:
+                continue
+            rank, percentile = histogram.estimate(score)
+            user_ranks_data[diff][timespan] = UserRankEntry(
+                total_score=score,
+                rank=rank,
+                percentile=percentile,
+                is_exact=False
+            )
+
+    return {
+        diff: UserRankCategoryData(**categories)
         for diff, categories in user_ranks_data.items()
     }
 
+
+@traced()
+def get_full_leaderboard(db: Session, user: TokenPayload) -> FullLeaderboardData:
     # Return the final, combined data object
     return FullLeaderboardData(
-        top_players=formatted_top_players,
-        user_ranks=formatted_user_ranks
-    )
\ No newline at end of file
+        top_players=_get_top_players(db),
+        user_ranks=_get_user_ranks(db, user)
+    )
+
+
+def encode_top_players(db: Session) -> bytes:
+    return _top_players_adapter.dump_json(_get_top_players(db))
+
+
+def encode_user_ranks(db: Session, user: TokenPayload) -> bytes:
+    return _user_ranks_adapter.dump_json(_get_user_ranks(db, user))
+
+
+def leaderboard_json(top_players: bytes, user_ranks: bytes) -> bytes:
+    """A LeaderboardResponse around the two encoded blocks."""
+    return (
+        b'{"status":"success","message":"Leaderboard data retrieved successfully","data":{"top_players":'
+        + top_players
+        + b',"user_ranks":'
+        + user_ranks
+        + b'}}'
+    )
+
+
+@traced()
+def get_full_leaderboard_json(db: Session, user: TokenPayload) -> bytes:
+    """
+    Same payload as a LeaderboardResponse wrapping get_full_leaderboard, already encoded.
+    The Top 5 block is served from the process-local cache as pre-encoded bytes,
+    only the user's own ranks are queried and encoded per request.
+    """
+    top_players = get_cached_top_players(db, lambda: encode_top_players(db))
+    return leaderboard_json(top_players, encode_user_ranks(db, user))
+
+
+def warm_leaderboard_cache(db: Session):
+    """Builds this process's cached Top 5 block ahead of the first leaderboard request."""
+    get_cached_top_players(db, lambda: encode_top_players(db))
+
+
+# --- Paginated boards, pre-shaped for FastJSONResponse ---
+
+def _entry(row: Leaderboard) -> dict:
+    """A LeaderboardEntry as a dict, fields in schema order."""
+    return {"user_id": row.user_id, "username": row.username, "total_score": row.total_score, "rank": row.rank}
+
+
+def _board_query(db: Session, difficulty: str, timespan: str):
+    """Base query for one board. Every query on it is served by ix_leaderboard_cache_board_rank."""
+    if difficulty not in DIFFICULTIES or timespan not in BOARD_TIMESPANS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown leaderboard '{difficulty}/{timespan}'."
+        )
+    return db.query(Leaderboard).filter(
+        Leaderboard.timespan == timespan,
+        Leaderboard.difficulty == difficulty
+    )
+
+
+# --- Board positions past the exact top N, read live and ranked from the histogram ---
+
+def _live_scores(db: Session, difficulty: str, timespan: str, min_score: int):
+    """
+    Everyone on a board scoring at least `min_score`, as (user_id, username, total_score):
+    the best_score_* column for 'all_time' (served by ix_users_best_score_*), the best
+    bucket inside the window otherwise.
+    """
+    min_score = max(min_score, 1)
+    if timespan == 'all_time':
+        score = getattr(User, f"best_score_{difficulty}")
+        return db.query(User.id.label("user_id"), User.username, score.label("total_score")).filter(
+            score >= min_score
+        ).subquery()
+    best_score = func.max(ScoreBucket.best_score)
+    return db.query(ScoreBucket.user_id, User.username, best_score.label("total_score")).join(
+        User, User.id == ScoreBucket.user_id
+    ).filter(
+        ScoreBucket.difficulty == difficulty,
+        ScoreBucket.bucket_start >= get_window_start(timespan, datetime.utcnow()),
+        ScoreBucket.best_score >= min_score
+    ).group_by(ScoreBucket.user_id, User.username).subquery()
+
+
+def _ranked_after(scores, total_score: int, user_id):
+    """Players placed after (total_score, user_id) on the board, same order as (rank, user_id)."""
+    return or_(scores.c.total_score < total_score, and_(scores.c.total_score == total_score, scores.c.user_id > user_id))
+
+
+def _ranked_before(scores, total_score: int, user_id):
+    return or_(scores.c.total_score > total_score, and_(scores.c.total_score == total_score, scores.c.user_id < user_id))
+
+
+def _tail_rows(db: Session, difficulty: str, timespan: str, histogram: Histogram, first_position: int, count: int,
+               after: Optional[tuple] = None) -> list:
+    """
+    Up to `count` players from board position `first_position` on. The histogram bounds
+    the scores read, with one bin to spare as it is only as fresh as the last rebuild.
+    With `after` = (total_score, user_id), continues right after that player instead of
+    counting positions.
+    """
+    bounds = histogram.score_range(first_position, first_position + count - 1)
+    if bounds is None:
+        return []
+    low, high, players_above = bounds
+    scores = _live_scores(db, difficulty, timespan, low - histogram.bin_width)
+    query = db.query(scores).order_by(scores.c.total_score.desc(), scores.c.user_id)
+    if after is not None:
+        query = query.filter(_ranked_after(scores, *after))
+    else:
+        query = query.filter(scores.c.total_score < high).offset(max(first_position - 1 - players_above, 0))
+    return query.limit(count).all()
+
+
+def _estimated_entries(rows, histogram: Histogram, min_rank: int = 1) -> List[dict]:
+    """LeaderboardEntry dicts for rows in board order, ranked from the histogram. Ties share a rank."""
+    entries = []
+    for row in rows:
+        if entries and entries[-1]["total_score"] == row.total_score:
+            rank = entries[-1]["rank"]
+        else:
+            rank = max(histogram.estimate(row.total_score)[0], min_rank)
+        entries.append({"user_id": row.user_id, "username": row.username, "total_score": row.total_score, "rank": rank})
+        min_rank = rank
+    return entries
+
+
+@traced()
+def get_leaderboard_page_data(db: Session, difficulty: str, timespan: str, page: int, page_size: int) -> dict:
+    """
+    Returns entries at positions [(page - 1) * page_size + 1, page * page_size] of a board.
+
+    Ranks follow RANK() semantics: exactly `rank - 1` players are ranked above anyone with
+    a given rank. So the page's first position lies in the tie group starting at the highest
+    rank <= that position, and we can seek straight to it instead of OFFSET-scanning every
+    row before it. Only the rows of that one tie group before the page are skipped.
+
+    Positions past the exact top N are read live within the score range the histogram
+    gives for them, ranked from the histogram and the page marked as not exact.
+    """
+    start_position = (page - 1) * page_size + 1
+
+    anchor_rank = _board_query(db, difficulty, timespan).with_entities(
+        func.max(Leaderboard.rank)
+    ).filter(Leaderboard.rank <= start_position).scalar()
+
+    entries = []
+    if anchor_rank is not None:
+        skip = start_position - anchor_rank
+        rows = _board_query(db, difficulty, timespan).filter(
+            Leaderboard.rank >= anchor_rank
+        ).order_by(Leaderboard.rank, Leaderboard.user_id).limit(skip + page_size).all()
+        entries = [_entry(row) for row in rows[skip:]]
+
+    is_exact = True
+    if len(entries) < page_size:
+        histogram = get_histogram(db, difficulty, timespan)
+        if histogram is not None:
+            last = entries[-1] if entries else None
+            rows = _tail_rows(
+                db, difficulty, timespan, histogram, start_position + len(entries), page_size - len(entries),
+                after=(last["total_score"], last["user_id"]) if last else None
+            )
+            if rows:
+                entries += _estimated_entries(rows, histogram, last["rank"] if last else 1)
+                is_exact = False
+
+    return {"difficulty": difficulty, "timespan": timespan, "page": page, "page_size": page_size,
+            "entries": entries, "is_exact": is_exact}
+
+
+def get_leaderboard_page(db: Session, difficulty: str, timespan: str, page: int, page_size: int) -> LeaderboardPageData:
+    return LeaderboardPageData.model_validate(get_leaderboard_page_data(db, difficulty, timespan, page, page_size))
+
+
+def _estimated_window(db: Session, user: TokenPayload, difficulty: str, timespan: str, size: int) -> Optional[dict]:
+    """The window of a player past the exact top N, anchored on their live score and estimated rank."""
+    histogram = get_histogram(db, difficulty, timespan)
+    if histogram is None:
+        return None
+    score = get_user_scores(db, user.id, [(difficulty, timespan)])[(difficulty, timespan)]
+    db_user = db.get(User, user.id)
+    if score <= 0 or db_user is None:
+        return None
+    rank, _ = histogram.estimate(score)
+
+    scores = _live_scores(db, difficulty, timespan, score)
+    above = db.query(scores).filter(_ranked_before(scores, score, user.id)).order_by(
+        scores.c.total_score, scores.c.user_id.desc()
+    ).limit(size).all()
+    below = _tail_rows(db, difficulty, timespan, histogram, rank + 1, size, after=(score, user.id))
+
+    return {
+        "difficulty": difficulty,
+        "timespan": timespan,
+        "me": {"user_id": user.id, "username": db_user.username, "total_score": score, "rank": rank},
+        "above": _estimated_entries(reversed(above), histogram),
+        "below": _estimated_entries(below, histogram, rank),
+        "is_exact": False,
+    }
+
+
+@traced()
+def get_leaderboard_window_data(db: Session, user: TokenPayload, difficulty: str, timespan: str, size: int) -> dict:
+    """
+    Returns the user's entry on a board with up to `size` entries directly above and below it,
+    shaped like LeaderboardWindowData. Past the exact top N the window is read live around
+    the user's score and ranked from the histogram.
+    """
+    board = _board_query(db, difficulty, timespan)
+    me = db.get(Leaderboard, (user.id, difficulty, timespan))
+
+    if me is None:
+        window = _estimated_window(db, user, difficulty, timespan, size)
+        if window is None:
+            return {"difficulty": difficulty, "timespan": timespan, "me": None, "above": [], "below": [], "is_exact": True}
+        return window
+
+    position = tuple_(Leaderboard.rank, Leaderboard.user_id)
+    my_position = tuple_(me.rank, me.user_id)
+
+    above = board.filter(position < my_position).order_by(
+        Leaderboard.rank.desc(), Leaderboard.user_id.desc()
+    ).limit(size).all()
+    below = [_entry(row) for row in board.filter(position > my_position).order_by(
+        Leaderboard.rank, Leaderboard.user_id
+    ).limit(size).all()]
+
+    # Near the bottom of the exact rows, continue into the players past them
+    is_exact = True
+    if len(below) < size:
+        histogram = get_histogram(db, difficulty, timespan)
+        if histogram is not None:
+            last = below[-1] if below else _entry(me)
+            rows = _tail_rows(db, difficulty, timespan, histogram, me.rank + len(below) + 1, size - len(below),
+                              after=(last["total_score"], last["user_id"]))
+            if rows:
+                below += _estimated_entries(rows, histogram, last["rank"])
+                is_exact = False
+
+    return {
+        "difficulty": difficulty,
+        "timespan": timespan,
+        "me": _entry(me),
+        "above": [_entry(row) for row in reversed(above)],
+        "below": below,
+        "is_exact": is_exact,
+    }
+
+
+def get_leaderboard_window(db: Session, user: TokenPayload, difficulty: str, timespan: str, size: int) -> LeaderboardWindowData:
+    return LeaderboardWindowData.model_validate(get_leaderboard_window_data(db, user, difficulty, timespan, size))
+
+
+# --- Rivals board ---
+
+RIVAL_SORTS = ["score", "wins"]
+
+
+@traced()
+def get_rivals_leaderboard_data(db: Session, user: TokenPayload, difficulty: str, sort_by: str, limit: int) -> dict:
+    """
+    Ranks the user's challenge partners, read from the challenge_rivals adjacency
+    index in one query whose cost depends only on how many rivals the user has.
+    - "score": by best all-time score on `difficulty`, the user included for reference.
+    - "wins": by head-to-head wins against the user.
+    Shaped like RivalsLeaderboardData.
+    """
+    if difficulty not in DIFFICULTIES or sort_by not in RIVAL_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown rivals leaderboard '{difficulty}' sorted by '{sort_by}'."
+        )
+    score_column = getattr(User, f"best_score_{difficulty}")
+
+    rivals = db.query(
+        ChallengeRival.rival_id, User.username, score_column.label("best_score"),
+        ChallengeRival.wins, ChallengeRival.losses, ChallengeRival.challenges_count
+    ).join(User, User.id == ChallengeRival.rival_id).filter(
+        ChallengeRival.user_id == user.id
+    ).all()
+
+    # The index rows hold the user's record against each rival, flip it to the rival's point of view
+    rows = [
+        dict(user_id=rival.rival_id, username=rival.username, best_score=rival.best_score or 0,
+             wins=rival.losses, losses=rival.wins, challenges=rival.challenges_count)
+        for rival in rivals
+    ]
+
+    if sort_by == "score":
+        me = db.query(User.id, User.username, score_column.label("best_score")).filter(User.id == user.id).first()
+        if me:
+            rows.append(dict(user_id=me.id, username=me.username, best_score=me.best_score or 0,
+                             wins=0, losses=0, challenges=sum(row["challenges"] for row in rows), is_self=True))
+        sort_key = lambda row: (row["best_score"],)
+    else:
+        sort_key = lambda row: (row["wins"], -row["losses"])
+
+    rows.sort(key=sort_key, reverse=True)
+
+    # Competition ranking, same as RANK() on the global boards, entries in RivalEntry field order
+    entries = []
+    for position, row in enumerate(rows[:limit], start=1):
+        if entries and sort_key(rows[position - 2]) == sort_key(row):
+            rank = entries[-1]["rank"]
+        else:
+            rank = position
+        entries.append({
+            "user_id": row["user_id"], "username": row["username"], "best_score": row["best_score"],
+            "wins": row["wins"], "losses": row["losses"], "challenges": row["challenges"],
+            "rank": rank, "is_self": row.get("is_self", False),
+        })
+
+    return {"difficulty": difficulty, "sort_by": sort_by, "entries": entries}
+
+
+def get_rivals_leaderboard(db: Session, user: TokenPayload, difficulty: str, sort_by: str, limit: int) -> RivalsLeaderboardData:
+    return RivalsLeaderboardData.model_validate(get_rivals_leaderboard_data(db, user, difficulty, sort_by, limit))
@@ -0,0 +1,81 @@
+# src/API/Controllers/metrics_controller.py
+from typing import List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.API.Controllers.leaderboard_controller import DIFFICULTIES
+from src.Config.database import get_pool_stats
+from src.Models.TableModels import Puzzles
+from src.Services.metrics import background_query_samples, format_metric, render_registry
+
+try:
+    from src.Config.scheduler import get_job_metrics
+except ImportError:
+    get_job_metrics = None
+
+
+def _puzzle_pool_samples(db: Session) -> List[str]:
+    """Unused puzzles per difficulty, one grouped count on ix_puzzles_difficulty_is_used."""
+    rows = db.query(Puzzles.difficulty, func.count()).filter(
+        Puzzles.is_used == False  # noqa: E712
+    ).group_by(Puzzles.difficulty).all()
+    levels = {difficulty: 0 for difficulty in DIFFICULTIES}
+    levels.update(rows)
+    return format_metric(
+        "puzzle_pool_unused", "gauge", "Unused puzzles ready to be served.",
+        [({"difficulty": difficulty}, count) for difficulty, count in levels.items()]
+    )
+
+
+def _job_samples() -> List[str]:
+    if get_job_metrics is None:
+        return []
+    jobs = get_job_metrics()
+    outcomes = ("success", "failure", "timeout", "skipped")
+    return (
+        format_metric(
+            "scheduler_job_runs_total", "counter", "Scheduler job runs by outcome.",
+            [({"job": job, "outcome": outcome}, metrics[outcome]) for job, metrics in jobs.items() for outcome in outcomes]
+        )
+        + format_metric(
+            "scheduler_job_duration_seconds_total", "counter", "Total run time of each scheduler job.",
+            [({"job": job}, metrics["total_duration_seconds"]) for job, metrics in jobs.items()]
+        )
+        + format_metric(
+            "scheduler_job_duration_seconds_max", "gauge", "Longest run of each scheduler job.",
+            [({"job": job}, metrics["max_duration_seconds"]) for job, metrics in jobs.items()]
+        )
+        + format_metric(
+            "scheduler_job_last_duration_seconds", "gauge", "Duration of the last run of each scheduler job.",
+            [({"job": job}, metrics["last_duration_seconds"]) for job, metrics in jobs.items()
+             if metrics["last_duration_seconds"] is not None]
+        )
+    )
+
+
+def _pool_samples() -> List[str]:
+    pools = get_pool_stats()
+    gauges = {
+        "checked_out": "Connections checked out of the pool.",
+        "checked_in": "Idle connections in the pool.",
+        "overflow": "Connections opened above the pool size.",
+    }
+    counters = {
+        "checkouts": "Connections checked out since startup.",
+        "timeouts": "Checkouts that timed out waiting for a connection.",
+        "wait_seconds_total": "Time spent waiting for a connection.",
+    }
+    lines = []
+    for stat, help in gauges.items():
+        lines += format_metric(f"db_pool_{stat}", "gauge", help, [({"pool": pool}, stats[stat]) for pool, stats in pools.items()])
+    for stat, help in counters.items():
+        name = f"db_pool_{stat}" if stat.endswith("_total") else f"db_pool_{stat}_total"
+        lines += format_metric(name, "counter", help, [({"pool": pool}, stats[stat]) for pool, stats in pools.items()])
+    return lines
+
+
+def get_metrics_text(db: Session) -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = render_registry() + background_query_samples() + _puzzle_pool_samples(db) + _job_samples() + _pool_samples()
+    return "\n".join(lines) + "\n"
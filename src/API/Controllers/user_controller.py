@@ -5,12 +5,62 @@ from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from typing import List, Optional
 from datetime import datetime
+import logging
 
-from src.Models.TableModels import User, Games, Puzzles, Challenges
+from src.Models.TableModels import User, Games, Puzzles, Challenges, ChallengeRival, Leaderboard, LeaderboardVersion, RefreshToken, ScoreBucket
 from src.Schemas.user_schema import UserData, UserResponse, UserBase
 from src.Schemas.auth_schema import TokenPayload
-from src.Schemas.game_schema import GameHistoryItem, PuzzleBase
+from src.Schemas.game_schema import GameHistoryItem
+from src.Security.security import invalidate_cached_user
+from src.Services.leaderboard_response_cache import invalidate_leaderboard_cache
+from src.Services.tracing import traced
+from src.Config.logging_config import sample_debug
 
+logger = logging.getLogger(__name__)
+
+# --- Query builders for the hot queries, EXPLAINed by test/test_query_plans.py ---
+
+def _in_progress_game_query(db: Session, user_id):
+    """Served by ix_games_user_completed_last_played."""
+    return db.query(Games).join(Puzzles).filter(
+        Games.user_id == user_id,
+        Games.was_completed == False
+    ).order_by(desc(Games.last_played)).options(joinedload(Games.puzzle))
+
+
+def _completed_games_query(db: Session, user_id):
+    """Served by ix_games_user_completed_completed_at."""
+    return db.query(Games).join(Puzzles).filter(
+        Games.user_id == user_id,
+        Games.was_completed == True
+    ).options(joinedload(Games.puzzle)).order_by(Games.completed_at.desc())
+
+
+def _completed_challenges_query(db: Session, user_id):
+    """Served by the challenger and opponent (id, status) indexes."""
+    return db.query(Challenges).filter(
+        Challenges.status == 'completed',
+        or_(
+            Challenges.challenger_id == user_id,
+            Challenges.opponent_id == user_id
+        )
+    ).options(
+        joinedload(Challenges.puzzle),
+        joinedload(Challenges.challenger),
+        joinedload(Challenges.opponent),
+        joinedload(Challenges.winner)
+    ).order_by(Challenges.completed_at.desc())
+
+
+def _challenges_won_query(db: Session, user_id):
+    """Served by ix_challenges_winner_status."""
+    return db.query(Challenges).filter(
+        Challenges.status == "completed",
+        Challenges.winner_id == user_id
+    )
+
+
+@traced()
 def get_user_data(db: Session, user: TokenPayload) -> UserData:
     """
     Retrieves user profile data including game statistics and challenge statistics.
@@ -26,10 +76,7 @@ def get_user_data(db: Session, user: TokenPayload) -> UserData:
         or_(Challenges.challenger_id == user_id, Challenges.opponent_id == user_id)
     ).count()
 
-    total_challenges_won = db.query(Challenges).filter(
-        Challenges.status == "completed",
-        Challenges.winner_id == user_id
-    ).count()
+    total_challenges_won = _challenges_won_query(db, user_id).count()
     # *** END: Calculate Challenge Stats ***
 
     # Use 0 as fallback for nullable integer fields
@@ -49,127 +96,124 @@ def get_user_data(db: Session, user: TokenPayload) -> UserData:
 
 
 
-def get_in_progress_game(db: Session, user: TokenPayload) -> Optional[GameHistoryItem]:
+# --- Game history, pre-shaped for FastJSONResponse ---
+
+def _puzzle_data(puzzle: Puzzles, game_id, solution_string: Optional[str] = None) -> dict:
+    """A PuzzleBase as a dict, fields in schema order."""
+    return {
+        "id": puzzle.id,
+        "gameId": game_id,
+        "difficulty": puzzle.difficulty,
+        "board_string": puzzle.board_string,
+        "solution_string": solution_string,
+    }
+
+
+def _history_item(id, difficulty: str, duration_seconds: int, completed_at, puzzle: Optional[dict], was_completed: bool,
+                  final_score: int = 0, errors_made: int = 0, hints_used: int = 0, is_challenge: bool = False,
+                  challenger_id=None, opponent_id=None, challenger_username: Optional[str] = None,
+                  opponent_username: Optional[str] = None, winner_id=None, challenger_duration: Optional[int] = None,
+                  opponent_duration: Optional[int] = None, current_state: Optional[str] = None) -> dict:
+    """A GameHistoryItem as a dict, fields in schema order with the schema's defaults."""
+    return {
+        "id": id,
+        "difficulty": difficulty,
+        "duration_seconds": duration_seconds,
+        "completed_at": completed_at,
+        "puzzle": puzzle,
+        "was_completed": was_completed,
+        "final_score": final_score,
+        "errors_made": errors_made,
+        "hints_used": hints_used,
+        "is_challenge": is_challenge,
+        "challenger_id": challenger_id,
+        "opponent_id": opponent_id,
+        "challenger_username": challenger_username,
+        "opponent_username": opponent_username,
+        "winner_id": winner_id,
+        "challenger_duration": challenger_duration,
+        "opponent_duration": opponent_duration,
+        "current_state": current_state,
+    }
+
+
+@traced()
+def get_in_progress_game_data(db: Session, user: TokenPayload) -> Optional[dict]:
     """
-    Retrieves the user's most recent in-progress standard game.
+    Retrieves the user's most recent in-progress standard game, shaped like a
+    GameHistoryItem for FastJSONResponse.
     """
-    user_id_uuid = user.id
-    in_progress_game = db.query(Games).join(Puzzles).filter(
-        Games.user_id == user.id,
-        Games.was_completed == False
-    ).order_by(desc(Games.last_played)).options(joinedload(Games.puzzle)).first()
+    in_progress_game = _in_progress_game_query(db, user.id).first()
 
     if not in_progress_game or not in_progress_game.puzzle:
         return None
 
-    # *** Logging fetched data ***
-    print(f"--- FETCHED In-Progress Game (ID: {in_progress_game.id}) ---")
-    print(f"DB duration_seconds: {in_progress_game.duration_seconds}")
-    print(f"DB errors_made: {in_progress_game.errors_made}") # Log fetched errors
-    print(f"DB current_state: {in_progress_game.current_state}") # Log fetched state
-    # --- End Logging ---
+    if sample_debug(logger):
+        logger.debug("Fetched in-progress game %s", in_progress_game.id, extra={
+            "duration_seconds": in_progress_game.duration_seconds,
+            "errors_made": in_progress_game.errors_made,
+            "current_state": in_progress_game.current_state,
+        })
 
-    puzzle_data = PuzzleBase(
-        id=in_progress_game.puzzle.id,
-        gameId=in_progress_game.id,
-        difficulty=in_progress_game.puzzle.difficulty,
-        board_string=in_progress_game.puzzle.board_string,
-        solution_string=in_progress_game.puzzle.solution_string # Include solution for standard games
-    )
-
-    # *** FIX: Map all relevant fields including current_state ***
-    return GameHistoryItem(
+    return _history_item(
         id=in_progress_game.id,
         difficulty=in_progress_game.puzzle.difficulty,
-        duration_seconds=in_progress_game.duration_seconds or 0, # Use fetched value or 0
+        duration_seconds=in_progress_game.duration_seconds or 0,
         completed_at=None, # In-progress games don't have this
-        puzzle=puzzle_data,
-        final_score=0, # Not applicable for in-progress
-        errors_made=in_progress_game.errors_made or 0, # Use fetched value or 0
-        hints_used=in_progress_game.hints_used or 0,   # Use fetched value or 0
-        is_challenge=False,
-        was_completed=False, # Explicitly false
-        current_state=in_progress_game.current_state # *** ADDED THIS LINE ***
+        # Include solution for standard games
+        puzzle=_puzzle_data(in_progress_game.puzzle, in_progress_game.id, in_progress_game.puzzle.solution_string),
+        was_completed=False,
+        errors_made=in_progress_game.errors_made or 0,
+        hints_used=in_progress_game.hints_used or 0,
+        current_state=in_progress_game.current_state
     )
 
 
-def get_game_history(db: Session, user: TokenPayload) -> List[GameHistoryItem]:
+def get_in_progress_game(db: Session, user: TokenPayload) -> Optional[GameHistoryItem]:
+    data = get_in_progress_game_data(db, user)
+    return GameHistoryItem.model_validate(data) if data is not None else None
+
+
+@traced()
+def get_game_history_data(db: Session, user: TokenPayload) -> List[dict]:
     """
     Retrieves the user's completed standard games AND completed challenges
-    where the user was a participant.
-    Returns a list of unified history items, ordered by completion date descending.
+    where the user was a participant, shaped like GameHistoryItems for FastJSONResponse.
+    Ordered by completion date descending.
     """
     history_items = []
     user_id_uuid = user.id
 
     # 1. Fetch Completed Standard Games
-    completed_games = db.query(Games).join(Puzzles).filter(
-        Games.user_id == user_id_uuid,
-        Games.was_completed == True
-    ).options(joinedload(Games.puzzle)).order_by(Games.completed_at.desc()).all()
-
-    for game in completed_games:
-        puzzle_data = None
-        if game.puzzle:
-            puzzle_data = PuzzleBase(
-                 id=game.puzzle.id,
-                 gameId=game.id,
-                 difficulty=game.puzzle.difficulty,
-                 board_string=game.puzzle.board_string
-            )
-
-        history_items.append(GameHistoryItem(
+    for game in _completed_games_query(db, user_id_uuid).all():
+        history_items.append(_history_item(
             id=game.id,
             difficulty=game.puzzle.difficulty if game.puzzle else "unknown",
             duration_seconds=game.duration_seconds or 0,
             completed_at=game.completed_at,
-            puzzle=puzzle_data,
-            # *** Ensure standard game fields have defaults if potentially null from DB ***
+            puzzle=_puzzle_data(game.puzzle, game.id) if game.puzzle else None,
+            was_completed=game.was_completed,
             final_score=game.final_score or 0,
             errors_made=game.errors_made or 0,
-            hints_used=game.hints_used or 0, # Pass hints_used
-            was_completed=game.was_completed, # Pass was_completed
-            is_challenge=False
+            hints_used=game.hints_used or 0
         ))
 
     # 2. Fetch Completed Challenges involving the user
-    completed_challenges = db.query(Challenges).filter(
-        Challenges.status == 'completed',
-        or_(
-            Challenges.challenger_id == user_id_uuid,
-            Challenges.opponent_id == user_id_uuid
-        )
-    ).options(
-        joinedload(Challenges.puzzle),
-        joinedload(Challenges.challenger),
-        joinedload(Challenges.opponent),
-        joinedload(Challenges.winner)
-    ).order_by(Challenges.completed_at.desc()).all()
-
-    for challenge in completed_challenges:
-        puzzle_data = None
-        if challenge.puzzle:
-             puzzle_data = PuzzleBase(
-                 id=challenge.puzzle.id,
-                 gameId=game.id,
-                 difficulty=challenge.puzzle.difficulty,
-                 board_string=challenge.puzzle.board_string
-             )
-
+    for challenge in _completed_challenges_query(db, user_id_uuid).all():
         user_duration = 0
         if user_id_uuid == challenge.challenger_id:
             user_duration = challenge.challenger_duration or 0
         elif user_id_uuid == challenge.opponent_id:
             user_duration = challenge.opponent_duration or 0
 
-        history_items.append(GameHistoryItem(
+        history_items.append(_history_item(
             id=challenge.id,
             difficulty=challenge.puzzle.difficulty if challenge.puzzle else "unknown",
             duration_seconds=user_duration,
             completed_at=challenge.completed_at,
-            puzzle=puzzle_data,
-            # Standard game fields default to 0/False in schema for challenges
-            # Challenge fields
+            # Challenges are not played as a Games row
+            puzzle=_puzzle_data(challenge.puzzle, None) if challenge.puzzle else None,
+            was_completed=True,
             is_challenge=True,
             challenger_id=challenge.challenger_id,
             opponent_id=challenge.opponent_id,
@@ -177,18 +221,20 @@ def get_game_history(db: Session, user: TokenPayload) -> List[GameHistoryItem]:
             opponent_username=challenge.opponent.username if challenge.opponent else "Unknown",
             winner_id=challenge.winner_id,
             challenger_duration=challenge.challenger_duration,
-            opponent_duration=challenge.opponent_duration,
-            # *** Explicitly pass was_completed=True for completed challenges ***
-            was_completed=True
-            # hints_used will default to 0
+            opponent_duration=challenge.opponent_duration
         ))
 
     # 3. Sort Combined List by Completion Date (most recent first)
-    history_items.sort(key=lambda item: item.completed_at if item.completed_at else datetime.min, reverse=True)
+    history_items.sort(key=lambda item: item["completed_at"] if item["completed_at"] else datetime.min, reverse=True)
 
     return history_items
 
 
+def get_game_history(db: Session, user: TokenPayload) -> List[GameHistoryItem]:
+    return [GameHistoryItem.model_validate(item) for item in get_game_history_data(db, user)]
+
+
+@traced()
 def get_user_list(db: Session, user: TokenPayload, username_search: Optional[str] = None) -> List[UserBase]:
     """
     Retrieves a list of all users except the currently authenticated one.
@@ -217,9 +263,50 @@ def get_user_list(db: Session, user: TokenPayload, username_search: Optional[str
         return user_list
 
     except Exception as e:
-        print(f"Error getting user list: {e}")
+        logger.error("Error getting user list: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected server error occurred while fetching the user list."
         )
 
+
+@traced()
+def delete_user(db: Session, user: TokenPayload):
+    """
+    Deletes the user's account with their games, challenges, rival edges, score buckets,
+    leaderboard rows and refresh tokens, then drops them from this process's auth caches.
+    """
+    user_id = user.id
+    if db.query(User.id).filter(User.id == user_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    try:
+        # Boards the user appears on get a new version, so cached responses drop them
+        timespans = [row.timespan for row in db.query(Leaderboard.timespan).filter(Leaderboard.user_id == user_id).distinct()]
+        db.query(Leaderboard).filter(Leaderboard.user_id == user_id).delete(synchronize_session=False)
+        db.query(ChallengeRival).filter(
+            or_(ChallengeRival.user_id == user_id, ChallengeRival.rival_id == user_id)
+        ).delete(synchronize_session=False)
+        db.query(ScoreBucket).filter(ScoreBucket.user_id == user_id).delete(synchronize_session=False)
+        db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete(synchronize_session=False)
+        db.query(Challenges).filter(
+            or_(Challenges.challenger_id == user_id, Challenges.opponent_id == user_id)
+        ).delete(synchronize_session=False)
+        db.query(Games).filter(Games.user_id == user_id).delete(synchronize_session=False)
+        if timespans:
+            db.query(LeaderboardVersion).filter(LeaderboardVersion.timespan.in_(timespans)).update(
+                {LeaderboardVersion.version: LeaderboardVersion.version + 1}, synchronize_session=False
+            )
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Error deleting user %s: %s", user_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected server error occurred while deleting the account."
+        )
+
+    if timespans:
+        invalidate_leaderboard_cache()
+    invalidate_cached_user(user_id)
@@ -0,0 +1,97 @@
+# src/API/Middleware/metrics.py
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.Services.metrics import (
+    REQUESTS,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_SECONDS,
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    QueryStats,
+    current_queries,
+)
+from src.Services.query_budget import QueryLog, report_over_budget
+
+# Route label of requests that matched no route, so scanners cannot create new series
+UNMATCHED_ROUTE = "unmatched"
+# Any other method is labelled OTHER, for the same reason
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording, per route template: request count by status,
+    latency until the response is sent, requests in flight, and the database time and
+    query count of each request (from the cursor hooks in src/Services/metrics.py).
+    It only ever runs on the event loop thread, so the metrics are updated without locks.
+
+    With `query_budgets` ({"METHOD /route/template": max queries}, other routes get
+    `default_query_budget`), every statement is also kept and requests over their budget
+    are logged with their statements and the stacks of their lazy loads. Debug and test
+    mode only, see QUERY_BUDGET_ENABLED.
+    """
+
+    def __init__(self, app: ASGIApp, query_budgets: Optional[Dict[str, int]] = None, default_query_budget: int = 10):
+        self.app = app
+        self.query_budgets = query_budgets
+        self.default_query_budget = default_query_budget
+        self._route_paths: Optional[Dict[Callable, str]] = None  # endpoint -> route template
+        self._labels: Dict[Tuple[str, Optional[Callable]], Tuple[str, str]] = {}  # (method, endpoint) -> labels
+
+    def _route_label(self, scope: Scope) -> str:
+        route = scope.get("route")  # Set by FastAPI's APIRoute
+        if route is not None:
+            return route.path
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._route_paths is None:
+            # Plain Starlette routes (e.g. /docs) only store their endpoint in the scope
+            self._route_paths = {}
+            for route in getattr(scope.get("app"), "routes", ()):
+                if hasattr(route, "endpoint"):
+                    self._route_paths.setdefault(route.endpoint, route.path)
+        return self._route_paths.get(endpoint) or getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        sent_at = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, sent_at
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                sent_at = time.perf_counter()
+            await send(message)
+
+        # Same as record_queries(), without the generator overhead on every request
+        queries = QueryStats() if self.query_budgets is None else QueryLog()
+        token = current_queries.set(queries)
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            current_queries.reset(token)
+            method = scope["method"]
+            key = (method if method in HTTP_METHODS else "OTHER", scope.get("endpoint"))
+            labels = self._labels.get(key)
+            if labels is None:
+                labels = self._labels[key] = (key[0], self._route_label(scope))
+            REQUESTS.inc(labels + (str(status_code),))
+            REQUEST_DURATION.observe(labels, (sent_at or time.perf_counter()) - started)
+            REQUEST_DB_SECONDS.observe(labels, queries.seconds)
+            REQUEST_DB_QUERIES.observe(labels, queries.queries)
+            if self.query_budgets is not None:
+                budget = self.query_budgets.get(f"{labels[0]} {labels[1]}", self.default_query_budget)
+                if queries.queries > budget:
+                    report_over_budget(labels[0], labels[1], queries, budget)
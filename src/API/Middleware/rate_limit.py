@@ -0,0 +1,163 @@
+# src/API/Middleware/rate_limit.py
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from jose import JWTError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.Config.settings import get_settings
+from src.Security.security import decode_access_token
+
+settings = get_settings()
+
+
+class BucketStore(ABC):
+    """
+    Storage for token buckets. Implement `take` against a shared backend
+    (e.g. Redis) to enforce limits across processes, see set_bucket_store.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Takes one token from `key`'s bucket. Returns 0 if allowed, else seconds until a token is available."""
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Process-local buckets in a bounded LRU. Evicting a bucket only refills it,
+    so the bound never makes the limiter stricter than configured.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RateLimit(NamedTuple):
+    name: str
+    rate: float  # tokens added per second
+    burst: int  # bucket size
+    per: str  # "ip" or "user"
+
+
+def _normalize_path(path: str) -> str:
+    # "/api/challenges/" and "/api/challenges" are the same rule, and the same request path
+    return path.rstrip("/") or "/"
+
+
+def parse_rate_limits(limits: Dict[str, dict]) -> Dict[Tuple[str, str], RateLimit]:
+    """
+    Turns the RATE_LIMITS setting ({"METHOD /path": {"rate", "burst", "per"}}) into lookup
+    rules. Raises ValueError on a rule that could never let a request through or is malformed.
+    """
+    rules = {}
+    for name, limit in limits.items():
+        method, path = name.split(" ", 1)
+        rule = RateLimit(
+            name=name,
+            rate=float(limit["rate"]),
+            burst=int(limit["burst"]),
+            per=limit.get("per", "ip")
+        )
+        if rule.rate <= 0:
+            raise ValueError(f"RATE_LIMITS['{name}']: rate must be greater than 0, got {rule.rate}")
+        if rule.burst < 1:
+            raise ValueError(f"RATE_LIMITS['{name}']: burst must be at least 1, got {rule.burst}")
+        if rule.per not in ("ip", "user"):
+            raise ValueError(f"RATE_LIMITS['{name}']: per must be 'ip' or 'user', got {rule.per!r}")
+        rules[(method.upper(), _normalize_path(path))] = rule
+    return rules
+
+
+_store: BucketStore = MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def set_bucket_store(store: BucketStore):
+    """Replaces the process-local store, e.g. with a shared one."""
+    global _store
+    _store = store
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limiting in front of the routes. A request is matched to the rule of its
+    path or closest parent path, ignoring trailing slashes, and keyed by client IP or by the user id of its bearer token
+    (read through the decoded-token cache, anonymous requests fall back to the IP). Rejected
+    requests get a 429 before any dependency, and so any DB session, is set up.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Optional[Dict[str, dict]] = None, store: Optional[BucketStore] = None):
+        self.app = app
+        self.rules = parse_rate_limits(settings.RATE_LIMITS if limits is None else limits)
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        store = self.store or _store
+        wait = await store.take(f"{rule.name}|{self._client_key(scope, rule)}", rule.rate, rule.burst)
+        if wait > 0:
+            response = JSONResponse(
+                {"detail": "Too many requests, slow down."},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _match(self, method: str, path: str) -> Optional[RateLimit]:
+        # Walks up the path one segment at a time, a handful of dict lookups at most
+        candidate = _normalize_path(path)
+        while True:
+            rule = self.rules.get((method, candidate))
+            if rule is not None or candidate == "/":
+                return rule
+            candidate = candidate.rsplit("/", 1)[0] or "/"
+
+    def _client_key(self, scope: Scope, rule: RateLimit) -> str:
+        headers = dict(scope["headers"])
+        if rule.per == "user":
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            if authorization.lower().startswith("bearer "):
+                try:
+                    user_id = decode_access_token(authorization[7:].strip()).id
+                    if user_id is not None:
+                        return f"user:{user_id}"
+                except (JWTError, ValueError):
+                    pass
+
+        if settings.RATE_LIMIT_TRUST_FORWARDED_FOR and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
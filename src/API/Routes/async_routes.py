@@ -0,0 +1,81 @@
+# src/API/Routes/async_routes.py
+# Async routes for the hottest endpoints. main.py includes these routers ahead of the sync
+# ones under the same paths when the async DB stack is available, so they take precedence.
+# They are hidden from the schema, the sync routes document the same contract. Like their
+# sync counterparts, the read-only ones are served from the read replicas.
+
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.API.Middleware.instrumentation import InstrumentedRoute
+from src.Config.async_database import get_async_db_session
+from src.Config.read_replicas import get_async_read_db_session
+from src.Security.security import validate_user_async
+from src.API.Controllers import async_game_controller, async_leaderboard_controller, async_user_controller
+from src.Schemas.auth_schema import TokenPayload
+from src.Schemas.game_schema import GameBase, PuzzleBase, UpdateResponse
+from src.Schemas.user_schema import UserResponse
+
+logger = logging.getLogger(__name__)
+
+game_router = APIRouter(include_in_schema=False, route_class=InstrumentedRoute)
+user_router = APIRouter(include_in_schema=False, route_class=InstrumentedRoute)
+leaderboard_router = APIRouter(include_in_schema=False, route_class=InstrumentedRoute)
+
+
+@game_router.get("/new_game/{difficulty}",
+    response_model=PuzzleBase,
+    status_code=status.HTTP_200_OK)
+async def new_game(background_tasks: BackgroundTasks, user: TokenPayload = Depends(validate_user_async), db: AsyncSession = Depends(get_async_db_session), difficulty: str = "easy"):
+    try:
+        return await async_game_controller.new_game(user, db, difficulty, background_tasks)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error creating new game: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@game_router.put("/update_game",
+    response_model=UpdateResponse,
+    status_code=status.HTTP_200_OK)
+async def update_game(user: TokenPayload = Depends(validate_user_async), db: AsyncSession = Depends(get_async_db_session), game_data: GameBase = None):
+    if game_data is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Request body cannot be empty.")
+
+    try:
+        return await async_game_controller.update_game(user, db, game_data)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error updating game in router: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@user_router.get("/",
+    response_model=UserResponse,
+    status_code=status.HTTP_200_OK)
+async def get_user(user: TokenPayload = Depends(validate_user_async), db: AsyncSession = Depends(get_async_read_db_session)):
+    try:
+        user_data = await async_user_controller.get_user_data(db, user)
+        return UserResponse(status="success", message=user_data)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error getting user data in router: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@leaderboard_router.get("/",
+    status_code=status.HTTP_200_OK)
+async def get_full_leaderboard_route(user: TokenPayload = Depends(validate_user_async), db: AsyncSession = Depends(get_async_read_db_session)):
+    try:
+        body = await async_leaderboard_controller.get_full_leaderboard_json(db, user)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logger.error("Error getting leaderboard: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal server error occurred: {e}"
+        )
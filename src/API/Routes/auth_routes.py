@@ -1,29 +1,51 @@
-from fastapi import APIRouter, Depends, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from src.API.Middleware.instrumentation import InstrumentedRoute
 from src.Config.database import get_db_session
 from src.API.Controllers import auth_controller
-from src.Schemas.auth_schema import AuthResponse, CreateUser, UserLogin
+from src.Schemas.auth_schema import AuthResponse, CreateUser, UserLogin, RefreshRequest
+from src.Security.password_hasher import PasswordHasherBusy
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.post("/register",
     response_model = auth_controller.AuthResponse,
     status_code=status.HTTP_201_CREATED)
-def register_user(newUser : CreateUser, db: Session = Depends(get_db_session)):
+async def register_user(newUser : CreateUser, db: Session = Depends(get_db_session)):
     try:
-        return auth_controller.create_user(newUser, db)
+        return await auth_controller.create_user(newUser, db)
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        print(f"Error creating user: {e}")
+        logger.error("Error creating user: %s", e)
         return {"status": "error", "message": f"Error creating user: {e}", "token": None}
     
 @router.post("/login",
         response_model=auth_controller.AuthResponse,
         status_code=status.HTTP_200_OK,
         description="Route to login a user. Returns a JWT token.")
-def login_user(user_credentials: UserLogin, db: Session = Depends(get_db_session)):
+async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db_session)):
+    try:
+        return await auth_controller.login_user(user_credentials, db)
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error("Error logging in user: %s", e)
+        return {"status": "error", "message": f"Error logging in user: {e}" , "token": None}
+
+@router.post("/refresh",
+        response_model=auth_controller.AuthResponse,
+        status_code=status.HTTP_200_OK,
+        description="Exchanges a refresh token for a new access token and a new refresh token. Each refresh token works once.")
+def refresh_token(request: RefreshRequest, db: Session = Depends(get_db_session)):
     try:
-        return auth_controller.login_user(user_credentials, db)
+        return auth_controller.refresh_access_token(request, db)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error logging in user: {e}")
-        return {"status": "error", "message": f"Error logging in user: {e}" , "token": None}
\ No newline at end of file
+        logger.error("Error refreshing token: %s", e)
+        return {"status": "error", "message": f"Error refreshing token: {e}", "token": None, "userId": None}
@@ -1,11 +1,13 @@
 # src/API/Routes/challenge_routes.py
 
+import logging
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
 # --- Project-Specific Imports ---
+from src.API.Middleware.instrumentation import InstrumentedRoute
 from src.Config.database import get_db_session
 from src.Security.security import validate_user
 from src.API.Controllers import challenges_controller
@@ -17,7 +19,9 @@ from src.Schemas.challenges_schema import (
     ChallengeResponse
 )
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.post(
     "/",
@@ -41,7 +45,7 @@ def create_challenge_route(
         # Re-raise known exceptions from the controller
         raise http_exc
     except Exception as e:
-        print(f"Error creating challenge in router: {e}")
+        logger.error("Error creating challenge in router: %s", e)
         # Catch any other unexpected errors
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -71,7 +75,7 @@ def get_my_challenges_route(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error getting challenges in router: {e}")
+        logger.error("Error getting challenges in router: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected server error occurred: {e}"
@@ -99,7 +103,7 @@ def respond_to_challenge_route(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error responding to challenge in router: {e}")
+        logger.error("Error responding to challenge in router: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected server error occurred: {e}"
@@ -128,7 +132,7 @@ def complete_challenge_route(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error completing challenge in router: {e}")
+        logger.error("Error completing challenge in router: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected server error occurred: {e}"
@@ -1,17 +1,21 @@
 # SudokuApp-Backend/src/API/Routes/game_routers.py
 
+import logging
 from http.client import HTTPException
 from fastapi import APIRouter, Depends, status, BackgroundTasks
 from sqlalchemy.orm import Session
 
+from src.API.Middleware.instrumentation import InstrumentedRoute
 from src.Security.security import validate_user
 from src.Config.database import get_db_session
 from src.API.Controllers import game_controller
 from src.Schemas.auth_schema import TokenPayload
 from src.Schemas.game_schema import GameCreate, GameBase, PuzzleBase, PuzzleCreate, UpdateResponse # GameBase includes current_state now
 
+logger = logging.getLogger(__name__)
 
-router = APIRouter()
+
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/new_game/{difficulty}",
     response_model=PuzzleBase,
@@ -20,7 +24,7 @@ def new_game(background_tasks: BackgroundTasks, user: TokenPayload = Depends(val
     try:
         return game_controller.new_game(user, db, difficulty, background_tasks)
     except Exception as e:
-        print(f"Error creating new game: {e}")
+        logger.error("Error creating new game: %s", e)
         # Consider re-raising HTTPException for better error handling in FastAPI
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -41,6 +45,6 @@ def update_game(user: TokenPayload = Depends(validate_user), db: Session = Depen
         # Re-raise known HTTP exceptions from the controller
         raise http_exc
     except Exception as e:
-        print(f"Error updating game in router: {e}")
+        logger.error("Error updating game in router: %s", e)
         # Re-raise other exceptions as internal server errors
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,38 @@
+# src/API/Routes/health_routes.py
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from src.Config.warmup import get_warmup_status, is_ready
+
+router = APIRouter()
+
+# Both probes are async and touch neither the database nor the threadpool, so they
+# answer even while every worker thread or connection is busy.
+
+@router.get(
+    "/live",
+    status_code=status.HTTP_200_OK,
+    summary="Liveness Probe"
+)
+async def liveness_route():
+    """The process is up and its event loop responds."""
+    return {"status": "alive"}
+
+
+@router.get(
+    "/ready",
+    status_code=status.HTTP_200_OK,
+    summary="Readiness Probe",
+    responses={503: {"description": "Startup or a required warm-up has not finished yet"}}
+)
+async def readiness_route():
+    """
+    200 once the critical startup phase and every required warm-up are done, 503 before.
+    Lists the state of every warm-up (pending, running, done, failed or skipped).
+    """
+    ready = is_ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "starting", "warmups": get_warmup_status()}
+    )
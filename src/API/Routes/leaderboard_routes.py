@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+import logging
+from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
 from sqlalchemy.orm import Session
 
-from src.Config.database import get_db_session
+from src.API.Middleware.instrumentation import InstrumentedRoute
+from src.API.responses import FastJSONResponse
+from src.Config.read_replicas import get_read_db_session
+from src.Config.settings import settings
 from src.Security.security import validate_user
 from src.Schemas.auth_schema import TokenPayload
 # Import your new controller and response model
 from src.API.Controllers import leaderboard_controller
-from src.Schemas.leaderboard_schema import LeaderboardResponse
+from src.Schemas.leaderboard_schema import LeaderboardResponse, LeaderboardPageResponse, LeaderboardWindowResponse, RivalsLeaderboardResponse
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get(
     "/",
@@ -18,7 +24,7 @@ router = APIRouter()
 )
 def get_full_leaderboard_route(
     user: TokenPayload = Depends(validate_user), 
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """
     Fetches all leaderboard data in one call.
@@ -28,18 +34,120 @@ def get_full_leaderboard_route(
     - **user_ranks**: The requesting user's rank for all 9 categories.
     """
     try:
-        # Call the new controller function
-        data = leaderboard_controller.get_full_leaderboard(db, user)
-        
-        return LeaderboardResponse(
-            status="success",
-            message="Leaderboard data retrieved successfully",
-            data=data
-        )
+        # The controller returns the LeaderboardResponse already encoded, with the
+        # shared Top 5 block coming from the cache, so it skips response_model validation.
+        body = leaderboard_controller.get_full_leaderboard_json(db, user)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
-        print(f"Error getting leaderboard: {e}")
+        logger.error("Error getting leaderboard: %s", e)
         # Let FastAPI handle the error response
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An internal server error occurred: {e}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get(
+    "/board/{difficulty}/{timespan}",
+    response_model=LeaderboardPageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get One Page of a Leaderboard"
+)
+def get_leaderboard_page_route(
+    difficulty: str,
+    timespan: str,
+    page: int = Query(1, ge=1, description="1-based page number"),
+    page_size: int = Query(settings.LEADERBOARD_DEFAULT_PAGE_SIZE, ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE),
+    user: TokenPayload = Depends(validate_user),
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Fetches one page of the full standings for a single difficulty and timespan,
+    in rank order. Page cost does not grow with the page number.
+    """
+    try:
+        # Shaped like a LeaderboardPageResponse here and in the controller, so it skips response_model validation
+        data = leaderboard_controller.get_leaderboard_page_data(db, difficulty, timespan, page, page_size)
+        return FastJSONResponse({
+            "status": "success",
+            "message": "Leaderboard page retrieved successfully",
+            "data": data
+        })
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error getting leaderboard page: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal server error occurred: {e}"
+        )
+
+
+@router.get(
+    "/board/{difficulty}/{timespan}/around_me",
+    response_model=LeaderboardWindowResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the Players Ranked Around the Current User"
+)
+def get_leaderboard_window_route(
+    difficulty: str,
+    timespan: str,
+    size: int = Query(5, ge=1, le=settings.LEADERBOARD_MAX_WINDOW, description="Entries to return above and below the user"),
+    user: TokenPayload = Depends(validate_user),
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Fetches the authenticated user's entry on a board together with the
+    `size` players directly above and below them.
+    """
+    try:
+        # Shaped like a LeaderboardWindowResponse here and in the controller, so it skips response_model validation
+        data = leaderboard_controller.get_leaderboard_window_data(db, user, difficulty, timespan, size)
+        return FastJSONResponse({
+            "status": "success",
+            "message": "Leaderboard window retrieved successfully",
+            "data": data
+        })
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error getting leaderboard window: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal server error occurred: {e}"
+        )
+
+
+@router.get(
+    "/rivals",
+    response_model=RivalsLeaderboardResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the Current User's Rivals Leaderboard"
+)
+def get_rivals_leaderboard_route(
+    difficulty: str = Query("easy", description="Difficulty whose best scores are compared"),
+    sort_by: str = Query("score", description="'score' for best scores, 'wins' for head-to-head wins"),
+    limit: int = Query(settings.LEADERBOARD_DEFAULT_PAGE_SIZE, ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE),
+    user: TokenPayload = Depends(validate_user),
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Ranks the users the authenticated user has challenged or been challenged by,
+    either by best score on a difficulty or by head-to-head wins.
+    """
+    try:
+        # Shaped like a RivalsLeaderboardResponse here and in the controller, so it skips response_model validation
+        data = leaderboard_controller.get_rivals_leaderboard_data(db, user, difficulty, sort_by, limit)
+        return FastJSONResponse({
+            "status": "success",
+            "message": "Rivals leaderboard retrieved successfully",
+            "data": data
+        })
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error getting rivals leaderboard: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal server error occurred: {e}"
+        )
@@ -0,0 +1,29 @@
+# src/API/Routes/metrics_routes.py
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from src.API.Controllers.metrics_controller import get_metrics_text
+from src.API.Routes.system_routes import require_admin_token
+from src.Config.database import get_db_session
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus Metrics",
+    dependencies=[Depends(require_admin_token)]
+)
+def get_metrics_route(db: Session = Depends(get_db_session)):
+    """
+    Request latency, status codes, in-flight requests, database time and query counts
+    per route, plus puzzle pool levels, scheduler job durations and connection pools.
+    Requires the admin token in X-Admin-Token, like /api/system/pool; scrapers send it
+    as a header in their scrape config.
+    """
+    return PlainTextResponse(get_metrics_text(db), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,76 @@
+# src/API/Routes/system_routes.py
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from src.API.Middleware.instrumentation import is_admin_token
+from src.Config import database
+from src.Config.database import get_pool_stats
+from src.Migrations.migrator import get_migration_status
+from src.Services.profiler import get_profile, list_profiles
+
+router = APIRouter()
+
+
+def require_admin_token(x_admin_token: str = Header(None)):
+    if x_admin_token is None or not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required.")
+
+
+@router.get(
+    "/pool",
+    status_code=status.HTTP_200_OK,
+    summary="Database Connection Pool Statistics",
+    dependencies=[Depends(require_admin_token)]
+)
+def get_pool_stats_route():
+    """
+    Occupancy of the sync (and, when enabled, async) connection pools, with how many
+    checkouts happened, how long they waited and how many timed out since startup.
+    """
+    return {"status": "success", "data": get_pool_stats()}
+
+
+@router.get(
+    "/migrations",
+    status_code=status.HTTP_200_OK,
+    summary="Schema Migration Status",
+    dependencies=[Depends(require_admin_token)]
+)
+def get_migration_status_route():
+    """
+    Every schema migration with its state (applied, running, interrupted, failed or
+    pending). While the leader runs a backfill, its progress shows up on that process.
+    """
+    return {"status": "success", "data": get_migration_status(database.engine)}
+
+
+@router.get(
+    "/profiles",
+    status_code=status.HTTP_200_OK,
+    summary="Recent Request Profiles",
+    dependencies=[Depends(require_admin_token)]
+)
+def list_profiles_route():
+    """
+    The most recent request profiles, newest first. Requests are profiled when
+    PROFILER_ENABLED is set, see PROFILER_SAMPLE_RATE and the X-Profile-Request header.
+    """
+    return {"status": "success", "data": list_profiles()}
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_class=PlainTextResponse,
+    summary="One Request Profile as Collapsed Stacks",
+    dependencies=[Depends(require_admin_token)]
+)
+def get_profile_route(profile_id: int):
+    """
+    The samples of one profile in the collapsed stack format, one "frame;frame;... count"
+    line per stack. Feed it to flamegraph.pl, inferno or speedscope for a flame graph.
+    """
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found, it may have been evicted.")
+    return PlainTextResponse(profile.collapsed())
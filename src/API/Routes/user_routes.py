@@ -1,11 +1,15 @@
 # SudokuApp-Backend/src/API/Routes/user_routes.py
 
+import logging
 from typing import Optional, List
 from fastapi import APIRouter, Depends, status, HTTPException, Query
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from src.API.Middleware.instrumentation import InstrumentedRoute
+from src.API.responses import FastJSONResponse
 from src.Config.database import get_db_session
+from src.Config.read_replicas import get_read_db_session
 # *** CORRECTED IMPORT: Use GameHistoryItem for history and in-progress ***
 from src.Schemas.game_schema import GameHistoryItem, GameResponseWithPuzzle # Keep GameResponseWithPuzzle if used elsewhere, maybe in-progress?
 from src.Security.security import validate_user
@@ -14,7 +18,9 @@ from src.Schemas.user_schema import UserData, UserResponse, UserBase # Removed '
 from src.Schemas.auth_schema import TokenPayload
 from src.API.Controllers import user_controller
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get(
     "/",
@@ -22,7 +28,7 @@ router = APIRouter()
     status_code=status.HTTP_200_OK,
     summary="Get Current User Profile" # Added summary
 )
-def get_user(user: TokenPayload = Depends(validate_user), db: Session = Depends(get_db_session)):
+def get_user(user: TokenPayload = Depends(validate_user), db: Session = Depends(get_read_db_session)):
     """
     Fetches the profile data for the currently authenticated user,
     including username, email, and game statistics.
@@ -37,10 +43,23 @@ def get_user(user: TokenPayload = Depends(validate_user), db: Session = Depends(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error getting user data in router: {e}")
+        logger.error("Error getting user data in router: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.delete(
+    "/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete Current User Account"
+)
+def delete_user(user: TokenPayload = Depends(validate_user), db: Session = Depends(get_db_session)):
+    """
+    Deletes the authenticated user's account and everything recorded for it: games,
+    challenges, rival records, leaderboard entries and refresh tokens.
+    """
+    user_controller.delete_user(db, user)
+
+
 @router.get(
     "/in_progress_game",
     # *** CORRECTED: Use the unified history schema, but response can be null ***
@@ -50,7 +69,7 @@ def get_user(user: TokenPayload = Depends(validate_user), db: Session = Depends(
 )
 def get_in_progress_game_route(
     user: TokenPayload = Depends(validate_user),
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """
     Fetches the user's most recently saved *standard* game that is not yet completed.
@@ -59,13 +78,12 @@ def get_in_progress_game_route(
     Challenges are not included here.
     """
     try:
-        # Controller now returns GameHistoryItem or None
-        game_data = user_controller.get_in_progress_game(db, user)
-        return game_data
+        # Shaped like a GameHistoryItem (or None) by the controller, so it skips response_model validation
+        return FastJSONResponse(user_controller.get_in_progress_game_data(db, user))
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error fetching in-progress game in router: {e}")
+        logger.error("Error fetching in-progress game in router: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
@@ -79,7 +97,7 @@ def get_in_progress_game_route(
 )
 def get_game_history_route(
     user: TokenPayload = Depends(validate_user),
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """
     Fetches the completed game history for the authenticated user,
@@ -87,15 +105,12 @@ def get_game_history_route(
     ordered by completion date (most recent first).
     """
     try:
-        # Controller now returns List[GameHistoryItem]
-        game_history_list = user_controller.get_game_history(db, user)
-        return game_history_list
+        # Shaped like List[GameHistoryItem] by the controller, so it skips response_model validation
+        return FastJSONResponse(user_controller.get_game_history_data(db, user))
     except HTTPException as e:
         raise e # Re-raise known HTTP errors
     except Exception as e:
-        print(f"Error fetching game history in router: {e}")
-        import traceback
-        traceback.print_exc() # Print full traceback for easier debugging
+        logger.exception("Error fetching game history in router: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not fetch game history."
@@ -112,7 +127,7 @@ def get_user_list(
     # *** ADDED: Optional query parameter 'username' ***
     username: Optional[str] = Query(None, description="Optional search term for username (case-insensitive)"),
     user: TokenPayload = Depends(validate_user),
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """
     Fetches a list of all registered users except the currently authenticated one,
@@ -127,5 +142,5 @@ def get_user_list(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error getting user list in router: {e}")
+        logger.error("Error getting user list in router: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,99 @@
+# src/Config/async_database.py
+import importlib.util
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+
+from src.Config.settings import get_settings
+from src.Config.database import InstrumentedAsyncQueuePool
+
+logger = logging.getLogger(__name__)
+
+# The asyncio extension is only imported once the async stack is initialized
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# Global variables to hold async database objects, None while the async stack is disabled
+async_engine: Optional["AsyncEngine"] = None
+AsyncSessionLocal: Optional["async_sessionmaker"] = None
+
+# Async driver for each sync dialect
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Rewrites a sync database URL to use the dialect's async driver."""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for '{url.get_backend_name()}'")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def async_driver_installed(database_url: Optional[str]) -> bool:
+    """Whether the async driver for a database URL can be imported, without importing it."""
+    if not database_url:
+        return False
+    driver = ASYNC_DRIVERS.get(make_url(database_url).get_backend_name())
+    return driver is not None and importlib.util.find_spec(driver) is not None
+
+
+def init_async_database() -> bool:
+    """
+    Initializes the async engine and session factory next to the sync ones.
+    The drivers are optional, without them the app keeps serving everything
+    through the sync stack. Returns whether the async stack is available.
+    """
+    global async_engine, AsyncSessionLocal
+
+    settings = get_settings()
+    if not settings.ASYNC_DB_ENABLED:
+        return False
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    try:
+        async_engine = create_async_engine(
+            to_async_url(settings.DB_URL),
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.ASYNC_DB_POOL_SIZE,
+            max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+    except (ImportError, ValueError) as e:
+        logger.warning("Async database disabled, serving every route from the sync stack: %s", e)
+        async_engine = None
+        return False
+
+    # Objects stay usable after commit, reloading expired attributes would need another await
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    logger.info("Async database engine initialized!")
+    return True
+
+
+def async_database_enabled() -> bool:
+    return AsyncSessionLocal is not None
+
+
+async def get_async_db_session() -> AsyncIterator["AsyncSession"]:
+    """Dependency function to get an async DB session"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database not initialized. Call init_async_database() first.")
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def close_async_database():
+    """Close async database connections gracefully"""
+    global async_engine, AsyncSessionLocal
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+        AsyncSessionLocal = None
+        logger.info("Async database connections closed!")
@@ -1,13 +1,112 @@
 # src/Config/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+import threading
+import time
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from src.Config.settings import get_settings
 
+logger = logging.getLogger(__name__)
+
 # Global variables to hold database objects
 engine = None
 SessionLocal = None
 Base = declarative_base()
 
+
+class _CheckoutStatsMixin:
+    """Records how long checkouts wait on a pool and how many of them time out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.timeouts += timed_out
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # Keep the counters when the engine recreates its pool
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_seconds_total, pool.wait_seconds_max = self.wait_seconds_total, self.wait_seconds_max
+        return pool
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+class InstrumentedQueuePool(_CheckoutStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class LazySession:
+    """
+    Stands in for a Session and only creates it on first use. Requests that never
+    touch the database never build a session, let alone check out a connection.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: sessionmaker):
+        self._factory = factory
+        self._session = None
+
+    @property
+    def is_started(self) -> bool:
+        return self._session is not None
+
+    def _get(self) -> Session:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __contains__(self, instance) -> bool:
+        return self._session is not None and instance in self._session
+
+    def __iter__(self):
+        return iter(self._session) if self._session is not None else iter(())
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
 def init_database():
     """Initialize database engine and session factory"""
     global engine, SessionLocal
@@ -17,18 +116,19 @@ def init_database():
     
     engine = create_engine(
         DATABASE_URL, 
-        pool_size=5, 
-        max_overflow=10, 
-        pool_timeout=30, 
-        pool_recycle=300,  # <-- CHANGE: Recycle connections every 5 mins (was 3600)
-        pool_pre_ping=True  # <-- ADD: Check if connection is alive before using
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE, 
+        max_overflow=settings.DB_MAX_OVERFLOW, 
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS, 
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
     )
 
     with engine.connect() as connection:
-        print("Database connected successfully!")
+        logger.info("Database connected successfully!")
     
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    print("Database engine initialized!")
+    logger.info("Database engine initialized!")
 
 def create_db_and_tables():
     """Create database tables if they don't exist"""
@@ -36,14 +136,43 @@ def create_db_and_tables():
         raise RuntimeError("Database engine not initialized. Call init_database() first.")
     
     Base.metadata.create_all(bind=engine)
-    print("Database and tables created!")
+    logger.info("Database and tables created!")
+    # Tables that already exist are left alone, src/Migrations changes them
+
+def iter_in_batches(db: Session, query, key_column, batch_size: int):
+    """
+    Yields the rows of a query in batches, paging on a unique, selected key column
+    instead of holding one cursor open, and ends the read transaction between batches
+    so a long backfill never pins a snapshot on a live table.
+    """
+    last_key = None
+    while True:
+        page = query if last_key is None else query.filter(key_column > last_key)
+        rows = page.order_by(key_column).limit(batch_size).all()
+        db.commit()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last_key = getattr(rows[-1], key_column.key)
+
+def dialect_insert(db: Session, table):
+    """
+    An INSERT for the session's database that supports on_conflict_do_update, for
+    single-statement upserts. PostgreSQL in production, SQLite in tests and local runs.
+    """
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
 
 def get_db_session():
-    """Dependency function to get DB session"""
+    """Dependency function to get DB session, created on the route's first use of it"""
     if SessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_database() first.")
     
-    db = SessionLocal()
+    db = LazySession(SessionLocal)
     try:
         yield db
     finally:
@@ -52,9 +181,40 @@ def get_db_session():
 def getSessionLocal() -> sessionmaker:
     return SessionLocal
 
+def get_db_session_for_job():
+    """Creates a new, independent DB session for background jobs."""
+    SessionLocal = getSessionLocal()
+    if not SessionLocal:
+        logger.error("SessionLocal is not initialized.")
+        return None
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_pool_stats() -> dict:
+    """Pool occupancy and checkout wait statistics of the sync, async and replica engines."""
+    from src.Config import async_database
+
+    stats = {}
+    if engine is not None and isinstance(engine.pool, _CheckoutStatsMixin):
+        stats["sync"] = engine.pool.stats()
+    async_engine = async_database.async_engine
+    if async_engine is not None and isinstance(async_engine.pool, _CheckoutStatsMixin):
+        stats["async"] = async_engine.pool.stats()
+    from src.Config import read_replicas
+    for index, replica_engine in enumerate(read_replicas.replica_engines):
+        if isinstance(replica_engine.pool, _CheckoutStatsMixin):
+            stats[f"replica_{index}"] = replica_engine.pool.stats()
+    for index, replica_engine in enumerate(read_replicas.async_replica_engines):
+        if isinstance(replica_engine.pool, _CheckoutStatsMixin):
+            stats[f"async_replica_{index}"] = replica_engine.pool.stats()
+    return stats
+
 def close_database():
     """Close database connections gracefully"""
     global engine
     if engine:
         engine.dispose()
-        print("Database connections closed!")
+        logger.info("Database connections closed!")
@@ -0,0 +1,218 @@
+# src/Config/leader_election.py
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import text, update, insert, or_
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.exc import IntegrityError
+
+from src.Config.settings import get_settings
+from src.Models.TableModels import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElector:
+    """
+    Elects one process (across workers and nodes) to run background jobs.
+
+    On PostgreSQL the leader holds a session-level advisory lock on a dedicated
+    connection; if the process dies the connection drops and the lock is released.
+    Other databases (SQLite locally) use a lease row in `scheduler_leases` that the
+    leader renews on every heartbeat and that anyone may take over once it expires.
+    """
+
+    def __init__(self, engine: Engine, lock_name: str, lease_seconds: int, heartbeat_seconds: int, node_id: Optional[str] = None):
+        self.engine = engine
+        self.lock_name = lock_name
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.use_advisory_lock = engine.dialect.name == "postgresql"
+
+        self._lock_key = int.from_bytes(hashlib.sha256(lock_name.encode()).digest()[:8], "big", signed=True)
+        self._lock_conn: Optional[Connection] = None
+        self._is_leader = False
+        self._leader_until = 0.0  # Local monotonic deadline for lease-based leadership
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Public API ---
+
+    def is_leader(self) -> bool:
+        if not self._is_leader:
+            return False
+        if not self.use_advisory_lock and time.monotonic() >= self._leader_until:
+            # Missed heartbeats: the lease may already belong to someone else
+            return False
+        return True
+
+    def start(self):
+        """Runs a first election round right away, then keeps heartbeating in a daemon thread."""
+        self.heartbeat()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops heartbeating and gives up leadership so another node can take over immediately."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_seconds)
+            self._thread = None
+        self.release()
+
+    def heartbeat(self) -> bool:
+        """One election round: acquires leadership if free, renews it if held."""
+        try:
+            if self.use_advisory_lock:
+                acquired = self._advisory_lock_round()
+            else:
+                acquired = self._lease_round()
+        except Exception as e:
+            logger.warning("Leader election round failed on node %s: %s", self.node_id, e)
+            acquired = False
+            self._close_lock_connection(invalidate=True)
+
+        if acquired and not self._is_leader:
+            logger.info("Node %s is now the leader for '%s'.", self.node_id, self.lock_name)
+        elif not acquired and self._is_leader:
+            logger.warning("Node %s lost leadership for '%s'.", self.node_id, self.lock_name)
+        self._is_leader = acquired
+        return acquired
+
+    def release(self):
+        if not self._is_leader:
+            self._close_lock_connection()
+            return
+        unlocked = True
+        try:
+            if self.use_advisory_lock:
+                if self._lock_conn is not None:
+                    self._lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self._lock_key})
+            else:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        update(SchedulerLease)
+                        .where(SchedulerLease.name == self.lock_name, SchedulerLease.holder == self.node_id)
+                        .values(expires_at=datetime.utcnow())
+                    )
+        except Exception as e:
+            logger.error("Error releasing leadership on node %s: %s", self.node_id, e)
+            unlocked = False
+        finally:
+            self._is_leader = False
+            self._close_lock_connection(invalidate=not unlocked)
+
+    # --- Backends ---
+
+    def _advisory_lock_round(self) -> bool:
+        if self._lock_conn is not None:
+            # Still holding the lock as long as our session is alive
+            self._lock_conn.execute(text("SELECT 1"))
+            return True
+
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self._lock_key}).scalar()
+        except Exception:
+            # The lock may have been taken before the error, never pool this session
+            conn.invalidate()
+            conn.close()
+            raise
+        if acquired:
+            self._lock_conn = conn
+            return True
+        conn.close()
+        return False
+
+    def _lease_round(self) -> bool:
+        started = time.monotonic()
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.lock_name,
+                    or_(SchedulerLease.holder == self.node_id, SchedulerLease.expires_at < now)
+                )
+                .values(holder=self.node_id, expires_at=expires_at)
+            )
+            acquired = result.rowcount == 1
+
+        if not acquired:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(SchedulerLease).values(name=self.lock_name, holder=self.node_id, expires_at=expires_at))
+                acquired = True
+            except IntegrityError:
+                # The row exists and is held by a live leader
+                acquired = False
+
+        if acquired:
+            self._leader_until = started + self.lease_seconds
+        return acquired
+
+    def _close_lock_connection(self, invalidate: bool = False):
+        """
+        Returns the lock connection to the pool, or with `invalidate` discards it. The
+        session-level advisory lock lives as long as the database session, so a connection
+        that may still hold it after an error must be invalidated rather than pooled, or
+        the idle pooled session keeps every node, this one included, from leading.
+        """
+        if self._lock_conn is not None:
+            try:
+                if invalidate:
+                    self._lock_conn.invalidate()
+                self._lock_conn.close()
+            except Exception:
+                pass
+            self._lock_conn = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.heartbeat_seconds):
+            self.heartbeat()
+
+
+# Global elector, created once the database engine exists
+_elector: Optional[LeaderElector] = None
+
+
+def start_leader_election(engine: Engine):
+    """Creates the process-wide elector and runs the first election round."""
+    global _elector
+    settings = get_settings()
+    if not settings.LEADER_ELECTION_ENABLED:
+        logger.info("Leader election disabled, this process runs all background jobs.")
+        return
+
+    _elector = LeaderElector(
+        engine,
+        lock_name=settings.LEADER_LOCK_NAME,
+        lease_seconds=settings.LEADER_LEASE_SECONDS,
+        heartbeat_seconds=settings.LEADER_HEARTBEAT_SECONDS
+    )
+    _elector.start()
+
+
+def stop_leader_election():
+    global _elector
+    if _elector is not None:
+        _elector.stop()
+        _elector = None
+
+
+def is_leader() -> bool:
+    """True if this process should run background jobs. Without election every process is a leader."""
+    if _elector is None:
+        return not get_settings().LEADER_ELECTION_ENABLED
+    return _elector.is_leader()
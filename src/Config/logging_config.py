@@ -0,0 +1,122 @@
+# src/Config/logging_config.py
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from src.Config.settings import get_settings
+from src.Services.tracing import current_span
+
+settings = get_settings()
+
+# Attributes every LogRecord has, anything else was passed in `extra` and is written as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id"}
+
+_listener: Optional[QueueListener] = None
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, the trace id, `extra` fields and the exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id is not None:
+            entry["trace_id"] = trace_id
+        entry.update(_extra_fields(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain lines for reading logs locally, with the `extra` fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread. The calling thread only renders what refers to
+    its own objects (the message arguments and the exception), formatting and the write
+    itself happen in the writer thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        span = current_span.get()
+        if span is not None:
+            record.trace_id = span.trace_id
+        return record
+
+
+def sample_debug(logger: logging.Logger) -> bool:
+    """
+    Whether to log a high-volume DEBUG event, such as the game state of every update:
+    the logger has DEBUG enabled and the event falls in LOG_DEBUG_SAMPLE_RATE. Checked
+    before the record is built, so the events left out cost nothing more.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    rate = settings.LOG_DEBUG_SAMPLE_RATE
+    return rate >= 1 or random.random() < rate
+
+
+def setup_logging():
+    """
+    Routes every log record through a queue to a writer thread, so logging never blocks
+    a request on stdout or a file. Safe to call more than once, the writer is flushed and
+    stopped at exit.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if settings.LOG_FILE:
+        writer: logging.Handler = logging.FileHandler(settings.LOG_FILE, encoding="utf-8")
+    else:
+        writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter() if settings.LOG_JSON else TextFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = BackgroundQueueHandler(records)
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(records, writer)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,232 @@
+# src/Config/read_replicas.py
+import itertools
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.Config import async_database, database
+from src.Config.database import InstrumentedAsyncQueuePool, InstrumentedQueuePool, LazySession
+from src.Config.settings import get_settings
+from src.Schemas.auth_schema import TokenPayload
+from src.Security.security import validate_user, validate_user_async
+from src.Services.ttl_cache import TTLCache
+
+# The asyncio extension is only imported once the async stack is initialized
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Global replica engines, empty when no DB_REPLICA_URLS are configured
+replica_engines: List[Engine] = []
+_down_until: List[float] = []
+_next_replica = itertools.count()
+_replica_lock = threading.Lock()
+
+# The same replicas for the async routes, empty while the async stack is disabled
+async_replica_engines: List["AsyncEngine"] = []
+_async_down_until: List[float] = []
+
+# Users who wrote to the primary within the last DB_READ_YOUR_WRITES_SECONDS
+_recent_writers = TTLCache(maxsize=100000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+class _ReplicaSession(Session):
+    """A session bound to one checked-out replica connection, which it returns on close."""
+
+    def close(self):
+        connection = self.info.pop("replica_connection", None)
+        try:
+            super().close()
+        finally:
+            if connection is not None:
+                connection.close()
+
+
+def _replica_urls() -> List[str]:
+    urls = settings.DB_REPLICA_URLS
+    if isinstance(urls, str):
+        urls = [url.strip() for url in urls.split(",") if url.strip()]
+    return urls
+
+
+def init_read_replicas():
+    """Creates one engine per DB_REPLICA_URLS entry, with the same pool settings as the primary."""
+    global replica_engines, _down_until
+    urls = _replica_urls()
+
+    replica_engines = [
+        create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+        for url in urls
+    ]
+    _down_until = [0.0] * len(replica_engines)
+    if replica_engines:
+        logger.info("%s read replica(s) initialized!", len(replica_engines))
+
+
+def init_async_read_replicas():
+    """
+    Creates an async engine per DB_REPLICA_URLS entry for the async routes, with the same
+    pool settings as the async primary. Call after init_async_database succeeded.
+    """
+    global async_replica_engines, _async_down_until
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_replica_engines = [
+        create_async_engine(
+            async_database.to_async_url(url),
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.ASYNC_DB_POOL_SIZE,
+            max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+        for url in _replica_urls()
+    ]
+    _async_down_until = [0.0] * len(async_replica_engines)
+    if async_replica_engines:
+        logger.info("%s async read replica(s) initialized!", len(async_replica_engines))
+
+
+def close_read_replicas():
+    global replica_engines, _down_until
+    for engine in replica_engines:
+        engine.dispose()
+    replica_engines, _down_until = [], []
+
+
+async def close_async_read_replicas():
+    global async_replica_engines, _async_down_until
+    for engine in async_replica_engines:
+        await engine.dispose()
+    async_replica_engines, _async_down_until = [], []
+
+
+def record_primary_write(user_id):
+    """Keeps a user's reads on the primary for a while after they wrote, so they see their own writes."""
+    if (replica_engines or async_replica_engines) and user_id is not None:
+        _recent_writers.set(user_id, True)
+
+
+def _healthy_replicas(down_until: List[float]):
+    """Indexes of the replicas not marked down, round robin from the next starting point."""
+    with _replica_lock:
+        start = next(_next_replica)
+    for offset in range(len(down_until)):
+        index = (start + offset) % len(down_until)
+        if time.monotonic() >= down_until[index]:
+            yield index
+
+
+def _mark_down(down_until: List[float], index: int, error: Exception):
+    down_until[index] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+    logger.warning("Read replica %s unavailable, using the others or the primary: %s", index, error)
+
+
+def _connect_replica() -> Optional[Tuple[int, Connection]]:
+    """
+    Checks out a connection from the next healthy replica, round robin, with the replica's
+    index. A replica that fails to connect is skipped for DB_REPLICA_RETRY_SECONDS. None if
+    every replica is down.
+    """
+    for index in _healthy_replicas(_down_until):
+        try:
+            return index, replica_engines[index].connect()
+        except sa_exc.DBAPIError as e:
+            _mark_down(_down_until, index, e)
+    return None
+
+
+async def _connect_async_replica() -> Optional[Tuple[int, "AsyncConnection"]]:
+    """_connect_replica for the async replica engines."""
+    for index in _healthy_replicas(_async_down_until):
+        try:
+            return index, await async_replica_engines[index].connect()
+        except sa_exc.DBAPIError as e:
+            _mark_down(_async_down_until, index, e)
+    return None
+
+
+def _open_read_session() -> Session:
+    replica = _connect_replica()
+    if replica is None:
+        return database.SessionLocal()
+    index, connection = replica
+    session = _ReplicaSession(bind=connection, autoflush=False)
+    session.info["replica_connection"] = connection
+    session.info["replica_index"] = index
+    return session
+
+
+def get_read_db_session(user: TokenPayload = Depends(validate_user)):
+    """
+    Dependency for read-only routes. The session goes to a replica, unless there are none,
+    all of them are down, or the user wrote recently (replicas may not have caught up yet).
+    Read-your-writes is tracked per process, and covers replication lag of a few seconds.
+
+    Replicas are only failed over when connecting. A replica that accepts the connection
+    but then errors fails that request, and is skipped for DB_REPLICA_RETRY_SECONDS by
+    the following ones; the failed read is not retried on the primary. A lagging replica
+    that answers is not detected, its reads are served as they are.
+    """
+    if database.SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+
+    if not replica_engines or _recent_writers.get(user.id):
+        factory = database.SessionLocal
+    else:
+        factory = _open_read_session
+
+    db = LazySession(factory)
+    try:
+        yield db
+    except sa_exc.DBAPIError as e:
+        index = db.info.get("replica_index") if db.is_started else None
+        if index is not None:
+            _mark_down(_down_until, index, e)
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_read_db_session(user: TokenPayload = Depends(validate_user_async)) -> AsyncIterator["AsyncSession"]:
+    """get_read_db_session for the async routes, on the async replica engines, with the same limits."""
+    if async_database.AsyncSessionLocal is None:
+        raise RuntimeError("Async database not initialized. Call init_async_database() first.")
+
+    replica = None
+    if async_replica_engines and not _recent_writers.get(user.id):
+        replica = await _connect_async_replica()
+    if replica is None:
+        async with async_database.AsyncSessionLocal() as db:
+            yield db
+        return
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    index, connection = replica
+    try:
+        async with AsyncSession(bind=connection, autoflush=False, expire_on_commit=False) as db:
+            yield db
+    except sa_exc.DBAPIError as e:
+        _mark_down(_async_down_until, index, e)
+        raise
+    finally:
+        await connection.close()
@@ -1,10 +1,180 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Sequence
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.triggers.interval import IntervalTrigger
 from src.Config.settings import get_settings
+from src.Config.leader_election import is_leader
+from src.Services.tracing import span
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-scheduler = AsyncIOScheduler(timezone = "UTC")
+scheduler = AsyncIOScheduler(
+    timezone = "UTC",
+    job_defaults = {
+        "max_instances": 1,   # Never overlap two runs of the same job id
+        "coalesce": True,     # Collapse a backlog of missed runs into one
+        "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
+    }
+)
+
+# Blocking job bodies (SQL, ORM, puzzle generation) run here, never on the event loop thread.
+_job_pool = ThreadPoolExecutor(
+    max_workers=settings.SCHEDULER_MAX_WORKERS,
+    thread_name_prefix="scheduler-job"
+)
+
+# A job that timed out keeps running in its worker thread (threads cannot be killed),
+# so overlap is guarded by our own per-job lock, released only when the body really ends.
+_running_locks: Dict[str, threading.Lock] = {}
+_running_locks_guard = threading.Lock()
+
+_job_metrics: Dict[str, Dict[str, Any]] = {}
+_job_metrics_lock = threading.Lock()
+
 
 def get_scheduler():
-    return scheduler
\ No newline at end of file
+    return scheduler
+
+
+def _get_running_lock(job_id: str) -> threading.Lock:
+    with _running_locks_guard:
+        lock = _running_locks.get(job_id)
+        if lock is None:
+            lock = _running_locks[job_id] = threading.Lock()
+        return lock
+
+
+def _record_job_run(job_id: str, outcome: str, duration: Optional[float] = None):
+    """Updates the run-time metrics of a job. `outcome` is one of success, failure, timeout, skipped."""
+    with _job_metrics_lock:
+        metrics = _job_metrics.setdefault(job_id, {
+            "runs": 0,
+            "success": 0,
+            "failure": 0,
+            "timeout": 0,
+            "skipped": 0,
+            "last_duration_seconds": None,
+            "max_duration_seconds": 0.0,
+            "total_duration_seconds": 0.0,
+            "last_run_at": None,
+        })
+        metrics[outcome] += 1
+        if outcome == "skipped":
+            return
+        metrics["runs"] += 1
+        metrics["last_run_at"] = time.time()
+        if duration is not None:
+            metrics["last_duration_seconds"] = duration
+            metrics["total_duration_seconds"] += duration
+            metrics["max_duration_seconds"] = max(metrics["max_duration_seconds"], duration)
+
+
+def get_job_metrics() -> Dict[str, Dict[str, Any]]:
+    """Returns a snapshot of the run-time metrics of every managed job."""
+    with _job_metrics_lock:
+        return {job_id: dict(metrics) for job_id, metrics in _job_metrics.items()}
+
+
+async def run_blocking(job_id: str, func: Callable, *args, timeout: Optional[float] = None) -> bool:
+    """
+    Runs a blocking function in the job pool and awaits it without blocking the event loop.
+    Skips the run if a previous run of the same job id is still executing.
+    Returns True if the function completed successfully.
+    """
+    if timeout is None:
+        timeout = settings.SCHEDULER_JOB_TIMEOUT_SECONDS
+
+    lock = _get_running_lock(job_id)
+    if not lock.acquire(blocking=False):
+        logger.warning("Job '%s' is still running, skipping this run.", job_id)
+        _record_job_run(job_id, "skipped")
+        return False
+
+    started = time.perf_counter()
+    timed_out = threading.Event()
+
+    def _body():
+        try:
+            # The root span of the job's trace, its queries and puzzle generation are children
+            with span(f"job {job_id}", job=job_id):
+                return func(*args)
+        finally:
+            lock.release()
+            # A timed out run is still measured, its duration is only known here
+            if timed_out.is_set():
+                logger.info("Timed out job '%s' finished after %.2fs.", job_id, time.perf_counter() - started)
+
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(_job_pool, _body)
+    except BaseException:
+        lock.release()
+        raise
+
+    try:
+        await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+    except asyncio.TimeoutError:
+        timed_out.set()
+        logger.warning("Job '%s' exceeded its timeout of %ss.", job_id, timeout)
+        _record_job_run(job_id, "timeout", time.perf_counter() - started)
+        return False
+    except Exception as e:
+        logger.error("Error running job '%s': %s", job_id, e)
+        _record_job_run(job_id, "failure", time.perf_counter() - started)
+        return False
+
+    _record_job_run(job_id, "success", time.perf_counter() - started)
+    return True
+
+
+async def _run_managed_job(job_id: str, func: Callable, args: Sequence = (), timeout: Optional[float] = None):
+    """Coroutine entry point registered with the scheduler for every managed job."""
+    if not is_leader():
+        # Another worker or node is the leader and runs this job
+        _record_job_run(job_id, "skipped")
+        return
+    await run_blocking(job_id, func, *args, timeout=timeout)
+
+
+def add_managed_job(func: Callable, trigger: str, id: str, args: Sequence = (), timeout: Optional[float] = None, **trigger_args):
+    """
+    Registers a blocking job with the scheduler. The scheduler only awaits it on the
+    event loop; the body runs in the job pool with a timeout and at most one instance per id.
+    Every process schedules the job, but only the elected leader actually runs it.
+    """
+    return scheduler.add_job(
+        _run_managed_job,
+        trigger,
+        args=[id, func, list(args), timeout],
+        id=id,
+        replace_existing=True,
+        **trigger_args
+    )
+
+
+def last_due_time(job, now: datetime) -> Optional[datetime]:
+    """
+    When the job was last due at or before `now` according to its trigger, looking back
+    at most a month. For interval jobs that is one interval ago.
+    """
+    trigger = job.trigger
+    if isinstance(trigger, IntervalTrigger):
+        return now - trigger.interval
+    previous, fire_time = None, trigger.get_next_fire_time(None, now - timedelta(days=32))
+    while fire_time is not None and fire_time <= now:
+        previous = fire_time
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(microseconds=1))
+    return previous
+
+
+def shutdown_job_pool():
+    """Stops accepting new job runs. Running bodies are left to finish in the background."""
+    _job_pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,11 @@
+import sys
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Union
+from typing import Dict, List, Union
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    # Immutable: every module shares the one instance returned by get_settings()
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", frozen=True)
 
     PORT: int = 8000
     HOST: str = "0.0.0.0"
@@ -13,6 +16,20 @@ class Settings(BaseSettings):
     debug: bool = False
     
     DB_URL: Union[str, None] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 300
+    DB_POOL_PRE_PING: bool = True
+    # Optional read replicas (a list, or a comma separated string) for the read-only routes
+    DB_REPLICA_URLS: Union[str, List[str]] = []
+    DB_REPLICA_RETRY_SECONDS: int = 30
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
+    # Hot endpoints are served by async routes when the dialect's async driver
+    # (asyncpg / aiosqlite) is installed, everything else keeps the sync stack
+    ASYNC_DB_ENABLED: bool = True
+    ASYNC_DB_POOL_SIZE: int = 10
+    ASYNC_DB_MAX_OVERFLOW: int = 20
 
     ALLOWED_ORIGINS: Union[str, List[str]] = ["*"]
 
@@ -22,15 +39,146 @@ class Settings(BaseSettings):
     HARD_BLANKS: int = 60
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     SECRET_KEY: str = "secretkey"
     ALGORITHM: str = "HS256"
 
-    
+    # bcrypt runs in its own process pool, hashes with another work factor are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # 0 hashes inline in the request thread
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_TIMEOUT_SECONDS: int = 10
+
+    # Verified user ids are cached so authenticated requests skip the users lookup. The
+    # cache is per process: deleting an account invalidates it only in the process that
+    # served the request, so USER_CACHE_TTL_SECONDS bounds how long the other processes
+    # still accept the deleted user's tokens.
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_NEGATIVE_TTL_SECONDS: int = 10
+    # Verified tokens are cached until they expire, so each is decoded once
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+
+    # Per-route request, query and job metrics served at /metrics to the admin token
+    METRICS_ENABLED: bool = True
+    # Debug/test mode: logs requests running more SQL statements than their budget, with the
+    # statements and the stack of each lazy load. Keyed by "METHOD /route/template", the
+    # authenticated routes include validate_user's user lookup on a cache miss.
+    # test/test_query_budgets.py holds every route to these.
+    QUERY_BUDGET_ENABLED: bool = False
+    QUERY_BUDGET_DEFAULT: int = 10
+    QUERY_BUDGETS: Dict[str, int] = {
+        "POST /api/auth/register": 3,
+        "POST /api/auth/login": 3,
+        "POST /api/auth/refresh": 3,
+        "GET /api/user/": 4,
+        "GET /api/user/in_progress_game": 2,
+        "GET /api/user/game_history": 3,
+        "GET /api/user/user_list": 2,
+        "DELETE /api/user/": 10,
+        "GET /api/game/new_game/{difficulty}": 5,
+        "PUT /api/game/update_game": 7,
+        "POST /api/challenges/": 12,
+        "GET /api/challenges/": 2,
+        "POST /api/challenges/{challenge_id}/respond": 4,
+        "POST /api/challenges/{challenge_id}/complete": 8,
+        "GET /api/leaderboard/": 7,
+        "GET /api/leaderboard/board/{difficulty}/{timespan}": 2,
+        "GET /api/leaderboard/board/{difficulty}/{timespan}/around_me": 2,
+        "GET /api/leaderboard/rivals": 3,
+    }
+    # Sampling profiler for live requests, off means the routes are not wrapped at all.
+    # A request is profiled when its X-Profile-Request header holds the admin token, or
+    # at random for PROFILER_SAMPLE_RATE of requests. The last PROFILER_MAX_PROFILES
+    # are served at /api/system/profiles to the admin token (X-Admin-Token), which also
+    # guards the other /api/system endpoints and /metrics.
+    PROFILER_ENABLED: bool = False
+    PROFILER_ADMIN_TOKEN: Union[str, None] = None
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_INTERVAL_SECONDS: float = 0.005
+    PROFILER_MAX_PROFILES: int = 20
+
+    # Spans for routes, controllers, SQL statements, background tasks and scheduler jobs,
+    # appended as JSON lines to TRACING_FILE. Requests return their trace id in X-Trace-Id.
+    TRACING_ENABLED: bool = False
+    TRACING_FILE: str = "traces.jsonl"
+
+    # Logs are queued and written by a background thread, as JSON lines (or plain text
+    # with LOG_JSON off) to stdout or LOG_FILE. LOG_LEVELS sets the level of single
+    # modules, e.g. {"src.API.Controllers.game_controller": "DEBUG"}. High-volume DEBUG
+    # events (the game state of every update) are sampled at LOG_DEBUG_SAMPLE_RATE.
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {}
+    LOG_JSON: bool = True
+    LOG_FILE: Union[str, None] = None
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+
+    # Token-bucket limits keyed by "METHOD /path", a rule also covers the paths below it
+    # (trailing slashes ignored). rate is tokens per second and must be above 0, burst the
+    # bucket size, at least 1, per is "ip" or "user". Invalid rules fail startup.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMITS: Dict[str, Dict[str, Union[float, str]]] = {
+        "POST /api/auth/login": {"rate": 0.2, "burst": 10, "per": "ip"},
+        "POST /api/auth/register": {"rate": 0.05, "burst": 5, "per": "ip"},
+        "POST /api/auth/refresh": {"rate": 0.5, "burst": 10, "per": "ip"},
+        "GET /api/game/new_game": {"rate": 0.2, "burst": 10, "per": "user"},
+        "POST /api/challenges/": {"rate": 0.1, "burst": 10, "per": "user"},
+    }
 
+    # Background jobs run in their own thread pool, never on the event loop
+    SCHEDULER_MAX_WORKERS: int = 2
+    SCHEDULER_JOB_TIMEOUT_SECONDS: int = 600
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 300
 
+    # Only the elected leader runs scheduled jobs and startup seeding
+    LEADER_ELECTION_ENABLED: bool = True
+    LEADER_LOCK_NAME: str = "sudoku-background-jobs"
+    LEADER_LEASE_SECONDS: int = 30
+    LEADER_HEARTBEAT_SECONDS: int = 10
 
+    # How long a process trusts its cached leaderboard version before re-reading it
+    LEADERBOARD_VERSION_CHECK_SECONDS: int = 5
+    # Bounds for the paginated leaderboard and "around me" window
+    LEADERBOARD_DEFAULT_PAGE_SIZE: int = 25
+    LEADERBOARD_MAX_PAGE_SIZE: int = 100
+    LEADERBOARD_MAX_WINDOW: int = 50
+    # Exact ranks are stored for the top N only, everyone else is placed with a score histogram
+    LEADERBOARD_EXACT_RANK_LIMIT: int = 1000
+    LEADERBOARD_HISTOGRAM_BIN_WIDTH: int = 50
+
+    # Schema migrations run in the background on the leader at startup. Backfills work
+    # in batches with a pause in between, DDL gives up instead of queueing behind long locks.
+    MIGRATIONS_ENABLED: bool = True
+    MIGRATION_BATCH_SIZE: int = 1000
+    MIGRATION_BATCH_PAUSE_SECONDS: float = 0.1
+    MIGRATION_LOCK_TIMEOUT_SECONDS: int = 5
+
+
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
+    """
+    The settings, read from the environment and .env once per process. Modules bind
+    the instance at import as `settings`, reload_settings() rebinds them.
+    """
     return Settings()
 
 
+def reload_settings() -> Settings:
+    """
+    Re-reads the environment and .env and rebinds every module-level `settings` that
+    still holds the previous instance, so code reading settings.X per call sees the new
+    values. Whatever was built from the settings at startup (engines and pools, cache
+    sizes, middleware, the scheduler) keeps its old configuration until restart.
+    """
+    previous = get_settings()
+    get_settings.cache_clear()
+    current = get_settings()
+    for module in list(sys.modules.values()):
+        if getattr(module, "__dict__", {}).get("settings") is previous:
+            module.settings = current
+    return current
+
+
 settings = get_settings()
@@ -0,0 +1,96 @@
+# src/Config/warmup.py
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+from src.Config.leader_election import is_leader
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts of a required warm-up that failed
+REQUIRED_RETRY_SECONDS = 5
+
+
+class Warmup(NamedTuple):
+    """
+    A startup task deferred until after the app accepts traffic. `func` is a coroutine
+    function or a blocking function (run in a worker thread). The app only reports
+    ready once every `required` warm-up is done; `leader_only` ones are skipped on
+    processes that are not the elected leader.
+    """
+    name: str
+    func: Callable
+    required: bool = False
+    leader_only: bool = False
+
+
+_startup_complete = False
+_status: Dict[str, dict] = {}
+_task: Optional[asyncio.Task] = None
+
+
+def mark_startup_complete():
+    """Called once the critical startup phase is done and the app can serve requests."""
+    global _startup_complete
+    _startup_complete = True
+
+
+async def _run_one(warmup: Warmup):
+    status = _status[warmup.name]
+    if warmup.leader_only and not is_leader():
+        status["state"] = "skipped"
+        return
+
+    while True:
+        status["state"] = "running"
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(warmup.func):
+                await warmup.func()
+            else:
+                await asyncio.to_thread(warmup.func)
+        except Exception as e:
+            logger.warning("Warm-up '%s' failed: %s", warmup.name, e)
+            status.update(state="failed", error=str(e), duration_seconds=round(time.perf_counter() - started, 3))
+            if not warmup.required:
+                return
+            await asyncio.sleep(REQUIRED_RETRY_SECONDS)
+            continue
+        status.update(state="done", error=None, duration_seconds=round(time.perf_counter() - started, 3))
+        logger.info("Warm-up '%s' done in %.2fs", warmup.name, status['duration_seconds'])
+        return
+
+
+async def _run_all(warmups: Sequence[Warmup]):
+    for warmup in warmups:
+        await _run_one(warmup)
+
+
+def start_warmups(warmups: Sequence[Warmup]) -> asyncio.Task:
+    """Runs the warm-ups one after the other, in order, in a background task."""
+    global _task
+    _status.clear()
+    for warmup in warmups:
+        _status[warmup.name] = {"state": "pending", "required": warmup.required, "error": None, "duration_seconds": None}
+    _task = asyncio.create_task(_run_all(list(warmups)))
+    return _task
+
+
+def stop_warmups():
+    """Cancels the warm-ups still pending. One already running in a thread finishes there."""
+    global _task, _startup_complete
+    if _task is not None and not _task.done():
+        _task.cancel()
+    _task = None
+    _startup_complete = False
+
+
+def get_warmup_status() -> Dict[str, dict]:
+    return {name: dict(status) for name, status in _status.items()}
+
+
+def is_ready() -> bool:
+    return _startup_complete and all(
+        status["state"] == "done" for status in _status.values() if status["required"]
+    )
@@ -0,0 +1,263 @@
+# src/Migrations/migrator.py
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Column, Index, MetaData, Table, and_, event, func, inspect, select, text, true, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from src.Config.database import Base
+from src.Config.settings import get_settings
+from src.Models.TableModels import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Batch progress is printed at most this often per migration
+PROGRESS_INTERVAL_SECONDS = 10
+
+
+class Migration(NamedTuple):
+    version: str
+    description: str
+    upgrade: Callable[["MigrationContext"], None]
+
+
+class MigrationInterrupted(Exception):
+    """Raised at the next batch boundary once stop_migrations() was called."""
+
+
+_stop_requested = threading.Event()
+_status: Dict[str, dict] = {}
+_status_lock = threading.Lock()
+
+
+def _set_status(version: str, **fields):
+    with _status_lock:
+        _status.setdefault(version, {}).update(fields)
+
+
+class MigrationContext:
+    """
+    What a migration's upgrade function works with. Every helper is idempotent, so a
+    migration that failed or was interrupted simply runs again on the next startup.
+    """
+
+    def __init__(self, engine: Engine, migration: Migration, batch_size: int, pause_seconds: float):
+        self.engine = engine
+        self.migration = migration
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self._last_report = None
+
+    @property
+    def is_postgresql(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def session(self) -> Session:
+        return Session(bind=self.engine, autoflush=False)
+
+    def table(self, name: str) -> Table:
+        """
+        The table as it is in the database right now, including columns added by earlier
+        steps. Columns the model declares keep the model's type (SQLite would reflect a
+        UUID column as NUMERIC).
+        """
+        model_table = Base.metadata.tables.get(name)
+        metadata = MetaData()
+
+        @event.listens_for(metadata, "column_reflect")
+        def _use_model_types(inspector, table, column_info):
+            if model_table is not None and column_info["name"] in model_table.c:
+                column_info["type"] = model_table.c[column_info["name"]].type
+
+        return Table(name, metadata, autoload_with=self.engine)
+
+    def checkpoint(self, done: int, total: Optional[int] = None):
+        """Called after every batch: records and prints progress, honours stop requests, then pauses."""
+        _set_status(self.migration.version, done=done, total=total)
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if self._last_report is None or finished or now - self._last_report >= PROGRESS_INTERVAL_SECONDS:
+            self._last_report = now
+            logger.info("Migration %s: %s%s rows done", self.migration.version, done, f'/{total}' if total is not None else '')
+        if _stop_requested.is_set():
+            raise MigrationInterrupted(f"Migration {self.migration.version} stopped after {done} rows.")
+        if self.pause_seconds > 0:
+            time.sleep(self.pause_seconds)
+
+    def create_index(self, index: Index):
+        """
+        Creates a model's index if it is missing. On PostgreSQL it is built CONCURRENTLY,
+        so reads and writes on the table carry on during the build. An invalid index left
+        behind by an interrupted concurrent build is dropped and built again.
+        """
+        if not self.is_postgresql:
+            index.create(bind=self.engine, checkfirst=True)
+            return
+
+        preparer = self.engine.dialect.identifier_preparer
+        name = preparer.quote(index.name)
+        columns = ", ".join(preparer.quote(column.name) for column in index.columns)
+        unique = "UNIQUE " if index.unique else ""
+        started = time.perf_counter()
+        with self.engine.connect() as connection:
+            # CONCURRENTLY cannot run inside a transaction block
+            connection.execution_options(isolation_level="AUTOCOMMIT")
+            valid = connection.execute(text(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+            ), {"name": index.name}).scalar()
+            if valid is not None and not valid:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            elif valid:
+                return
+            logger.info("Migration %s: building index %s concurrently...", self.migration.version, index.name)
+            connection.execute(text(
+                f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {preparer.format_table(index.table)} ({columns})"
+            ))
+        logger.info("Migration %s: index %s built in %.2fs", self.migration.version, index.name, time.perf_counter() - started)
+
+    def add_column(self, table_name: str, column: Column):
+        """
+        Adds a column if it is missing. Keep new columns nullable and without a volatile
+        default so PostgreSQL only updates the catalog, then fill them with update_in_batches.
+        The ALTER waits at most MIGRATION_LOCK_TIMEOUT_SECONDS for its table lock rather
+        than queueing every other query on the table behind it; it is retried next startup.
+        """
+        if column.name in {existing["name"] for existing in inspect(self.engine).get_columns(table_name)}:
+            return
+        if column.table is None:
+            Table(table_name, MetaData(), column)
+
+        preparer = self.engine.dialect.identifier_preparer
+        definition = CreateColumn(column).compile(dialect=self.engine.dialect)
+        with self.engine.begin() as connection:
+            if self.is_postgresql:
+                connection.execute(text(f"SET LOCAL lock_timeout = '{settings.MIGRATION_LOCK_TIMEOUT_SECONDS}s'"))
+            connection.execute(text(f"ALTER TABLE {preparer.quote(table_name)} ADD COLUMN {definition}"))
+
+    def update_in_batches(self, table: Table, values: dict, where=None, key: str = "id") -> int:
+        """
+        UPDATE table SET values [WHERE where], one short transaction per batch of rows,
+        walking the table in key order. `where` should exclude rows already done
+        (e.g. `table.c.new_column.is_(None)`), so a rerun continues where the last one
+        stopped. Returns the number of rows updated.
+        """
+        key_column = table.c[key]
+        condition = where if where is not None else true()
+        with self.engine.connect() as connection:
+            total = connection.execute(select(func.count()).select_from(table).where(condition)).scalar()
+
+        done, last_key = 0, None
+        while True:
+            page = condition if last_key is None else and_(condition, key_column > last_key)
+            with self.engine.begin() as connection:
+                keys = connection.execute(
+                    select(key_column).where(page).order_by(key_column).limit(self.batch_size)
+                ).scalars().all()
+                if not keys:
+                    break
+                connection.execute(update(table).where(key_column.in_(keys)).values(values))
+            done += len(keys)
+            last_key = keys[-1]
+            self.checkpoint(done, total)
+            if len(keys) < self.batch_size:
+                break
+        return done
+
+
+def _record(engine: Engine, migration: Migration, completed: bool):
+    with Session(bind=engine) as db:
+        row = db.get(SchemaMigration, migration.version)
+        now = datetime.utcnow()
+        if row is None:
+            row = SchemaMigration(version=migration.version, description=migration.description, started_at=now)
+            db.add(row)
+        if completed:
+            row.completed_at = now
+        else:
+            row.started_at = now
+        db.commit()
+
+
+def run_migrations(engine: Engine, migrations: Optional[Sequence[Migration]] = None,
+                   batch_size: Optional[int] = None, pause_seconds: Optional[float] = None) -> List[str]:
+    """
+    Applies, in order, every migration schema_migrations does not record as completed.
+    Stops at the first failure, since later migrations may depend on it; it is retried
+    on the next run. Returns the versions applied by this run.
+    """
+    if migrations is None:
+        from src.Migrations.versions import MIGRATIONS
+        migrations = MIGRATIONS
+    if batch_size is None:
+        batch_size = settings.MIGRATION_BATCH_SIZE
+    if pause_seconds is None:
+        pause_seconds = settings.MIGRATION_BATCH_PAUSE_SECONDS
+
+    _stop_requested.clear()
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with Session(bind=engine) as db:
+        completed = {
+            version for (version,) in db.query(SchemaMigration.version).filter(SchemaMigration.completed_at.isnot(None))
+        }
+
+    applied = []
+    for migration in migrations:
+        if migration.version in completed:
+            continue
+        logger.info("Applying migration %s: %s", migration.version, migration.description)
+        started = time.perf_counter()
+        _set_status(migration.version, state="running", done=None, total=None, error=None)
+        _record(engine, migration, completed=False)
+        try:
+            migration.upgrade(MigrationContext(engine, migration, batch_size, pause_seconds))
+        except MigrationInterrupted as e:
+            logger.info("%s It continues on the next startup.", e)
+            _set_status(migration.version, state="interrupted")
+            break
+        except Exception as e:
+            logger.warning("Migration %s failed, it is retried on the next startup: %s", migration.version, e)
+            _set_status(migration.version, state="failed", error=str(e))
+            break
+        duration = time.perf_counter() - started
+        _record(engine, migration, completed=True)
+        _set_status(migration.version, state="applied", duration_seconds=round(duration, 3))
+        applied.append(migration.version)
+        logger.info("Migration %s applied in %.2fs", migration.version, duration)
+    return applied
+
+
+def stop_migrations():
+    """Asks a running backfill to stop at its next batch boundary, e.g. on shutdown."""
+    _stop_requested.set()
+
+
+def get_migration_status(engine: Engine) -> Dict[str, dict]:
+    """
+    Every known migration with its state (applied, running, interrupted, failed or pending)
+    and, for runs in this process, the progress of its current batch loop.
+    """
+    from src.Migrations.versions import MIGRATIONS
+
+    with Session(bind=engine) as db:
+        rows = {row.version: row for row in db.query(SchemaMigration)}
+
+    status = {}
+    for migration in MIGRATIONS:
+        row = rows.get(migration.version)
+        entry = {
+            "description": migration.description,
+            "state": "applied" if row is not None and row.completed_at is not None else "pending",
+            "started_at": row.started_at if row is not None else None,
+            "completed_at": row.completed_at if row is not None else None,
+        }
+        with _status_lock:
+            entry.update(_status.get(migration.version, {}))
+        status[migration.version] = entry
+    return status
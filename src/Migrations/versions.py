@@ -0,0 +1,60 @@
+# src/Migrations/versions.py
+#
+# Ordered schema and data migrations. create_all only creates missing tables, so every
+# change to an existing table goes here. Append new migrations with the next version
+# and never edit one that has shipped, it is recorded as applied by its version.
+from src.Migrations.migrator import Migration, MigrationContext
+from src.Models.TableModels import Challenges, Games, Leaderboard, Puzzles, User
+from src.Services.leaderboard_services import build_score_buckets
+from src.Services.rivals_service import build_rival_index
+
+
+def _model_index(model, name: str):
+    return next(index for index in model.__table__.indexes if index.name == name)
+
+
+def _hot_query_indexes(ctx: MigrationContext):
+    """The composite indexes behind the profile, history, challenge list and new game queries."""
+    for model, name in (
+        (Puzzles, "ix_puzzles_difficulty_is_used"),
+        (Games, "ix_games_user_completed_last_played"),
+        (Games, "ix_games_user_completed_completed_at"),
+        (Games, "ix_games_completed_at"),
+        (Challenges, "ix_challenges_challenger_status_created"),
+        (Challenges, "ix_challenges_opponent_status_created"),
+        (Challenges, "ix_challenges_winner_status"),
+    ):
+        ctx.create_index(_model_index(model, name))
+
+
+def _leaderboard_board_index(ctx: MigrationContext):
+    """The index behind paging through a board and the window around a player."""
+    ctx.create_index(_model_index(Leaderboard, "ix_leaderboard_cache_board_rank"))
+
+
+def _best_score_indexes(ctx: MigrationContext):
+    """The indexes behind reading the all-time boards past the exact top N."""
+    for difficulty in ("easy", "medium", "hard"):
+        ctx.create_index(_model_index(User, f"ix_users_best_score_{difficulty}"))
+
+
+def _backfill_score_buckets(ctx: MigrationContext):
+    with ctx.session() as db:
+        build_score_buckets(db, ctx.batch_size, ctx.checkpoint)
+        db.commit()
+
+
+def _backfill_rival_index(ctx: MigrationContext):
+    with ctx.session() as db:
+        build_rival_index(db, checkpoint=ctx.checkpoint)
+        db.commit()
+
+
+MIGRATIONS = [
+    Migration("0001", "Composite indexes for the hot queries", _hot_query_indexes),
+    # Needs ix_games_completed_at to find the games within the bucket window
+    Migration("0002", "Backfill hourly score buckets", _backfill_score_buckets),
+    Migration("0003", "Backfill the challenge rival index", _backfill_rival_index),
+    Migration("0004", "Board rank index on the leaderboard cache", _leaderboard_board_index),
+    Migration("0005", "Best score indexes for the leaderboard tail", _best_score_indexes),
+]
@@ -1,7 +1,7 @@
 # SudokuApp-Backend/src/Models/TableModels.py
 
 import uuid
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, func, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID as pgUUID
 from sqlalchemy.orm import relationship
 import datetime # Import datetime
@@ -10,6 +10,12 @@ from src.Config.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # All-time boards past the exact top N are read by score
+        Index("ix_users_best_score_easy", "best_score_easy"),
+        Index("ix_users_best_score_medium", "best_score_medium"),
+        Index("ix_users_best_score_hard", "best_score_hard"),
+    )
 
     id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -34,6 +40,10 @@ class User(Base):
 
 class Puzzles(Base):
     __tablename__ = "puzzles"
+    __table_args__ = (
+        # new_game: an unused puzzle of one difficulty
+        Index("ix_puzzles_difficulty_is_used", "difficulty", "is_used"),
+    )
 
     id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     difficulty = Column(String(10), index=True, nullable=False) # Good to have a length
@@ -47,6 +57,14 @@ class Puzzles(Base):
 
 class Games(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # A user's most recent in-progress game
+        Index("ix_games_user_completed_last_played", "user_id", "was_completed", "last_played"),
+        # A user's completed games, newest first
+        Index("ix_games_user_completed_completed_at", "user_id", "was_completed", "completed_at"),
+        # Completed games within a time window (score bucket backfill)
+        Index("ix_games_completed_at", "completed_at"),
+    )
 
     id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -71,6 +89,13 @@ class Games(Base):
 
 class Challenges(Base):
     __tablename__ = "challenges"
+    __table_args__ = (
+        # Challenges of a user by role and status, newest first (my challenges, history, duplicates)
+        Index("ix_challenges_challenger_status_created", "challenger_id", "status", "created_at"),
+        Index("ix_challenges_opponent_status_created", "opponent_id", "status", "created_at"),
+        # Challenges won by a user (profile stats)
+        Index("ix_challenges_winner_status", "winner_id", "status"),
+    )
 
     id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     puzzle_id = Column(pgUUID(as_uuid=True), ForeignKey("puzzles.id"), nullable=False)
@@ -92,6 +117,10 @@ class Challenges(Base):
 
 class Leaderboard(Base):
     __tablename__ = "leaderboard_cache"
+    __table_args__ = (
+        # Serves paging through one board in rank order, user_id breaks ties
+        Index("ix_leaderboard_cache_board_rank", "timespan", "difficulty", "rank", "user_id"),
+    )
 
     # Composite Primary Key
     user_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
@@ -103,3 +132,78 @@ class Leaderboard(Base):
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="leaderboard_entries")
+
+class ChallengeRival(Base):
+    __tablename__ = "challenge_rivals"
+
+    # Adjacency index of the challenge graph, one row per direction of every pair.
+    # wins/losses are user_id's record against rival_id.
+    user_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    rival_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    challenges_count = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    last_challenged_at = Column(DateTime(timezone=True), nullable=True)
+
+class ScoreBucket(Base):
+    __tablename__ = "score_buckets"
+    __table_args__ = (
+        # Window rebuilds and expiry select buckets by time across all users
+        Index("ix_score_buckets_bucket_start", "bucket_start"),
+    )
+
+    # Best score per user and difficulty within one hour, maintained as games complete
+    user_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    difficulty = Column(String(10), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # Start of the UTC hour
+    best_score = Column(Integer, nullable=False)
+
+class ScoreHistogram(Base):
+    __tablename__ = "score_histograms"
+
+    # Score distribution of one board, used to place players outside the exact top N
+    difficulty = Column(String(10), primary_key=True)
+    timespan = Column(String(10), primary_key=True)
+    bin_width = Column(Integer, nullable=False)
+    counts = Column(Text, nullable=False)  # JSON object: {bin index: number of players}
+    total_players = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class LeaderboardVersion(Base):
+    __tablename__ = "leaderboard_versions"
+
+    # Bumped by the rebuild jobs, used to invalidate cached leaderboard responses
+    timespan = Column(String(10), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    # Lock-table fallback for leader election on databases without advisory locks
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    # Only a SHA-256 of each refresh token is stored. Rotation links a token to its
+    # successor, all tokens descending from one login share a family_id.
+    id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    family_id = Column(pgUUID(as_uuid=True), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by = Column(pgUUID(as_uuid=True), nullable=True)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    # One row per migration in src/Migrations, completed_at stays NULL until it finished
+    version = Column(String(50), primary_key=True)
+    description = Column(String(255), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -19,6 +19,11 @@ class AuthResponse(BaseModel):
     message: str
     token: Optional[str]
     userId: Optional[str] # Changed from UUID to str to match token payload and ease frontend use
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenPayload(BaseModel):
@@ -16,6 +16,8 @@ class UserRankEntry(BaseModel):
     """Defines the user's specific rank for a category."""
     total_score: int
     rank: int
+    percentile: Optional[float] = None  # Share of the board ranked at or below the user
+    is_exact: bool = True  # False when placed from the score histogram (outside the top N)
     
     class Config:
         from_attributes = True
@@ -43,4 +45,58 @@ class LeaderboardResponse(BaseModel):
     """The final, top-level API response model."""
     status: str
     message: str
-    data: FullLeaderboardData
\ No newline at end of file
+    data: FullLeaderboardData
+
+# --- Paginated boards ---
+
+class LeaderboardPageData(BaseModel):
+    """One page of a single (difficulty, timespan) board, in rank order."""
+    difficulty: str
+    timespan: str
+    page: int
+    page_size: int
+    entries: List[LeaderboardEntry]
+    is_exact: bool = True  # False when entries past the exact top N are ranked from the score histogram
+
+class LeaderboardWindowData(BaseModel):
+    """The requesting user's entry with up to N entries above and below it."""
+    difficulty: str
+    timespan: str
+    me: Optional[LeaderboardEntry] = None  # None if the user has no score on this board
+    above: List[LeaderboardEntry]
+    below: List[LeaderboardEntry]
+    is_exact: bool = True  # False when any rank is estimated from the score histogram
+
+class LeaderboardPageResponse(BaseModel):
+    status: str
+    message: str
+    data: LeaderboardPageData
+
+class LeaderboardWindowResponse(BaseModel):
+    status: str
+    message: str
+    data: LeaderboardWindowData
+
+
+# --- Rivals board ---
+
+class RivalEntry(BaseModel):
+    """One challenge partner, or the requesting user themselves (is_self)."""
+    user_id: UUID
+    username: str
+    best_score: int  # Best all-time score on the requested difficulty
+    wins: int  # Times this rival beat the requesting user
+    losses: int  # Times the requesting user beat this rival
+    challenges: int
+    rank: int
+    is_self: bool = False
+
+class RivalsLeaderboardData(BaseModel):
+    difficulty: str
+    sort_by: str  # "score" or "wins"
+    entries: List[RivalEntry]
+
+class RivalsLeaderboardResponse(BaseModel):
+    status: str
+    message: str
+    data: RivalsLeaderboardData
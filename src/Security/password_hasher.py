@@ -0,0 +1,172 @@
+# src/Security/password_hasher.py
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from src.Config.settings import get_settings
+
+# passlib and the process pool machinery are imported on the first password operation,
+# not at startup: most workers handle far more requests than logins
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from passlib.context import CryptContext
+
+settings = get_settings()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing when the hashing pool is saturated."""
+
+
+def _make_context(rounds: int) -> "CryptContext":
+    from passlib.context import CryptContext
+
+    # Hashes made with any other work factor are reported by needs_update / verify_and_update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
+
+# --- Runs inside the worker processes ---
+
+_worker_context: Optional["CryptContext"] = None
+
+
+def _init_worker(rounds: int):
+    global _worker_context
+    _worker_context = _make_context(rounds)
+
+
+def _hash(password: str) -> str:
+    return _worker_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return _worker_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so password hashing neither holds the GIL
+    nor occupies the request threadpool: async routes await the *_async methods, which
+    suspend on the pool's future instead of blocking a thread on it. At most `max_pending`
+    operations are queued or running; beyond that callers are rejected immediately with
+    PasswordHasherBusy. With `workers=0` hashing runs inline, in the calling thread or,
+    for the *_async methods, in the threadpool.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int, timeout: float):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._context: Optional["CryptContext"] = None
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._pool: Optional["ProcessPoolExecutor"] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_context(self) -> "CryptContext":
+        if self._context is None:
+            self._context = _make_context(self.rounds)
+        return self._context
+
+    def _get_pool(self) -> "ProcessPoolExecutor":
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    # spawn: never fork a process that already runs the scheduler and DB pool threads
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.rounds,)
+                    )
+        return self._pool
+
+    def _submit(self, func, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password operations in progress, try again shortly.")
+        try:
+            future = self._get_pool().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the worker finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, func, *args):
+        future = self._submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy("Password operation timed out, try again shortly.")
+
+    async def _run_async(self, func, *args):
+        future = self._submit(func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise PasswordHasherBusy("Password operation timed out, try again shortly.")
+
+    def hash(self, password: str) -> str:
+        if self.workers <= 0:
+            return self._get_context().hash(password)
+        return self._run(_hash, password)
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Returns (valid, new_hash). new_hash is set when a valid hash used another work factor."""
+        if self.workers <= 0:
+            return self._get_context().verify_and_update(password, hashed_password)
+        return self._run(_verify_and_update, password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        if self.workers <= 0:
+            return await run_in_threadpool(self._get_context().hash, password)
+        return await self._run_async(_hash, password)
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        if self.workers <= 0:
+            return await run_in_threadpool(self._get_context().verify_and_update, password, hashed_password)
+        return await self._run_async(_verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    rounds=settings.BCRYPT_ROUNDS,
+                    workers=settings.PASSWORD_HASH_WORKERS,
+                    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+                    timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS
+                )
+    return _hasher
+
+
+def shutdown_password_hasher():
+    global _hasher
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher.shutdown()
+            _hasher = None
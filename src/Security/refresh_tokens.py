@@ -0,0 +1,112 @@
+# src/Security/refresh_tokens.py
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session
+
+from src.Config.database import get_db_session_for_job
+from src.Config.settings import get_settings
+from src.Models.TableModels import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Claims copied from the refresh token into every access token minted from it
+ACCESS_CLAIMS = ("email", "username", "id")
+
+
+class RefreshTokenError(Exception):
+    """The refresh token is invalid, expired, revoked or was reused."""
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _issue(db: Session, claims: dict, family_id: Optional[uuid.UUID] = None) -> Tuple[uuid.UUID, str]:
+    token_id = uuid.uuid4()
+    family_id = family_id or uuid.uuid4()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+    token = jwt.encode(
+        {**claims, "type": "refresh", "jti": str(token_id), "exp": expires_at},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+    db.add(RefreshToken(
+        id=token_id,
+        user_id=uuid.UUID(claims["id"]),
+        family_id=family_id,
+        token_hash=_hash_token(token),
+        expires_at=expires_at.replace(tzinfo=None)
+    ))
+    return token_id, token
+
+
+def create_refresh_token(db: Session, claims: dict) -> str:
+    """Starts a new token family for a login. The caller commits."""
+    return _issue(db, {key: claims[key] for key in ACCESS_CLAIMS})[1]
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[dict, str]:
+    """
+    Exchanges a refresh token for its successor and returns (access token claims, new refresh token).
+    Costs a signature check and one lookup on the token_hash index, no password hashing.
+
+    Every refresh token can be used once. Presenting one that was already rotated means it
+    leaked, so its whole family is revoked and the user has to log in again.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise RefreshTokenError("Invalid or expired refresh token")
+    if payload.get("type") != "refresh":
+        raise RefreshTokenError("Not a refresh token")
+
+    stored = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == _hash_token(token)
+    ).with_for_update().first()
+    if stored is None:
+        raise RefreshTokenError("Unknown refresh token")
+
+    now = datetime.utcnow()
+    if stored.revoked_at is not None:
+        db.query(RefreshToken).filter(
+            RefreshToken.family_id == stored.family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+        db.commit()
+        raise RefreshTokenError("Refresh token was already used, please log in again")
+
+    claims = {key: payload.get(key) for key in ACCESS_CLAIMS}
+    new_id, new_token = _issue(db, claims, stored.family_id)
+    stored.revoked_at = now
+    stored.replaced_by = new_id
+    db.commit()
+    return claims, new_token
+
+
+def purge_expired_refresh_tokens():
+    """Deletes refresh tokens past their expiry, they can no longer be used or reused."""
+    logger.info("Running job: purge_expired_refresh_tokens")
+    db_gen = get_db_session_for_job()
+    db = next(db_gen, None)
+    if not db:
+        return
+
+    try:
+        deleted = db.query(RefreshToken).filter(
+            RefreshToken.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.commit()
+        logger.info("Purged %s expired refresh tokens.", deleted)
+    except Exception as e:
+        logger.error("Error purging refresh tokens: %s", e)
+        db.rollback()
+    finally:
+        db.close()
@@ -1,57 +1,167 @@
+import hmac
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import HTTPException, Depends, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 from src.Config.settings import settings
-from src.Config.database import get_db_session
+from src.Config.database import getSessionLocal
+from src.Config import async_database
 from src.Models.TableModels import User
 from src.Schemas.auth_schema import TokenPayload
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+from src.Security.password_hasher import get_password_hasher
+from src.Services.ttl_cache import TTLCache
 
 http_bearer = HTTPBearer()
 
+# user id -> True if the user exists, False for unknown (or revoked) ids. Account removal
+# invalidates its entry in the process that served it; other processes keep accepting the
+# user's tokens for up to USER_CACHE_TTL_SECONDS
+_verified_users = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# token signature -> (encoded token, TokenPayload), each entry expires at the token's exp
+_decoded_tokens = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
+
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return (await get_password_hasher().verify_and_update_async(plain_password, hashed_password))[0]
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifies a password and returns a new hash when the stored one uses an outdated work factor."""
+    return await get_password_hasher().verify_and_update_async(plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await get_password_hasher().hash_async(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def validate_user(token: HTTPAuthorizationCredentials = Depends(http_bearer), db: Session = Depends(get_db_session)) -> TokenPayload:
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    Verifies a JWT and returns its payload. Verified tokens are cached until their exp, keyed
+    by signature; a hit still compares the whole token, so a forged header or payload paired
+    with a known signature is decoded (and rejected) as usual. Raises JWTError.
+    """
+    signature = token.rpartition(".")[2]
+    encoded = token.encode()
+    cached = _decoded_tokens.get(signature)
+    if cached is not None and hmac.compare_digest(cached[0], encoded):
+        return cached[1]
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if payload.get("type") == "refresh":
+        raise JWTError("Refresh tokens cannot be used as access tokens")
+    token_data = TokenPayload(**payload)
+    if isinstance(payload.get("exp"), (int, float)):
+        _decoded_tokens.set(signature, (encoded, token_data), expires_at=payload["exp"])
+    return token_data
+
+
+def _user_exists(user_id) -> bool:
+    """
+    Checks that a token's user still exists. Answers come from the verified-user cache;
+    only a miss opens a session for one primary key lookup.
+    """
+    cached = _verified_users.get(user_id)
+    if cached is not None:
+        return cached
+
+    SessionLocal = getSessionLocal()
+    if SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+
+    db: Session = SessionLocal()
+    try:
+        exists = db.query(User.id).filter(User.id == user_id).first() is not None
+    finally:
+        db.close()
+
+    _remember_user(user_id, exists)
+    return exists
+
+
+async def _user_exists_async(user_id) -> bool:
+    """_user_exists for the async stack, a miss is looked up without blocking the event loop."""
+    cached = _verified_users.get(user_id)
+    if cached is not None:
+        return cached
+
+    if async_database.AsyncSessionLocal is None:
+        raise RuntimeError("Async database not initialized. Call init_async_database() first.")
+
+    async with async_database.AsyncSessionLocal() as db:
+        exists = (await db.execute(select(User.id).where(User.id == user_id).limit(1))).first() is not None
+
+    _remember_user(user_id, exists)
+    return exists
+
+
+def _remember_user(user_id, exists: bool):
+    # Unknown ids are cached briefly so a user created right after is seen quickly
+    _verified_users.set(user_id, exists, ttl=None if exists else settings.USER_CACHE_NEGATIVE_TTL_SECONDS)
+
+
+def _forget_tokens(user_id):
+    _decoded_tokens.pop_matching(lambda entry: entry[1].id == user_id)
+
+
+def invalidate_cached_user(user_id):
+    """Drops a user from the verification and token caches, e.g. after deleting the account."""
+    _verified_users.pop(user_id)
+    _forget_tokens(user_id)
+
+
+def deny_cached_user(user_id):
+    """
+    Rejects a user's tokens in this process right away, e.g. on a ban. The cache is
+    process-local and time-bound, so the ban itself must also be enforced at the source.
+    """
+    _verified_users.set(user_id, False)
+    _forget_tokens(user_id)
+
+
+def validate_user(token: HTTPAuthorizationCredentials = Depends(http_bearer)) -> TokenPayload:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = TokenPayload(**payload)
-        user = db.query(User).get(token_data.id)
-        if user is None:
+        token_data = decode_access_token(token.credentials)
+        if token_data.id is None or not _user_exists(token_data.id):
             raise credentials_exception
         return token_data
     
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+
+async def validate_user_async(token: HTTPAuthorizationCredentials = Depends(http_bearer)) -> TokenPayload:
+    """validate_user for async routes. Token decoding is CPU only and served from the token cache."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        token_data = decode_access_token(token.credentials)
+        if token_data.id is None or not await _user_exists_async(token_data.id):
+            raise credentials_exception
+        return token_data
+
+    except JWTError:
+        raise credentials_exception
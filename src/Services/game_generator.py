@@ -1,3 +1,4 @@
+import logging
 import random
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
@@ -5,6 +6,9 @@ from src.Config.settings import get_settings
 from src.Config.database import getSessionLocal
 from src.Services.puzzle_service import add_games_to_db_util, get_games_count_util
 from src.Config.database import getSessionLocal
+from src.Services.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 # --- Core Backtracking Algorithm ---
 def _fill_grid(grid: List[List[int]]) -> bool:
@@ -80,6 +84,7 @@ def _poke_holes(grid: List[List[int]], holes: int) -> List[List[int]]:
 
 
 # --- Main Public Function ---
+@traced()
 def generate_games(difficulty: str) -> List[Dict[str, str]]:
     """
     Generates a specified number of Sudoku puzzles for a given difficulty.
@@ -106,7 +111,7 @@ def generate_games(difficulty: str) -> List[Dict[str, str]]:
     blanks_to_create = blanks_map[difficulty]
     generated_puzzles = []
     
-    print(f"Starting job to generate {num_to_generate} puzzles of '{difficulty}' difficulty...")
+    logger.info("Starting job to generate %s puzzles of '%s' difficulty...", num_to_generate, difficulty)
 
     for i in range(num_to_generate):
         grid = [[0 for _ in range(9)] for _ in range(9)]
@@ -119,22 +124,23 @@ def generate_games(difficulty: str) -> List[Dict[str, str]]:
             "board_string": board_string,
             "solution_string": solution_string,
         })
-        print(f"  ...Generated puzzle {i + 1}/{num_to_generate}")
+        logger.debug("Generated puzzle %s/%s", i + 1, num_to_generate)
 
-    print("Puzzle generation job complete.")
+    logger.info("Puzzle generation job complete.")
     return generated_puzzles
 
 
+@traced()
 def generate_and_add_puzzles_task(difficulty: str):
     """
     Background task to generate and add new puzzles to the database.
     This function creates its own database session.
     """
-    print(f"Background task triggered: Generating puzzles for '{difficulty}'...")
+    logger.info("Background task triggered: Generating puzzles for '%s'...", difficulty)
     dbSessonLocal = getSessionLocal()
     
     if not dbSessonLocal:
-        print("Error: Could not get database session for background task.")
+        logger.error("Could not get database session for background task.")
         return
 
     db: Session = dbSessonLocal()
@@ -142,25 +148,26 @@ def generate_and_add_puzzles_task(difficulty: str):
         puzzles = generate_games(difficulty)
         add_games_to_db_util(db, puzzles, difficulty)
         
-        print(f"Background task complete: Added {len(puzzles)} new '{difficulty}' puzzles.")
+        logger.info("Background task complete: Added %s new '%s' puzzles.", len(puzzles), difficulty)
     except Exception as e:
-        print(f"Error in background puzzle generation task: {e}")
+        logger.error("Error in background puzzle generation task: %s", e)
         db.rollback()
     finally:
         db.close()
 
 
 
+@traced()
 def generate_initial_games():
     """
     Checks if the DB is empty and seeds it with initial puzzles.
     This function creates and manages its own DB session to be thread-safe.
     """
-    print("Checking if initial game seeding is needed...")
+    logger.info("Checking if initial game seeding is needed...")
     dbSessonLocal = getSessionLocal()
     
     if not dbSessonLocal:
-        print("Error: Could not get DB Session for generate_initial_games")
+        logger.error("Could not get DB Session for generate_initial_games")
         return
     
     db: Session = dbSessonLocal()
@@ -169,7 +176,7 @@ def generate_initial_games():
         # Use the imported util function
         count = get_games_count_util(db)
         if count == 0:
-            print("Seeding database with initial puzzles...")
+            logger.info("Seeding database with initial puzzles...")
             puzzles = generate_games('easy')
             add_games_to_db_util(db,puzzles, "easy")
 
@@ -179,26 +186,27 @@ def generate_initial_games():
             puzzles = generate_games('hard')
             add_games_to_db_util(db, puzzles, "hard")
 
-            print("Games generated and added to DB")
+            logger.info("Games generated and added to DB")
         else:
-            print("Games already exist in DB")
+            logger.info("Games already exist in DB")
     except Exception as e:
-        print(f"Error during initial game generation: {e}")
+        logger.error("Error during initial game generation: %s", e)
         db.rollback()
     finally:
         db.close()
 
 
+@traced()
 def generate_and_save_puzzles_background_task(difficulty: str):
     """
     Background task to generate and add new puzzles to the database.
     This function creates its own database session.
     """
-    print(f"Background task triggered: Generating puzzles for '{difficulty}'...")
+    logger.info("Background task triggered: Generating puzzles for '%s'...", difficulty)
     dbSessonLocal = getSessionLocal()
 
     if not dbSessonLocal:
-        print("Error: Could not get database session for background task.")
+        logger.error("Could not get database session for background task.")
         return
 
     db: Session = dbSessonLocal()
@@ -207,9 +215,9 @@ def generate_and_save_puzzles_background_task(difficulty: str):
         puzzles = generate_games(difficulty)
         add_games_to_db_util(db, puzzles, difficulty)
         
-        print(f"Background task complete: Added {len(puzzles)} new '{difficulty}' puzzles.")
+        logger.info("Background task complete: Added %s new '%s' puzzles.", len(puzzles), difficulty)
     except Exception as e:
-        print(f"Error in background puzzle generation task: {e}")
+        logger.error("Error in background puzzle generation task: %s", e)
         db.rollback()
     finally:
         db.close()
\ No newline at end of file
@@ -0,0 +1,130 @@
+# src/Services/leaderboard_histograms.py
+import bisect
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.Models.TableModels import ScoreHistogram
+from src.Services.leaderboard_response_cache import get_leaderboard_version
+
+
+class Histogram:
+    """
+    Score distribution of one board, prepared for lookups: bins sorted by
+    descending score with the number of players ranked strictly above each bin.
+    """
+
+    def __init__(self, bin_width: int, counts: Dict[int, int]):
+        self.bin_width = bin_width
+        self.total_players = sum(counts.values())
+        self._counts = counts
+        # Ascending bin indexes with the number of players in strictly higher bins
+        self._bins: List[int] = sorted(counts)
+        self._players_above: List[int] = []
+        above = self.total_players
+        for index in self._bins:
+            above -= counts[index]
+            self._players_above.append(above)
+
+    def estimate(self, score: int) -> Tuple[int, float]:
+        """
+        Approximate (rank, percentile) of a score. Players within the score's own
+        bin are assumed to be spread evenly across it.
+        """
+        if self.total_players == 0:
+            return 1, 100.0
+
+        bin_index = score // self.bin_width
+        position = bisect.bisect_right(self._bins, bin_index)
+        if position == 0:
+            above = self.total_players
+        else:
+            above = self._players_above[position - 1]
+
+        if position > 0 and self._bins[position - 1] == bin_index:
+            in_bin = self._counts[bin_index]
+            fraction_above = (self.bin_width - 1 - score % self.bin_width) / self.bin_width
+            above += int(in_bin * fraction_above)
+
+        rank = above + 1
+        return rank, self.percentile(rank)
+
+    def score_range(self, first: int, last: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Scores [low, high) of the bins holding board positions `first` to `last`, with the
+        number of players in bins above `high`. None if `first` is past the last player.
+        """
+        if first > self.total_players or not self._bins:
+            return None
+        high_index = low_index = None
+        players_above_high = 0
+        for position in reversed(range(len(self._bins))):
+            index, above = self._bins[position], self._players_above[position]
+            if high_index is None and first <= above + self._counts[index]:
+                high_index, players_above_high = index, above
+            if last <= above + self._counts[index]:
+                low_index = index
+                break
+        if low_index is None:
+            low_index = self._bins[0]
+        return low_index * self.bin_width, (high_index + 1) * self.bin_width, players_above_high
+
+    def percentile(self, rank: int) -> float:
+        """Share of the board's players ranked at or below `rank`, in percent."""
+        if self.total_players == 0:
+            return 100.0
+        players_at_or_below = max(self.total_players - (rank - 1), 0)
+        return round(100.0 * players_at_or_below / self.total_players, 1)
+
+
+# Process-local copy of every histogram, reloaded when the leaderboard version changes
+_histograms: Optional[Tuple[tuple, Dict[Tuple[str, str], Histogram]]] = None
+# Reentrant: async requests load through run_sync on the event loop thread, where a
+# coroutine suspended inside a plain lock would block the next one, and the loop with it
+_load_lock = threading.RLock()
+
+
+def save_histograms(db: Session, timespan: str, bin_width: int, rows: Iterable):
+    """
+    Replaces the histograms of one timespan from (difficulty, bin, players) rows.
+    Runs inside the rebuild transaction, which also bumps the leaderboard version.
+    """
+    counts_by_difficulty: Dict[str, Dict[int, int]] = {}
+    for difficulty, bin_index, players in rows:
+        counts_by_difficulty.setdefault(difficulty, {})[int(bin_index)] = int(players)
+
+    db.query(ScoreHistogram).filter(ScoreHistogram.timespan == timespan).delete(synchronize_session=False)
+    db.add_all([
+        ScoreHistogram(
+            difficulty=difficulty,
+            timespan=timespan,
+            bin_width=bin_width,
+            counts=json.dumps(counts),
+            total_players=sum(counts.values()),
+            updated_at=datetime.utcnow()
+        )
+        for difficulty, counts in counts_by_difficulty.items()
+    ])
+
+
+def get_histogram(db: Session, difficulty: str, timespan: str) -> Optional[Histogram]:
+    """Returns a board's histogram, read from the database only after a rebuild."""
+    global _histograms
+    version = get_leaderboard_version(db)
+    loaded = _histograms
+    if loaded is None or loaded[0] != version:
+        with _load_lock:
+            loaded = _histograms
+            if loaded is None or loaded[0] != version:
+                histograms = {
+                    (row.difficulty, row.timespan): Histogram(
+                        row.bin_width,
+                        {int(index): players for index, players in json.loads(row.counts).items()}
+                    )
+                    for row in db.query(ScoreHistogram).all()
+                }
+                loaded = _histograms = (version, histograms)
+    return loaded[1].get((difficulty, timespan))
@@ -0,0 +1,134 @@
+# src/Services/leaderboard_response_cache.py
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.Config.settings import get_settings
+from src.Models.TableModels import LeaderboardVersion
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+
+# Process-local cache of the pre-encoded top players block, tagged with the
+# leaderboard version it was built from: (version, encoded_json)
+_top_players_entry: Optional[Tuple[tuple, bytes]] = None
+# Serializes builds on the threadpool path. The async path runs on the event loop thread,
+# where a thread lock excludes nothing, so it waits on the build in _async_builds instead.
+_build_lock = threading.Lock()
+# version -> future of the build in progress on the event loop, awaited by concurrent misses
+_async_builds: Dict[tuple, "asyncio.Future"] = {}
+
+# Last version read from the database and when it was read (monotonic)
+_known_version: Optional[tuple] = None
+_version_checked_at = 0.0
+
+
+def get_leaderboard_version(db: Session) -> tuple:
+    """
+    Returns the current leaderboard version, one (timespan, version) pair per rebuilt board.
+    The rebuild jobs run on the leader only, so other processes learn about new versions
+    by re-reading the tiny versions table at most every LEADERBOARD_VERSION_CHECK_SECONDS.
+    """
+    global _known_version, _version_checked_at
+    now = time.monotonic()
+    if _known_version is not None and now - _version_checked_at < settings.LEADERBOARD_VERSION_CHECK_SECONDS:
+        return _known_version
+
+    rows = db.query(LeaderboardVersion.timespan, LeaderboardVersion.version).order_by(LeaderboardVersion.timespan).all()
+    _known_version = tuple((row.timespan, row.version) for row in rows)
+    _version_checked_at = now
+    return _known_version
+
+
+def get_cached_top_players(db: Session, build: Callable[[], bytes]) -> bytes:
+    """
+    Returns the encoded top players block, calling `build` only when the leaderboard
+    version changed since the cached block was built. Concurrent misses build it once.
+    """
+    version = get_leaderboard_version(db)
+    entry = _top_players_entry
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _build_lock:
+        return _build_top_players(version, build)
+
+
+def _build_top_players(version: tuple, build: Callable[[], bytes]) -> bytes:
+    global _top_players_entry
+    entry = _top_players_entry
+    if entry is not None and entry[0] == version:
+        # Another request built it while we were waiting for the lock
+        return entry[1]
+
+    encoded = build()
+    _top_players_entry = (version, encoded)
+    return encoded
+
+
+async def get_cached_top_players_async(db: "AsyncSession", build: Callable[[Session], bytes]) -> bytes:
+    """
+    get_cached_top_players for the async stack. `build` runs on the sync view of the
+    session through run_sync, and concurrent misses await the one build in progress.
+    """
+    global _top_players_entry
+    version = await db.run_sync(get_leaderboard_version)
+    entry = _top_players_entry
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    loop = asyncio.get_running_loop()
+    pending = _async_builds.get(version)
+    if pending is not None and pending.get_loop() is loop:
+        encoded = await asyncio.shield(pending)
+        if encoded is not None:
+            return encoded
+        # That build failed, try once more ourselves
+
+    future = loop.create_future()
+    _async_builds[version] = future
+    encoded = None
+    try:
+        encoded = await db.run_sync(build)
+        _top_players_entry = (version, encoded)
+        return encoded
+    finally:
+        future.set_result(encoded)
+        if _async_builds.get(version) is future:
+            del _async_builds[version]
+
+
+def bump_leaderboard_version(db: Session, timespan: str):
+    """
+    Marks a leaderboard as rebuilt. Must be called inside the rebuild transaction
+    so the new version becomes visible together with the new rows.
+    """
+    entry = db.get(LeaderboardVersion, timespan)
+    if entry is None:
+        entry = LeaderboardVersion(timespan=timespan, version=0)
+        db.add(entry)
+    entry.version = (entry.version or 0) + 1
+    entry.updated_at = datetime.utcnow()
+
+
+def get_leaderboard_updated_at(db: Session) -> Dict[str, datetime]:
+    """When each board was last rebuilt, as naive UTC datetimes, keyed by timespan."""
+    rows = db.query(LeaderboardVersion.timespan, LeaderboardVersion.updated_at).all()
+    return {
+        row.timespan: row.updated_at.astimezone(timezone.utc).replace(tzinfo=None) if row.updated_at.tzinfo else row.updated_at
+        for row in rows
+    }
+
+
+def invalidate_leaderboard_cache():
+    """Drops the local cache so the next request re-reads the version and rebuilds."""
+    global _top_players_entry, _known_version
+    _top_players_entry = None
+    _known_version = None
+
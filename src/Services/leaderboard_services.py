@@ -1,25 +1,23 @@
 # src/Services/leaderboard_service.py
-from sqlalchemy import text
+import logging
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import UUID as pgUUID
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, time
-from src.Config.database import getSessionLocal
-from src.Models.TableModels import Leaderboard, User, Games, Puzzles
-
-def get_db_session_for_job():
-    """Creates a new, independent DB session for background jobs."""
-    SessionLocal = getSessionLocal()
-    if not SessionLocal:
-        print("Error: SessionLocal is not initialized.")
-        return None
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+from datetime import datetime, timedelta, time, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from src.Config.database import dialect_insert, get_db_session_for_job, iter_in_batches
+from src.Config.settings import get_settings
+from src.Models.TableModels import Leaderboard, User, Games, Puzzles, ScoreBucket
+from src.Services.leaderboard_response_cache import bump_leaderboard_version, invalidate_leaderboard_cache
+from src.Services.leaderboard_histograms import save_histograms
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
 
 def update_all_time_high_leaderboard():
     """Calculates and caches the 'All time high' leaderboard."""
-    print("Running job: update_all_time_high_leaderboard")
+    logger.info("Running job: update_all_time_high_leaderboard")
     db_gen = get_db_session_for_job()
     db = next(db_gen, None)
     if not db:
@@ -31,7 +29,7 @@ def update_all_time_high_leaderboard():
 
         # Base query to rank users by their best scores
         # We use text() for the UNION and RANK() as it's cleaner
-        sql_query = text("""
+        scores_cte = """
         WITH all_scores AS (
             SELECT 
                 id as user_id, 
@@ -53,7 +51,11 @@ def update_all_time_high_leaderboard():
                 'hard' as difficulty, 
                 best_score_hard as total_score 
             FROM users WHERE best_score_hard > 0
-        ),
+        )
+        """
+
+        # Only the top N get an exact rank row, everyone else is placed with the histogram
+        sql_query = text(scores_cte + """,
         ranked_scores AS (
             SELECT 
                 user_id, 
@@ -63,10 +65,16 @@ def update_all_time_high_leaderboard():
                 RANK() OVER(PARTITION BY difficulty ORDER BY total_score DESC) as rank
             FROM all_scores
         )
-        SELECT * FROM ranked_scores
+        SELECT * FROM ranked_scores WHERE rank <= :rank_limit
+        """).columns(user_id=pgUUID(as_uuid=True))
+
+        histogram_query = text(scores_cte + """
+        SELECT difficulty, total_score / :bin_width AS bin, COUNT(*) AS players
+        FROM all_scores
+        GROUP BY 1, 2
         """)
 
-        results = db.execute(sql_query).mappings().all()
+        results = db.execute(sql_query, {"rank_limit": settings.LEADERBOARD_EXACT_RANK_LIMIT}).mappings().all()
         new_entries = []
         for row in results:
             new_entries.append(
@@ -82,19 +90,194 @@ def update_all_time_high_leaderboard():
             )
         
         db.add_all(new_entries)
+        bin_width = settings.LEADERBOARD_HISTOGRAM_BIN_WIDTH
+        save_histograms(db, 'all_time', bin_width, db.execute(histogram_query, {"bin_width": bin_width}).all())
+        bump_leaderboard_version(db, 'all_time')
+        db.commit()
+        invalidate_leaderboard_cache()
+        logger.info("Successfully updated 'all_time' leaderboard with %s entries.", len(new_entries))
+
+    except Exception as e:
+        logger.error("Error updating 'all_time' leaderboard: %s", e)
+        db.rollback()
+    finally:
+        db.close()
+
+
+# Windows served from the hourly score buckets, in addition to 'all_time'
+PERIODIC_TIMESPANS = ['daily', 'weekly', 'last_24h', 'last_7d', 'monthly']
+# Buckets older than the longest window are never read again
+BUCKET_RETENTION = timedelta(days=30)
+
+
+def _hour_start(moment: datetime) -> datetime:
+    """Truncates a timestamp to the start of its UTC hour, as a naive UTC datetime."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def get_window_start(timespan: str, now_utc: datetime) -> Optional[datetime]:
+    """First bucket included in a window. Calendar windows start at midnight / Monday, rolling ones count back whole hours."""
+    current_hour = _hour_start(now_utc)
+    if timespan == 'daily':
+        return datetime.combine(now_utc.date(), time.min)
+    if timespan == 'weekly':
+        return datetime.combine(now_utc.date() - timedelta(days=now_utc.weekday()), time.min)
+    if timespan == 'last_24h':
+        return current_hour - timedelta(hours=23)
+    if timespan == 'last_7d':
+        return current_hour - timedelta(days=7) + timedelta(hours=1)
+    if timespan == 'monthly':
+        return current_hour - BUCKET_RETENTION + timedelta(hours=1)
+    return None
+
+
+def record_score_bucket(db: Session, user_id, difficulty: str, score: int, completed_at: Optional[datetime] = None):
+    """
+    Folds a completed game into its hourly bucket with a single upsert, so concurrent
+    games of the same user and hour never race on the bucket. Runs inside the caller's
+    transaction, so the bucket is committed together with the game.
+    """
+    if not score or score <= 0:
+        return
+    _upsert_score_buckets(db, [{
+        "user_id": user_id, "difficulty": difficulty,
+        "bucket_start": _hour_start(completed_at or datetime.utcnow()), "best_score": score
+    }])
+
+
+def _upsert_score_buckets(db: Session, rows):
+    """Inserts bucket rows, keeping the higher best_score where a bucket already exists."""
+    insert = dialect_insert(db, ScoreBucket).values(rows)
+    # GREATEST on PostgreSQL, the two-argument scalar MAX on SQLite
+    greatest = func.greatest if db.get_bind().dialect.name == "postgresql" else func.max
+    db.execute(insert.on_conflict_do_update(
+        index_elements=[ScoreBucket.user_id, ScoreBucket.difficulty, ScoreBucket.bucket_start],
+        set_={"best_score": greatest(ScoreBucket.best_score, insert.excluded.best_score)}
+    ))
+
+
+def get_user_scores(db: Session, user_id, categories: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    """
+    Current score of one user for each (difficulty, timespan): the best_score_* column
+    for 'all_time', the best bucket inside the window otherwise. At most two queries.
+    """
+    categories = list(categories)
+    scores = {}
+    now_utc = datetime.utcnow()
+
+    if any(timespan == 'all_time' for _, timespan in categories):
+        db_user = db.get(User, user_id)
+        for difficulty, timespan in categories:
+            if timespan == 'all_time':
+                scores[(difficulty, timespan)] = (getattr(db_user, f"best_score_{difficulty}", 0) or 0) if db_user else 0
+
+    window_starts = {
+        timespan: get_window_start(timespan, now_utc)
+        for _, timespan in categories if timespan != 'all_time'
+    }
+    window_starts = {timespan: start for timespan, start in window_starts.items() if start is not None}
+    if window_starts:
+        buckets = db.query(ScoreBucket.difficulty, ScoreBucket.bucket_start, ScoreBucket.best_score).filter(
+            ScoreBucket.user_id == user_id,
+            ScoreBucket.bucket_start >= min(window_starts.values())
+        ).all()
+        for difficulty, timespan in categories:
+            if timespan in window_starts:
+                scores[(difficulty, timespan)] = max(
+                    (bucket.best_score for bucket in buckets
+                     if bucket.difficulty == difficulty and _hour_start(bucket.bucket_start) >= window_starts[timespan]),
+                    default=0
+                )
+    return scores
+
+
+def expire_score_buckets():
+    """Deletes buckets that have fallen out of every window."""
+    logger.info("Running job: expire_score_buckets")
+    db_gen = get_db_session_for_job()
+    db = next(db_gen, None)
+    if not db:
+        return
+
+    try:
+        cutoff = _hour_start(datetime.utcnow()) - BUCKET_RETENTION
+        deleted = db.query(ScoreBucket).filter(ScoreBucket.bucket_start < cutoff).delete(synchronize_session=False)
         db.commit()
-        print(f"Successfully updated 'all_time' leaderboard with {len(new_entries)} entries.")
+        logger.info("Expired %s score buckets older than %s.", deleted, cutoff)
+    except Exception as e:
+        logger.error("Error expiring score buckets: %s", e)
+        db.rollback()
+    finally:
+        db.close()
 
+
+def build_score_buckets(db: Session, batch_size: int = 1000, checkpoint: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Builds buckets from the games completed within the retention window, reading the
+    games in batches. `checkpoint` is called with the number of games read after each
+    batch. Each batch is upserted like record_score_bucket does, so the backfill can be
+    rerun and runs safely alongside live games. The caller commits.
+    """
+    since = _hour_start(datetime.utcnow()) - BUCKET_RETENTION
+    completed_games = db.query(
+        Games.id, Games.user_id, Puzzles.difficulty, Games.completed_at, Games.final_score
+    ).join(Puzzles, Games.puzzle_id == Puzzles.id).filter(
+        Games.was_completed == True,
+        Games.completed_at >= since,
+        Games.final_score > 0
+    )
+
+    buckets_written = 0
+    games_read = 0
+    for batch in iter_in_batches(db, completed_games, Games.id, batch_size):
+        # One row per bucket, a statement may not upsert the same row twice
+        best_scores = {}
+        for row in batch:
+            key = (row.user_id, row.difficulty, _hour_start(row.completed_at))
+            best_scores[key] = max(best_scores.get(key, 0), row.final_score)
+        if best_scores:
+            _upsert_score_buckets(db, [
+                {"user_id": user_id, "difficulty": difficulty, "bucket_start": bucket_start, "best_score": score}
+                for (user_id, difficulty, bucket_start), score in best_scores.items()
+            ])
+        buckets_written += len(best_scores)
+        games_read += len(batch)
+        if checkpoint is not None:
+            checkpoint(games_read)
+    return buckets_written
+
+
+def backfill_score_buckets():
+    """
+    Builds buckets from the games completed within the retention window. Needed once
+    after deploying the bucket table, harmless to run again.
+    """
+    logger.info("Running job: backfill_score_buckets")
+    db_gen = get_db_session_for_job()
+    db = next(db_gen, None)
+    if not db:
+        return
+
+    try:
+        written = build_score_buckets(db)
+        db.commit()
+        if written:
+            logger.info("Backfilled %s score buckets.", written)
     except Exception as e:
-        print(f"Error updating 'all_time' leaderboard: {e}")
+        logger.error("Error backfilling score buckets: %s", e)
         db.rollback()
     finally:
         db.close()
 
 
 def update_periodic_leaderboard(timespan: str = 'daily'):
-    """Calculates and caches the 'daily' or 'weekly' leaderboard."""
-    print(f"Running job: update_periodic_leaderboard for '{timespan}'")
+    """
+    Calculates and caches a windowed leaderboard ('daily', 'weekly', 'last_24h', 'last_7d'
+    or 'monthly') by merging the hourly score buckets inside the window.
+    """
+    logger.info("Running job: update_periodic_leaderboard for '%s'", timespan)
     db_gen = get_db_session_for_job()
     db = next(db_gen, None)
     if not db:
@@ -103,34 +286,32 @@ def update_periodic_leaderboard(timespan: str = 'daily'):
     try:
         # 1. Define time window
         now_utc = datetime.utcnow()
-        if timespan == 'daily':
-            start_time = datetime.combine(now_utc.date(), time.min)
-        elif timespan == 'weekly':
-            start_time = datetime.combine(now_utc.date() - timedelta(days=now_utc.weekday()), time.min)
-        else:
+        start_time = get_window_start(timespan, now_utc)
+        if start_time is None:
             return # Invalid timespan
         
         # 2. Clear old entries
         db.query(Leaderboard).filter(Leaderboard.timespan == timespan).delete(synchronize_session=False)
 
-        # 3. Build the complex query
-        # This joins Games, Puzzles, and Users, finds the MAX score per user/difficulty
-        # in the time window, and ranks them.
-        sql_query = text("""
+        # 3. Merge the buckets in the window: the best score per user/difficulty
+        # is the MAX over their hourly bests, then rank them. The number of buckets
+        # read depends on the window length, not on how many games were played.
+        scores_cte = """
         WITH user_best_scores AS (
             SELECT
-                g.user_id,
+                b.user_id,
                 u.username,
-                p.difficulty,
-                MAX(g.final_score) as max_score
-            FROM games g
-            JOIN users u ON g.user_id = u.id
-            JOIN puzzles p ON g.puzzle_id = p.id
-            WHERE g.was_completed = TRUE
-              AND g.completed_at >= :start_time
-              AND g.completed_at < :end_time
-            GROUP BY g.user_id, u.username, p.difficulty
-        ),
+                b.difficulty,
+                MAX(b.best_score) as max_score
+            FROM score_buckets b
+            JOIN users u ON b.user_id = u.id
+            WHERE b.bucket_start >= :start_time
+              AND b.bucket_start <= :end_time
+            GROUP BY b.user_id, u.username, b.difficulty
+        )
+        """
+
+        sql_query = text(scores_cte + """,
         ranked_scores AS (
             SELECT
                 user_id,
@@ -140,10 +321,18 @@ def update_periodic_leaderboard(timespan: str = 'daily'):
                 RANK() OVER(PARTITION BY difficulty ORDER BY max_score DESC) as rank
             FROM user_best_scores
         )
-        SELECT * FROM ranked_scores WHERE max_score > 0
+        SELECT * FROM ranked_scores WHERE max_score > 0 AND rank <= :rank_limit
+        """).columns(user_id=pgUUID(as_uuid=True))
+
+        histogram_query = text(scores_cte + """
+        SELECT difficulty, max_score / :bin_width AS bin, COUNT(*) AS players
+        FROM user_best_scores
+        WHERE max_score > 0
+        GROUP BY 1, 2
         """)
 
-        results = db.execute(sql_query, {"start_time": start_time, "end_time": now_utc}).mappings().all()
+        window = {"start_time": start_time, "end_time": now_utc}
+        results = db.execute(sql_query, {**window, "rank_limit": settings.LEADERBOARD_EXACT_RANK_LIMIT}).mappings().all()
 
         new_entries = []
         for row in results:
@@ -160,11 +349,15 @@ def update_periodic_leaderboard(timespan: str = 'daily'):
             )
         
         db.add_all(new_entries)
+        bin_width = settings.LEADERBOARD_HISTOGRAM_BIN_WIDTH
+        save_histograms(db, timespan, bin_width, db.execute(histogram_query, {**window, "bin_width": bin_width}).all())
+        bump_leaderboard_version(db, timespan)
         db.commit()
-        print(f"Successfully updated '{timespan}' leaderboard with {len(new_entries)} entries.")
+        invalidate_leaderboard_cache()
+        logger.info("Successfully updated '%s' leaderboard with %s entries.", timespan, len(new_entries))
 
     except Exception as e:
-        print(f"Error updating '{timespan}' leaderboard: {e}")
+        logger.error("Error updating '%s' leaderboard: %s", timespan, e)
         db.rollback()
     finally:
         db.close()
\ No newline at end of file
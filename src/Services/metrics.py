@@ -0,0 +1,202 @@
+# src/Services/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_metric(name: str, kind: str, help: str, samples: Iterable[Tuple[Dict[str, object], float]]) -> List[str]:
+    """Prometheus text lines for a metric computed at scrape time, one sample per label dict."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(list(labels), list(labels.values()))} {value}")
+    return lines
+
+
+class Counter:
+    """
+    A value per label set. Updates are plain dict operations without a lock, so each
+    metric must only be updated from one thread: the request metrics are only touched
+    by the middleware on the event loop thread.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    """Bucketed observations per label set, with the same single-writer rule as Counter."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}  # labels -> [counts per bucket and +Inf, sum]
+        _registry.append(self)
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series is not None else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                bucket_labels = format_labels(self.labels, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+_registry: List = []
+
+
+def render_registry() -> List[str]:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return lines
+
+
+# --- Request metrics, recorded by MetricsMiddleware ---
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Time until the response was sent.", ("method", "route"))
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served.")
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent in database queries per request.", ("method", "route"))
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries per request.", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+
+
+# --- Database query hooks ---
+
+class QueryStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def add(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+
+
+# Stats of the request (or block) being served. Starlette copies the context into the
+# threadpool and SQLAlchemy into its greenlets, so sync and async routes both see it.
+current_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_queries", default=None)
+
+# Queries outside any request (jobs, warm-ups) come from several threads
+_background_queries = QueryStats()
+_background_lock = threading.Lock()
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryStats]:
+    """Counts the queries run, and the time spent in them, within the block."""
+    stats = QueryStats()
+    token = current_queries.set(stats)
+    try:
+        yield stats
+    finally:
+        current_queries.reset(token)
+
+
+def _record_query(statement: str, seconds: float):
+    stats = current_queries.get()
+    if stats is not None:
+        stats.add(statement, seconds)
+        return
+    with _background_lock:
+        _background_queries.queries += 1
+        _background_queries.seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(statement, time.perf_counter() - conn.info["query_started"].pop())
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection is not None and exception_context.connection.info.get("query_started")
+    if started:
+        _record_query(exception_context.statement, time.perf_counter() - started.pop())
+
+
+def instrument_engines():
+    """Times every query of every engine (sync, async, replicas). Safe to call more than once."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def background_query_samples() -> List[str]:
+    with _background_lock:
+        queries, seconds = _background_queries.queries, _background_queries.seconds
+    return (
+        format_metric("db_background_queries_total", "counter", "Queries run outside requests (jobs, warm-ups).", [({}, queries)])
+        + format_metric("db_background_query_seconds_total", "counter", "Time spent in queries outside requests.", [({}, seconds)])
+    )
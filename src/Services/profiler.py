@@ -0,0 +1,146 @@
+# src/Services/profiler.py
+import itertools
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from src.Config.settings import get_settings
+
+settings = get_settings()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Frames are named relative to these, e.g. "src/...", "fastapi/routing.py", "threading.py"
+_PATH_PREFIXES = sorted(
+    {ROOT, sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"], sysconfig.get_paths()["stdlib"]},
+    key=len, reverse=True
+)
+
+
+class Profile:
+    """
+    Wall-clock samples of one request, as collapsed stacks (root first, frames joined by
+    ";") with their sample counts. Samples follow the request: the event loop thread
+    while its async parts run, the worker thread while a sync endpoint runs. Samples of
+    the event loop thread can include other requests interleaved with this one.
+    """
+
+    def __init__(self, profile_id: int, name: str):
+        self.id = profile_id
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self.wall_seconds = 0.0
+        self.stacks: Counter = Counter()
+        self.thread_id = threading.get_ident()
+        self._loop_thread_id = self.thread_id
+        self._started = time.perf_counter()
+
+    def enter_thread(self):
+        """Moves sampling to the calling thread, e.g. the worker running a sync endpoint."""
+        self.thread_id = threading.get_ident()
+
+    def leave_thread(self):
+        self.thread_id = self._loop_thread_id
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "samples": sum(self.stacks.values()),
+        }
+
+    def collapsed(self) -> str:
+        """The samples in the collapsed stack format read by flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# The profile of the request being served, copied into its worker threads with the context
+current_profile: ContextVar[Optional[Profile]] = ContextVar("current_profile", default=None)
+
+_profiles: deque = deque(maxlen=settings.PROFILER_MAX_PROFILES)  # Finished profiles, newest last
+_active: Dict[int, Profile] = {}
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_sampler: Optional[threading.Thread] = None
+_frame_names: Dict[object, str] = {}
+
+
+def _frame_name(code) -> str:
+    name = _frame_names.get(code)
+    if name is None:
+        filename = code.co_filename
+        for prefix in _PATH_PREFIXES:
+            if filename.startswith(prefix + os.sep):
+                filename = filename[len(prefix) + 1:]
+                break
+        qualname = getattr(code, "co_qualname", code.co_name)
+        name = _frame_names[code] = f"{qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+    return name
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _sample_loop():
+    global _sampler
+    while True:
+        time.sleep(settings.PROFILER_INTERVAL_SECONDS)
+        with _lock:
+            if not _active:
+                # Stops with the last profile, nothing runs while no request is profiled
+                _sampler = None
+                return
+            profiles = list(_active.values())
+        frames = sys._current_frames()
+        samples = [(profile, frames.get(profile.thread_id)) for profile in profiles]
+        stacks = [(profile, _collapse(frame)) for profile, frame in samples if frame is not None]
+        del frames, samples
+        with _lock:
+            # A profile that finished meanwhile is already being read, it gets no more samples
+            for profile, stack in stacks:
+                if profile.id in _active:
+                    profile.stacks[stack] += 1
+
+
+@contextmanager
+def profile_request(name: str) -> Iterator[Profile]:
+    """Samples the request served within the block and keeps its profile in the ring buffer."""
+    global _sampler
+    profile = Profile(next(_ids), name)
+    token = current_profile.set(profile)
+    with _lock:
+        _active[profile.id] = profile
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="request-profiler", daemon=True)
+            _sampler.start()
+    try:
+        yield profile
+    finally:
+        profile.wall_seconds = time.perf_counter() - profile._started
+        current_profile.reset(token)
+        with _lock:
+            del _active[profile.id]
+            _profiles.append(profile)
+
+
+def list_profiles() -> List[dict]:
+    with _lock:
+        return [profile.summary() for profile in reversed(_profiles)]
+
+
+def get_profile(profile_id: int) -> Optional[Profile]:
+    with _lock:
+        return next((profile for profile in _profiles if profile.id == profile_id), None)
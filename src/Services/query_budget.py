@@ -0,0 +1,91 @@
+# src/Services/query_budget.py
+import logging
+import os
+import traceback
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.Services.metrics import QueryStats, current_queries, instrument_engines
+
+logger = logging.getLogger(__name__)
+
+SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Instrumentation frames are left out of the reported stacks
+_OWN_FILES = (os.path.abspath(__file__), os.path.join(SRC_ROOT, "Services", "metrics.py"))
+
+
+def app_stack(limit: int = 8) -> List[str]:
+    """The innermost `limit` frames of the app's own code on the current stack."""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(SRC_ROOT) and frame.filename not in _OWN_FILES
+    ]
+    root = os.path.dirname(SRC_ROOT)
+    return [f"{os.path.relpath(frame.filename, root)}:{frame.lineno} in {frame.name}" for frame in frames[-limit:]]
+
+
+class QueryLog(QueryStats):
+    """
+    QueryStats that also keeps every statement, and what triggered each implicit load
+    (a lazy-loaded relationship or a refresh of expired attributes) with the stack
+    that triggered it. Only used in debug and test mode, capturing stacks is slow.
+    """
+
+    __slots__ = ("statements", "implicit_loads")
+
+    def __init__(self):
+        super().__init__()
+        self.statements: List[str] = []
+        self.implicit_loads: List[Tuple[str, List[str]]] = []
+
+    def add(self, statement: str, seconds: float):
+        super().add(statement, seconds)
+        self.statements.append(" ".join(statement.split()))
+
+    def format(self) -> str:
+        lines = [f"  {index}. {statement}" for index, statement in enumerate(self.statements, 1)]
+        for load, stack in self.implicit_loads:
+            lines.append(f"  {load}, triggered at:")
+            lines.extend(f"      {frame}" for frame in stack)
+        return "\n".join(lines)
+
+
+def _on_orm_execute(orm_execute_state):
+    log = current_queries.get()
+    if not isinstance(log, QueryLog):
+        return
+    if orm_execute_state.is_relationship_load:
+        load = f"lazy load of {orm_execute_state.loader_strategy_path[-1]}"
+    elif orm_execute_state.is_column_load:
+        load = f"refresh of expired {orm_execute_state.bind_mapper.class_.__name__}"
+    else:
+        return
+    log.implicit_loads.append((load, app_stack()))
+
+
+def instrument_implicit_loads():
+    """Records lazy loads and expired-attribute refreshes into the current QueryLog. Safe to call more than once."""
+    instrument_engines()
+    if not event.contains(Session, "do_orm_execute", _on_orm_execute):
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+
+
+def report_over_budget(method: str, route: str, log: QueryLog, budget: int):
+    logger.warning("%s %s ran %s queries, over its budget of %s:\n%s", method, route, log.queries, budget, log.format())
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryLog]:
+    """Fails with every statement and implicit load if the block runs more than `max_queries` queries."""
+    instrument_implicit_loads()
+    log = QueryLog()
+    token = current_queries.set(log)
+    try:
+        yield log
+    finally:
+        current_queries.reset(token)
+    if log.queries > max_queries:
+        raise AssertionError(f"{log.queries} queries, expected at most {max_queries}:\n{log.format()}")
@@ -0,0 +1,101 @@
+# src/Services/rivals_service.py
+import datetime
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy import and_, case, func, select, union_all
+from sqlalchemy.orm import Session
+
+from src.Config.database import dialect_insert, get_db_session_for_job
+from src.Models.TableModels import ChallengeRival, Challenges
+
+logger = logging.getLogger(__name__)
+
+
+def _add_to_edge(db: Session, user_id, rival_id, last_challenged_at: Optional[datetime.datetime] = None, **increments: int):
+    """
+    Adds to the counters of one direction of a pair, creating the edge if needed, in a
+    single upsert that increments in SQL so concurrent challenges never lose an update.
+    """
+    values = {"challenges_count": 0, "wins": 0, "losses": 0, **increments}
+    insert = dialect_insert(db, ChallengeRival).values(
+        user_id=user_id, rival_id=rival_id, last_challenged_at=last_challenged_at, **values
+    )
+    updates = {column: getattr(ChallengeRival, column) + amount for column, amount in increments.items()}
+    if last_challenged_at is not None:
+        updates["last_challenged_at"] = insert.excluded.last_challenged_at
+    db.execute(insert.on_conflict_do_update(
+        index_elements=[ChallengeRival.user_id, ChallengeRival.rival_id],
+        set_=updates
+    ))
+
+
+def record_challenge_created(db: Session, challenger_id, opponent_id):
+    """Adds a challenge to both directions of the pair. Runs in the caller's transaction."""
+    now = datetime.datetime.utcnow()
+    for user_id, rival_id in ((challenger_id, opponent_id), (opponent_id, challenger_id)):
+        _add_to_edge(db, user_id, rival_id, last_challenged_at=now, challenges_count=1)
+
+
+def record_challenge_completed(db: Session, challenger_id, opponent_id, winner_id):
+    """Updates the head-to-head record of both users. Runs in the caller's transaction."""
+    if winner_id is None:
+        return
+    loser_id = opponent_id if winner_id == challenger_id else challenger_id
+    _add_to_edge(db, winner_id, loser_id, wins=1)
+    _add_to_edge(db, loser_id, winner_id, losses=1)
+
+
+def build_rival_index(db: Session, checkpoint: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Builds the adjacency index from the existing challenges in one INSERT ... SELECT,
+    grouping both directions of every challenge by pair. Edges already written by live
+    challenges are overwritten with the recount, which includes those challenges, so
+    the backfill can be rerun. `checkpoint` is called with the number of challenges
+    counted. The caller commits.
+    """
+    directions = union_all(
+        select(Challenges.challenger_id.label("user_id"), Challenges.opponent_id.label("rival_id"),
+               Challenges.winner_id, Challenges.status, Challenges.created_at),
+        select(Challenges.opponent_id.label("user_id"), Challenges.challenger_id.label("rival_id"),
+               Challenges.winner_id, Challenges.status, Challenges.created_at),
+    ).subquery()
+    completed = directions.c.status == "completed"
+    pairs = select(
+        directions.c.user_id,
+        directions.c.rival_id,
+        func.count(),
+        func.sum(case((and_(completed, directions.c.winner_id == directions.c.user_id), 1), else_=0)),
+        func.sum(case((and_(completed, directions.c.winner_id == directions.c.rival_id), 1), else_=0)),
+        func.max(directions.c.created_at),
+    ).group_by(directions.c.user_id, directions.c.rival_id)
+
+    columns = ["user_id", "rival_id", "challenges_count", "wins", "losses", "last_challenged_at"]
+    insert = dialect_insert(db, ChallengeRival).from_select(columns, pairs)
+    result = db.execute(insert.on_conflict_do_update(
+        index_elements=[ChallengeRival.user_id, ChallengeRival.rival_id],
+        set_={column: getattr(insert.excluded, column) for column in columns[2:]}
+    ))
+    if checkpoint is not None:
+        checkpoint(db.query(Challenges).count())
+    return result.rowcount
+
+
+def backfill_rival_index():
+    """Builds the adjacency index from the existing challenges. Safe to run again."""
+    logger.info("Running job: backfill_rival_index")
+    db_gen = get_db_session_for_job()
+    db = next(db_gen, None)
+    if not db:
+        return
+
+    try:
+        written = build_rival_index(db)
+        db.commit()
+        if written:
+            logger.info("Backfilled %s rival index entries.", written)
+    except Exception as e:
+        logger.error("Error backfilling rival index: %s", e)
+        db.rollback()
+    finally:
+        db.close()
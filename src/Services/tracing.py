@@ -0,0 +1,245 @@
+# src/Services/tracing.py
+import asyncio
+import functools
+import json
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements are cut to this length in span attributes
+MAX_STATEMENT_LENGTH = 500
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, object]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration = 0.0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class SpanExporter(ABC):
+    """Receives every finished span. Implement `export` to ship spans elsewhere, see set_exporter."""
+
+    @abstractmethod
+    def export(self, span: Span):
+        pass
+
+    def close(self):
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps the last `max_spans` spans, for tests and debugging."""
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: deque = deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def trace(self, trace_id: str) -> List[Span]:
+        return [span for span in list(self.spans) if span.trace_id == trace_id]
+
+
+class JsonLinesExporter(SpanExporter):
+    """
+    Appends one JSON object per span to a local file. `export` only queues the span, a
+    writer thread encodes and writes whatever has queued up and flushes once the queue is
+    empty, so a request never waits on the file. `close` writes out the queue first.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._spans: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write, name="span-writer", daemon=True)
+        self._writer.start()
+
+    def export(self, span: Span):
+        self._spans.put(span)
+
+    def _write(self):
+        while True:
+            batch = [self._spans.get()]
+            while not self._spans.empty():
+                batch.append(self._spans.get_nowait())
+            stop = any(span is self._STOP for span in batch)
+            lines = [json.dumps(span.to_dict(), default=str) + "\n" for span in batch if span is not self._STOP]
+            self._file.writelines(lines)
+            self._file.flush()
+            if stop:
+                return
+
+    def close(self):
+        self._spans.put(self._STOP)
+        self._writer.join()
+        self._file.close()
+
+
+# None means tracing is off: span() and @traced then only cost a global lookup
+_exporter: Optional[SpanExporter] = None
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def set_exporter(exporter: Optional[SpanExporter]):
+    """Turns tracing on with the given exporter, or off with None."""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    if previous is not None and previous is not exporter:
+        previous.close()
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Span]:
+    """The remote parent of a W3C `traceparent` header (00-<trace id>-<span id>-<flags>), if valid."""
+    parts = (header or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    parent = Span("remote", parts[1], None, {})
+    parent.span_id = parts[2]
+    return parent
+
+
+@contextmanager
+def span(name: str, parent: Optional[Span] = None, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Times the block as a child of `parent`, by default the current span, or as the root
+    of a new trace. Yields None when tracing is off.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield None
+        return
+    if parent is None:
+        parent = current_span.get()
+    current = Span(name, parent.trace_id if parent else _new_trace_id(), parent.span_id if parent else None, attributes)
+    token = current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        current_span.reset(token)
+        exporter.export(current)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator running each call of a sync or async function in a span named after it."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _exporter is None:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def add_traced_task(background_tasks, func: Callable, *args, **kwargs):
+    """
+    BackgroundTasks.add_task, with the task run in a span of the current trace. Tasks
+    run after the response is sent, when the request's span has already ended.
+    """
+    parent = current_span.get()
+    if _exporter is None or parent is None:
+        background_tasks.add_task(func, *args, **kwargs)
+        return
+
+    name = f"background {getattr(func, '__qualname__', repr(func))}"
+
+    if asyncio.iscoroutinefunction(func):
+        async def task():
+            with span(name, parent=parent):
+                await func(*args, **kwargs)
+    else:
+        def task():
+            with span(name, parent=parent):
+                func(*args, **kwargs)
+    background_tasks.add_task(task)
+
+
+# --- SQL statement spans ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _exporter is None or current_span.get() is None:
+        return
+    manager = span("sql", statement=statement[:MAX_STATEMENT_LENGTH], db=conn.dialect.name)
+    manager.__enter__()
+    conn.info.setdefault("trace_spans", []).append(manager)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().__exit__(None, None, None)
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans:
+        error = exception_context.original_exception
+        spans.pop().__exit__(type(error), error, error.__traceback__)
+
+
+def instrument_sql_spans():
+    """Records every statement run within a trace as a span. Safe to call more than once."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
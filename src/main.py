@@ -1,89 +1,226 @@
 # src/main.py
 import asyncio
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 
 from src.Models import TableModels
 from src.Config.settings import get_settings
+from src.Config import database
 from src.Config.database import init_database, create_db_and_tables, close_database, getSessionLocal
+from src.Config.async_database import async_driver_installed, init_async_database, close_async_database
+from src.Config.read_replicas import init_read_replicas, close_read_replicas, init_async_read_replicas, close_async_read_replicas
+from src.API.Middleware.rate_limit import RateLimitMiddleware
+from src.API.Middleware.metrics import MetricsMiddleware
+from src.Config.leader_election import start_leader_election, stop_leader_election
+from src.Config.warmup import Warmup, mark_startup_complete, start_warmups, stop_warmups
+from src.Security.password_hasher import shutdown_password_hasher
 from src.API.Routes.auth_routes import router as authRouter
 from src.API.Routes.user_routes import router as userRouter
 from src.API.Routes.game_routers import router as gameRouter 
 from src.API.Routes.challenges_routes import router as challengesRouter
 from src.API.Routes.leaderboard_routes import router as leaderboardRouter
+from src.API.Routes.system_routes import router as systemRouter
+from src.API.Routes.health_routes import router as healthRouter
+from src.API.Routes.metrics_routes import router as metricsRouter
+from src.API.Controllers.leaderboard_controller import warm_leaderboard_cache
 from src.Services.game_generator import generate_initial_games
+from src.Migrations.migrator import run_migrations, stop_migrations
+from src.Security.refresh_tokens import purge_expired_refresh_tokens
+from src.Services.leaderboard_response_cache import get_leaderboard_updated_at
+from src.Services.metrics import instrument_engines
+from src.Services.query_budget import instrument_implicit_loads
+from src.Services.tracing import JsonLinesExporter, instrument_sql_spans, set_exporter
+from src.Config.logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 try:
-    from src.Config.scheduler import get_scheduler
+    from src.Config.scheduler import get_scheduler, add_managed_job, last_due_time, shutdown_job_pool
     from src.Services.leaderboard_services import (
         update_all_time_high_leaderboard,
-        update_periodic_leaderboard
+        update_periodic_leaderboard,
+        expire_score_buckets
     )
     scheduler = get_scheduler()
     SCHEDULER_ENABLED = True
-    print("Scheduler and leaderboard services imported successfully.")
+    logger.info("Scheduler and leaderboard services imported successfully.")
 except ImportError:
-    print("WARNING: Scheduler or leaderboard services not found. Background jobs will be disabled.")
+    logger.warning("Scheduler or leaderboard services not found. Background jobs will be disabled.")
     SCHEDULER_ENABLED = False
 
 settings = get_settings()
 
+# The async stack serves the hot endpoints when its driver is installed, otherwise everything stays sync
+ASYNC_DB_ENABLED = settings.ASYNC_DB_ENABLED and async_driver_installed(settings.DB_URL)
+
+# Board rebuilt by each leaderboard job. At startup these jobs only run if their board is
+# stale, so a rolling deploy does not rebuild every leaderboard once per pod.
+STARTUP_SKIP_IF_FRESH = {
+    'update_daily_leaderboard': 'daily',
+    'update_weekly_leaderboard': 'weekly',
+    'update_monthly_leaderboard': 'monthly',
+    'update_last_24h_leaderboard': 'last_24h',
+    'update_last_7d_leaderboard': 'last_7d',
+    'update_all_time_leaderboard': 'all_time',
+}
+
+def _fresh_leaderboard_jobs(now: datetime) -> set:
+    """Ids of the leaderboard jobs whose board was rebuilt after the job was last due."""
+    db = getSessionLocal()()
+    try:
+        updated_at = get_leaderboard_updated_at(db)
+    finally:
+        db.close()
+
+    fresh = set()
+    for job in scheduler.get_jobs():
+        timespan = STARTUP_SKIP_IF_FRESH.get(job.id)
+        if timespan is None or timespan not in updated_at:
+            continue
+        due = last_due_time(job, now)
+        if due is None or updated_at[timespan] >= due.astimezone(timezone.utc).replace(tzinfo=None):
+            fresh.add(job.id)
+    return fresh
+
+async def _trigger_startup_jobs():
+    """Runs every job once right away, except the leaderboard rebuilds whose board is still fresh."""
+    fresh = await asyncio.to_thread(_fresh_leaderboard_jobs, datetime.now(timezone.utc))
+    now = datetime.now(scheduler.timezone)
+    for job in scheduler.get_jobs():
+        if job.id in fresh:
+            logger.info("Skipping job: %s (leaderboard is fresh)", job.id)
+            continue
+        logger.info("Triggering job: %s", job.id)
+        job.modify(next_run_time=now)
+
+def _warm_leaderboard_cache():
+    db = getSessionLocal()()
+    try:
+        warm_leaderboard_cache(db)
+    finally:
+        db.close()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    # Startup
-    print("Starting up application...")
+    # Critical phase: only what serving a request needs, everything else is a warm-up
+    logger.info("Starting up application...")
+    if settings.METRICS_ENABLED:
+        instrument_engines()
+    if settings.QUERY_BUDGET_ENABLED:
+        instrument_implicit_loads()
+    if settings.TRACING_ENABLED:
+        set_exporter(JsonLinesExporter(settings.TRACING_FILE))
+        instrument_sql_spans()
     init_database()
     create_db_and_tables()
+    init_read_replicas()
+    if ASYNC_DB_ENABLED and init_async_database():
+        init_async_read_replicas()
+    # Decide which worker/node runs background jobs before any of them can fire
+    start_leader_election(database.engine)
 
     if SCHEDULER_ENABLED: 
-        print("Scheduler and leaderboard services enabled. Starting background jobs...")
-        scheduler.add_job(
+        logger.info("Scheduler and leaderboard services enabled. Starting background jobs...")
+        # Jobs are registered as managed jobs: the scheduler awaits them on the event loop,
+        # their bodies run in the job pool with a timeout and never overlap themselves.
+        add_managed_job(
             update_periodic_leaderboard, 
             'cron', 
             hour=0, 
             minute=5, 
             args=['daily'], 
-            id='update_daily_leaderboard', 
-            replace_existing=True
+            id='update_daily_leaderboard'
+        )
+        add_managed_job(
+            update_periodic_leaderboard, 
+            'cron', 
+            day_of_week='mon', 
+            hour=1, 
+            minute=5, 
+            args=['weekly'], 
+            id='update_weekly_leaderboard'
+        )
+        add_managed_job(
+            update_all_time_high_leaderboard, 
+            'interval', 
+            hours=4, 
+            id='update_all_time_leaderboard'
+        )
+        # Rolling windows move every hour, merging buckets keeps these rebuilds cheap
+        add_managed_job(
+            update_periodic_leaderboard, 
+            'cron', 
+            minute=10, 
+            args=['last_24h'], 
+            id='update_last_24h_leaderboard'
+        )
+        add_managed_job(
+            update_periodic_leaderboard, 
+            'cron', 
+            minute=15, 
+            args=['last_7d'], 
+            id='update_last_7d_leaderboard'
+        )
+        add_managed_job(
+            update_periodic_leaderboard, 
+            'cron', 
+            hour=2, 
+            minute=5, 
+            args=['monthly'], 
+            id='update_monthly_leaderboard'
         )
-        scheduler.add_job(
-        update_periodic_leaderboard, 
-        'cron', 
-        day_of_week='mon', 
-        hour=1, 
-        minute=5, 
-        args=['weekly'], 
-        id='update_weekly_leaderboard', 
-        replace_existing=True
+        add_managed_job(
+            expire_score_buckets, 
+            'cron', 
+            minute=30, 
+            id='expire_score_buckets'
         )
-        scheduler.add_job(
-        update_all_time_high_leaderboard, 
-        'interval', 
-        hours=4, 
-        id='update_all_time_leaderboard', 
-        replace_existing=True
+        add_managed_job(
+            purge_expired_refresh_tokens, 
+            'cron', 
+            hour=3, 
+            minute=5, 
+            id='purge_expired_refresh_tokens'
         )
         scheduler.start()
+    mark_startup_complete()
 
-        tz = scheduler.timezone
-        for job in scheduler.get_jobs():
-            print(f"  - Triggering job: {job.id}")
-            job.modify(next_run_time=datetime.now(tz))
-    try:
-        generate_initial_games()
-    except Exception as e:
-        print(f"Error generating initial games: {e}")
+    # Warm-ups run in this order in the background while the app already serves requests.
+    # /health/ready waits for the required ones. Migrations come before the first job
+    # runs, the windowed leaderboards are built from the backfilled score buckets.
+    warmups = [Warmup('leaderboard_cache', _warm_leaderboard_cache, required=True)]
+    if settings.MIGRATIONS_ENABLED:
+        warmups.append(Warmup('migrations', lambda: run_migrations(database.engine), leader_only=True))
+    if SCHEDULER_ENABLED:
+        warmups.append(Warmup('startup_jobs', _trigger_startup_jobs))
+    # An empty database is seeded in-process, new_game also tops up puzzles on demand
+    warmups.append(Warmup('seed_puzzles', generate_initial_games, leader_only=True))
+    start_warmups(warmups)
     yield
     # Shutdown
-    print("Shutting down application...")
+    logger.info("Shutting down application...")
+    # A running backfill stops at its next batch and resumes on the next startup
+    stop_migrations()
+    stop_warmups()
     if SCHEDULER_ENABLED and scheduler.running:
         scheduler.shutdown()
-        print("Scheduler shut down.")
+        shutdown_job_pool()
+        logger.info("Scheduler shut down.")
+    stop_leader_election()
+    shutdown_password_hasher()
+    if ASYNC_DB_ENABLED:
+        await close_async_read_replicas()
+        await close_async_database()
+    close_read_replicas()
     close_database()
+    if settings.TRACING_ENABLED:
+        set_exporter(None)
 
 # Initialize the FastAPI app with lifespan
 app = FastAPI(
@@ -92,6 +229,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Throttle auth and expensive endpoints before any route dependency runs.
+# Added before CORS so rejections still carry the CORS headers.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -101,11 +243,31 @@ app.add_middleware(
     allow_headers=["*"],     
 )
 
+# Added last so it wraps everything else and also times rate-limited and CORS responses
+if settings.METRICS_ENABLED or settings.QUERY_BUDGET_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        query_budgets=settings.QUERY_BUDGETS if settings.QUERY_BUDGET_ENABLED else None,
+        default_query_budget=settings.QUERY_BUDGET_DEFAULT
+    )
+
+# Registered first so they take precedence over the sync routes with the same paths
+if ASYNC_DB_ENABLED:
+    # Imported only here, the async controllers pull in SQLAlchemy's asyncio extension
+    from src.API.Routes import async_routes
+    app.include_router(async_routes.user_router, prefix="/api/user")
+    app.include_router(async_routes.game_router, prefix="/api/game")
+    app.include_router(async_routes.leaderboard_router, prefix="/api/leaderboard")
+
 app.include_router(authRouter, prefix="/api/auth", tags=["Authentication"])
 app.include_router(userRouter, prefix="/api/user", tags=["User"])
 app.include_router(gameRouter, prefix="/api/game", tags=["Game"])
 app.include_router(leaderboardRouter, prefix="/api/leaderboard", tags=["Leaderboard"])
 app.include_router(challengesRouter, prefix="/api/challenges", tags=["Challenges"])
+app.include_router(systemRouter, prefix="/api/system", tags=["System"])
+app.include_router(healthRouter, prefix="/health", tags=["Health"])
+if settings.METRICS_ENABLED:
+    app.include_router(metricsRouter, tags=["System"])
 
 
 @app.get("/")
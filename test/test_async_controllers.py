@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import BackgroundTasks
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.API.Controllers import async_game_controller, async_user_controller
+from src.Config.async_database import to_async_url
+from src.Config.database import Base
+from src.Models.TableModels import Games, Puzzles, ScoreBucket, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Schemas.game_schema import GameBase
+
+
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@db:5432/sudoku") == "postgresql+asyncpg://u:p@db:5432/sudoku"
+    assert to_async_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+
+def test_async_game_flow_and_profile(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(id=user_id, username="player", email="player@example.com", hashed_password="x"))
+        for _ in range(3):
+            db.add(Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81))
+        db.commit()
+
+    async def play():
+        async_engine = create_async_engine(to_async_url(url))
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        user = TokenPayload(id=user_id, username="player", email="player@example.com")
+        try:
+            async with AsyncSessionLocal() as db:
+                puzzle = await async_game_controller.new_game(user, db, "easy", BackgroundTasks())
+            async with AsyncSessionLocal() as db:
+                await async_game_controller.update_game(user, db, GameBase(
+                    id=puzzle.gameId, difficulty="easy", was_completed=True, duration_seconds=90,
+                    errors_made=0, hints_used=0, final_score=700, current_state="1" * 81
+                ))
+            async with AsyncSessionLocal() as db:
+                return await async_user_controller.get_user_data(db, user)
+        finally:
+            await async_engine.dispose()
+
+    profile = asyncio.run(play())
+
+    assert profile.total_games_played == 1 and profile.best_score_easy == 700
+    with sessionmaker(bind=engine)() as db:
+        game = db.query(Games).one()
+        assert game.was_completed and game.current_state == "1" * 81
+        assert db.query(ScoreBucket).one().best_score == 700
+    engine.dispose()
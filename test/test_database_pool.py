@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import create_engine, exc as sa_exc, text
+from sqlalchemy.orm import sessionmaker
+
+from src.Config.database import InstrumentedQueuePool, LazySession
+
+
+def test_pool_records_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    held = engine.connect()
+    with pytest.raises(sa_exc.TimeoutError):
+        engine.connect()
+
+    stats = engine.pool.stats()
+    assert stats["checked_out"] == 1 and stats["overflow"] == 0
+    assert stats["checkouts"] == 2 and stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    held.close()
+    assert engine.pool.stats()["checked_in"] == 1
+    engine.dispose()
+
+
+def test_lazy_session_is_only_created_on_first_use(db_engine):
+    created = []
+    factory = sessionmaker(bind=db_engine)
+
+    def counting_factory():
+        created.append(1)
+        return factory()
+
+    unused = LazySession(counting_factory)
+    unused.close()
+    assert created == [] and not unused.is_started
+
+    used = LazySession(counting_factory)
+    assert used.execute(text("SELECT 1")).scalar() == 1
+    assert used.is_started and created == [1]
+    used.close()
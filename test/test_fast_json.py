@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pytest
+from pydantic import TypeAdapter
+
+from src.API import responses
+from src.API.Controllers import leaderboard_controller, user_controller
+from src.Models.TableModels import ChallengeRival, Challenges, Games, Leaderboard, Puzzles, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Schemas.game_schema import GameHistoryItem
+from src.Schemas.leaderboard_schema import LeaderboardPageData, LeaderboardWindowData, RivalsLeaderboardData
+
+
+@pytest.fixture(params=["orjson", "pydantic-core"])
+def encoder(request, monkeypatch):
+    if request.param == "pydantic-core":
+        monkeypatch.setattr(responses, "orjson", None)
+
+
+def _same_as_response_model(schema, data):
+    """The fast path encodes the payload to the bytes FastAPI's response_model path would send."""
+    adapter = TypeAdapter(schema)
+    assert responses.dumps(data) == adapter.dump_json(adapter.validate_python(data))
+
+
+def _seed(db):
+    me, rival = (User(username=name, email=f"{name}@example.com", hashed_password="x", best_score_easy=score)
+                 for name, score in [("me", 500), ("rival", 900)])
+    db.add_all([me, rival])
+    db.flush()
+    now = datetime.now(timezone.utc)
+    for i in range(3):
+        puzzle = Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81, is_used=True)
+        db.add(puzzle)
+        db.flush()
+        db.add(Games(user_id=me.id, puzzle_id=puzzle.id, was_completed=i > 0, duration_seconds=100 + i,
+                     completed_at=now - timedelta(hours=i) if i > 0 else None, final_score=300 + i,
+                     current_state="1" * 81, last_played=now))
+        db.add(Challenges(puzzle_id=puzzle.id, challenger_id=me.id, opponent_id=rival.id, status="completed",
+                          challenger_duration=120, opponent_duration=90, winner_id=rival.id,
+                          expires_at=now, completed_at=now - timedelta(minutes=30 * i)))
+    db.add(ChallengeRival(user_id=me.id, rival_id=rival.id, challenges_count=3, wins=0, losses=3))
+    for rank, user in enumerate([rival, me], start=1):
+        db.add(Leaderboard(user_id=user.id, username=user.username, difficulty="easy", timespan="weekly",
+                           total_score=1000 - rank, rank=rank))
+    db.commit()
+    return TokenPayload(id=me.id)
+
+
+def test_history_payloads_encode_like_their_response_models(db_session, encoder):
+    me = _seed(db_session)
+
+    history = user_controller.get_game_history_data(db_session, me)
+    assert [item["is_challenge"] for item in history].count(True) == 3
+    _same_as_response_model(List[GameHistoryItem], history)
+    _same_as_response_model(Optional[GameHistoryItem], user_controller.get_in_progress_game_data(db_session, me))
+    _same_as_response_model(Optional[GameHistoryItem], user_controller.get_in_progress_game_data(db_session, TokenPayload(id=None)))
+
+
+def test_leaderboard_payloads_encode_like_their_response_models(db_session, encoder):
+    me = _seed(db_session)
+
+    _same_as_response_model(LeaderboardPageData, leaderboard_controller.get_leaderboard_page_data(db_session, "easy", "weekly", 1, 10))
+    window = leaderboard_controller.get_leaderboard_window_data(db_session, me, "easy", "weekly", 5)
+    assert window["me"]["username"] == "me" and len(window["above"]) == 1
+    _same_as_response_model(LeaderboardWindowData, window)
+    for sort_by in ("score", "wins"):
+        _same_as_response_model(RivalsLeaderboardData, leaderboard_controller.get_rivals_leaderboard_data(db_session, me, "easy", sort_by, 10))
@@ -0,0 +1,114 @@
+import time
+
+from sqlalchemy import create_engine
+
+from src.Config.database import Base
+from src.Config.leader_election import LeaderElector
+from src.Models import TableModels
+
+
+def _make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leader.db'}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def test_only_one_node_is_leader(tmp_path):
+    engine = _make_engine(tmp_path)
+    first = LeaderElector(engine, "jobs", lease_seconds=30, heartbeat_seconds=10, node_id="node-a")
+    second = LeaderElector(engine, "jobs", lease_seconds=30, heartbeat_seconds=10, node_id="node-b")
+
+    assert first.heartbeat() is True
+    assert second.heartbeat() is False
+    # Renewing keeps the lease with the current leader
+    assert first.heartbeat() is True
+    assert second.heartbeat() is False
+    assert first.is_leader() and not second.is_leader()
+
+
+def test_failover_after_release(tmp_path):
+    engine = _make_engine(tmp_path)
+    first = LeaderElector(engine, "jobs", lease_seconds=30, heartbeat_seconds=10, node_id="node-a")
+    second = LeaderElector(engine, "jobs", lease_seconds=30, heartbeat_seconds=10, node_id="node-b")
+
+    assert first.heartbeat() is True
+    first.release()
+    assert second.heartbeat() is True
+    assert first.heartbeat() is False
+
+
+def test_failover_after_lease_expires(tmp_path):
+    engine = _make_engine(tmp_path)
+    first = LeaderElector(engine, "jobs", lease_seconds=1, heartbeat_seconds=10, node_id="node-a")
+    second = LeaderElector(engine, "jobs", lease_seconds=1, heartbeat_seconds=10, node_id="node-b")
+
+    assert first.heartbeat() is True
+    # The leader dies without releasing: its lease simply runs out
+    time.sleep(1.1)
+    assert first.is_leader() is False
+    assert second.heartbeat() is True
+
+
+class _FakePostgres:
+    """
+    Session-level advisory locks behind a pool: close() returns a connection to the pool,
+    where its session and any lock it holds stay alive, invalidate() ends the session.
+    """
+
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self):
+        self.lock_holder = None
+
+    def connect(self):
+        return _FakeConnection(self)
+
+
+class _FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.broken = False
+
+    def execution_options(self, **options):
+        return self
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if self.broken:
+            raise ConnectionError("server closed the connection unexpectedly")
+        if "pg_try_advisory_lock" in sql:
+            if self.server.lock_holder in (None, self):
+                self.server.lock_holder = self
+            return _Scalar(self.server.lock_holder is self)
+        if "pg_advisory_unlock" in sql and self.server.lock_holder is self:
+            self.server.lock_holder = None
+        return _Scalar(1)
+
+    def invalidate(self):
+        if self.server.lock_holder is self:
+            self.server.lock_holder = None
+
+    def close(self):
+        pass
+
+
+class _Scalar:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+def test_advisory_lock_is_reacquired_after_a_failed_heartbeat():
+    server = _FakePostgres()
+    elector = LeaderElector(server, "jobs", lease_seconds=30, heartbeat_seconds=10, node_id="node-a")
+    assert elector.use_advisory_lock
+
+    assert elector.heartbeat() is True
+    elector._lock_conn.broken = True
+    assert elector.heartbeat() is False
+    # The broken session was discarded with its lock instead of idling in the pool
+    assert server.lock_holder is None
+    assert elector.heartbeat() is True
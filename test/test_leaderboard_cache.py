@@ -0,0 +1,100 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.API.Controllers import async_leaderboard_controller, leaderboard_controller
+from src.Config.async_database import to_async_url
+from src.Config.database import Base
+from src.Models.TableModels import Leaderboard, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Services import leaderboard_histograms, leaderboard_response_cache
+from src.Services.leaderboard_response_cache import bump_leaderboard_version, invalidate_leaderboard_cache
+
+
+def _add_player(db, username, score, rank):
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(Leaderboard(user_id=user.id, username=username, difficulty="easy", timespan="all_time", total_score=score, rank=rank))
+    return user
+
+
+def test_top_players_block_is_cached_until_version_bump(db_session, monkeypatch):
+    invalidate_leaderboard_cache()
+    alice = _add_player(db_session, "alice", 900, 1)
+    bump_leaderboard_version(db_session, "all_time")
+    db_session.commit()
+
+    builds = []
+    original = leaderboard_controller._get_top_players
+    monkeypatch.setattr(leaderboard_controller, "_get_top_players", lambda db: builds.append(1) or original(db))
+    user = TokenPayload(id=alice.id)
+
+    first = json.loads(leaderboard_controller.get_full_leaderboard_json(db_session, user))
+    second = json.loads(leaderboard_controller.get_full_leaderboard_json(db_session, user))
+    assert first == second
+    assert len(builds) == 1
+    assert first["data"]["top_players"]["easy"]["all_time"][0]["username"] == "alice"
+    assert first["data"]["user_ranks"]["easy"]["all_time"] == {"total_score": 900, "rank": 1, "percentile": None, "is_exact": True}
+
+    # A rebuild bumps the version, which invalidates the cached block
+    _add_player(db_session, "bob", 1000, 1)
+    bump_leaderboard_version(db_session, "all_time")
+    db_session.commit()
+    monkeypatch.setattr(leaderboard_response_cache, "_version_checked_at", 0.0)
+
+    third = json.loads(leaderboard_controller.get_full_leaderboard_json(db_session, user))
+    assert len(builds) == 2
+    assert sorted(entry["username"] for entry in third["data"]["top_players"]["easy"]["all_time"]) == ["alice", "bob"]
+
+
+def test_json_matches_response_model(db_session):
+    invalidate_leaderboard_cache()
+    user = TokenPayload(id=uuid.uuid4())
+    body = json.loads(leaderboard_controller.get_full_leaderboard_json(db_session, user))
+    expected = leaderboard_controller.get_full_leaderboard(db_session, user).model_dump(mode="json")
+    assert body["status"] == "success"
+    assert body["data"] == expected
+
+
+def test_concurrent_async_misses_build_once(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        alice = _add_player(db, "alice", 900, 1)
+        bump_leaderboard_version(db, "all_time")
+        db.commit()
+        user = TokenPayload(id=alice.id)
+    engine.dispose()
+    invalidate_leaderboard_cache()
+    monkeypatch.setattr(leaderboard_histograms, "_histograms", None)
+
+    builds = []
+    original = leaderboard_controller._get_top_players
+    monkeypatch.setattr(leaderboard_controller, "_get_top_players", lambda db: builds.append(1) or original(db))
+
+    async def concurrent_requests():
+        async_engine = create_async_engine(to_async_url(url))
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def request():
+            async with AsyncSessionLocal() as db:
+                return await async_leaderboard_controller.get_full_leaderboard_json(db, user)
+
+        try:
+            return await asyncio.gather(*(request() for _ in range(5)))
+        finally:
+            await async_engine.dispose()
+
+    bodies = asyncio.run(concurrent_requests())
+    # Each build suspends on its queries, the other requests wait for it instead of building again
+    assert len(builds) == 1
+    assert all(json.loads(body)["data"]["top_players"]["easy"]["all_time"][0]["username"] == "alice" for body in bodies)
@@ -0,0 +1,113 @@
+from sqlalchemy.orm import sessionmaker
+
+from src.API.Controllers import leaderboard_controller
+from src.Config import database
+from src.Models.TableModels import Leaderboard, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Services import leaderboard_histograms, leaderboard_services
+from src.Services.leaderboard_histograms import Histogram, get_histogram
+from src.Services.leaderboard_response_cache import invalidate_leaderboard_cache
+
+
+def test_histogram_estimates_rank_and_percentile():
+    # Bins of width 100: 2 players in 900-999, 4 in 500-599, 4 in 100-199
+    histogram = Histogram(100, {9: 2, 5: 4, 1: 4})
+    assert histogram.total_players == 10
+    assert histogram.estimate(950) == (1, 100.0)
+    # Everyone in the higher bins is above a 700
+    assert histogram.estimate(700) == (3, 80.0)
+    # Bottom of the 500 bin: the whole bin is above
+    assert histogram.estimate(599)[0] == 3
+    assert histogram.estimate(500)[0] == 2 + int(4 * 99 / 100) + 1
+    assert histogram.estimate(50) == (11, 0.0)
+
+    # Positions 3-6 lie in the 500 bin, positions 2-7 span the 900 to the 100 bin
+    assert histogram.score_range(3, 6) == (500, 600, 2)
+    assert histogram.score_range(2, 7) == (100, 1000, 0)
+    assert histogram.score_range(11, 12) is None
+
+
+def test_players_outside_top_n_get_an_approximate_rank(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(database, "getSessionLocal", lambda: sessionmaker(bind=db_engine))
+    monkeypatch.setattr(leaderboard_services, "settings", leaderboard_services.settings.model_copy(update={
+        "LEADERBOARD_EXACT_RANK_LIMIT": 2,
+        "LEADERBOARD_HISTOGRAM_BIN_WIDTH": 100
+    }))
+    invalidate_leaderboard_cache()
+
+    users = []
+    for index, score in enumerate([1000, 800, 600, 400, 200]):
+        user = User(username=f"player{index}", email=f"player{index}@example.com", hashed_password="x", best_score_easy=score)
+        db_session.add(user)
+        users.append(user)
+    db_session.commit()
+
+    leaderboard_services.update_all_time_high_leaderboard()
+
+    # Only the top 2 are materialized
+    assert db_session.query(Leaderboard).filter(Leaderboard.timespan == "all_time").count() == 2
+
+    top = leaderboard_controller.get_full_leaderboard(db_session, TokenPayload(id=users[0].id))
+    assert top.user_ranks["easy"].all_time.rank == 1
+    assert top.user_ranks["easy"].all_time.is_exact is True
+    assert top.user_ranks["easy"].all_time.percentile == 100.0
+
+    last = leaderboard_controller.get_full_leaderboard(db_session, TokenPayload(id=users[4].id))
+    entry = last.user_ranks["easy"].all_time
+    assert entry.is_exact is False
+    assert entry.total_score == 200
+    assert entry.rank == 5
+    assert entry.percentile == 20.0
+    # No score on the other boards means no rank there
+    assert last.user_ranks["medium"].all_time is None
+
+
+def test_pages_and_windows_continue_past_the_exact_rows(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(database, "getSessionLocal", lambda: sessionmaker(bind=db_engine))
+    monkeypatch.setattr(leaderboard_services, "settings", leaderboard_services.settings.model_copy(update={
+        "LEADERBOARD_EXACT_RANK_LIMIT": 2,
+        "LEADERBOARD_HISTOGRAM_BIN_WIDTH": 100
+    }))
+    invalidate_leaderboard_cache()
+    # The version restarts with the database, drop the previous test's histograms
+    monkeypatch.setattr(leaderboard_histograms, "_histograms", None)
+
+    users = []
+    for index, score in enumerate([1000, 800, 600, 450, 450, 200]):
+        user = User(username=f"player{index}", email=f"player{index}@example.com", hashed_password="x", best_score_easy=score)
+        db_session.add(user)
+        users.append(user)
+    db_session.commit()
+    leaderboard_services.update_all_time_high_leaderboard()
+    order = [users[0].id, users[1].id, users[2].id] + sorted([users[3].id, users[4].id]) + [users[5].id]
+
+    # Every player shows up once across the pages, the ones past the top 2 ranked from the histogram
+    pages = [leaderboard_controller.get_leaderboard_page(db_session, "easy", "all_time", page, 2) for page in range(1, 5)]
+    assert [page.is_exact for page in pages] == [True, False, False, True]
+    assert [entry.user_id for page in pages for entry in page.entries] == order
+    assert [entry.rank for page in pages for entry in page.entries] == [1, 2, 3, 4, 4, 6]
+
+    # A player ranked past the limit gets a window anchored on their score
+    me = TokenPayload(id=users[4].id)
+    window = leaderboard_controller.get_leaderboard_window(db_session, me, "easy", "all_time", 2)
+    assert window.is_exact is False
+    assert (window.me.user_id, window.me.total_score, window.me.rank) == (users[4].id, 450, 4)
+    position = order.index(users[4].id)
+    assert [entry.user_id for entry in window.above] == order[position - 2:position]
+    assert [entry.user_id for entry in window.below] == order[position + 1:position + 3]
+
+    # At the bottom of the exact rows, the window continues into the players past them
+    window = leaderboard_controller.get_leaderboard_window(db_session, TokenPayload(id=users[1].id), "easy", "all_time", 2)
+    assert window.me.rank == 2 and window.is_exact is False
+    assert [entry.user_id for entry in window.below] == order[2:4]
+    assert get_histogram(db_session, "easy", "all_time").total_players == 6
+
+    # Windowed boards read the players past the exact rows from the score buckets
+    for user in users:
+        leaderboard_services.record_score_bucket(db_session, user.id, "easy", user.best_score_easy)
+    db_session.commit()
+    leaderboard_services.update_periodic_leaderboard("weekly")
+    invalidate_leaderboard_cache()
+    window = leaderboard_controller.get_leaderboard_window(db_session, me, "easy", "weekly", 2)
+    assert (window.me.rank, window.is_exact) == (4, False)
+    assert [entry.user_id for entry in window.above + window.below] == order[position - 2:position] + order[position + 1:]
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import HTTPException
+
+from src.API.Controllers import leaderboard_controller
+from src.Models.TableModels import Leaderboard, User
+from src.Schemas.auth_schema import TokenPayload
+
+
+def _seed_board(db):
+    """Seven players with ties, ranks 1, 2, 2, 2, 5, 6, 6."""
+    users = []
+    for index, (score, rank) in enumerate([(100, 1), (90, 2), (90, 2), (90, 2), (80, 5), (70, 6), (70, 6)]):
+        user = User(username=f"player{index}", email=f"player{index}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add(Leaderboard(user_id=user.id, username=user.username, difficulty="easy", timespan="weekly", total_score=score, rank=rank))
+        users.append(user)
+    db.commit()
+    return users
+
+
+def _full_order(db):
+    rows = db.query(Leaderboard).order_by(Leaderboard.rank, Leaderboard.user_id).all()
+    return [row.user_id for row in rows]
+
+
+def test_pages_cover_the_board_exactly_once(db_session):
+    _seed_board(db_session)
+    paged = []
+    for page in range(1, 6):
+        data = leaderboard_controller.get_leaderboard_page(db_session, "easy", "weekly", page, 2)
+        paged.extend(entry.user_id for entry in data.entries)
+    assert paged == _full_order(db_session)
+
+
+def test_window_around_me(db_session):
+    _seed_board(db_session)
+    order = _full_order(db_session)
+    me = order[3]
+
+    data = leaderboard_controller.get_leaderboard_window(db_session, TokenPayload(id=me), "easy", "weekly", 2)
+    assert data.me.user_id == me
+    assert [entry.user_id for entry in data.above] == order[1:3]
+    assert [entry.user_id for entry in data.below] == order[4:6]
+
+
+def test_unknown_board_is_rejected(db_session):
+    with pytest.raises(HTTPException) as exc_info:
+        leaderboard_controller.get_leaderboard_page(db_session, "easy", "yearly", 1, 10)
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,60 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from src.Config import logging_config
+from src.Config.logging_config import BackgroundQueueHandler, JsonFormatter, sample_debug
+from src.Services import tracing
+
+
+def _pipeline():
+    """A logger wired like setup_logging, writing JSON lines into a buffer."""
+    output = io.StringIO()
+    writer = logging.StreamHandler(output)
+    writer.setFormatter(JsonFormatter())
+    records = queue.SimpleQueue()
+    handler = BackgroundQueueHandler(records)
+
+    logger = logging.getLogger("test_logging.pipeline")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger, QueueListener(records, writer), output
+
+
+def test_records_are_written_as_json_by_the_writer_thread():
+    logger, listener, output = _pipeline()
+    board = ["1" * 81]
+    listener.start()
+    tracing.set_exporter(tracing.InMemoryExporter())
+    try:
+        with tracing.span("request") as request:
+            logger.info("Saving game %s", 7, extra={"current_state": board[0]})
+        board[0] = "changed after the call"
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed")
+    finally:
+        tracing.set_exporter(None)
+        listener.stop()
+
+    saved, failed = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert saved["level"] == "INFO" and saved["logger"] == "test_logging.pipeline"
+    assert saved["message"] == "Saving game 7" and saved["current_state"] == "1" * 81
+    assert saved["trace_id"] == request.trace_id
+    assert failed["level"] == "ERROR" and "trace_id" not in failed
+    assert failed["exception"].endswith("ValueError: boom")
+
+
+def test_high_volume_debug_events_are_sampled(monkeypatch):
+    logger, _, _ = _pipeline()
+    monkeypatch.setattr(logging_config, "settings", logging_config.settings.model_copy(update={"LOG_DEBUG_SAMPLE_RATE": 0.1}))
+    kept = sum(sample_debug(logger) for _ in range(2000))
+    assert 100 < kept < 300
+
+    logger.setLevel(logging.INFO)
+    monkeypatch.setattr(logging_config, "settings", logging_config.settings.model_copy(update={"LOG_DEBUG_SAMPLE_RATE": 1.0}))
+    assert not sample_debug(logger)
@@ -0,0 +1,97 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.API.Controllers.metrics_controller import get_metrics_text
+from src.API.Middleware.metrics import MetricsMiddleware
+from src.Models.TableModels import Puzzles
+from src.Services.metrics import (
+    REQUESTS,
+    REQUEST_DB_QUERIES,
+    REQUESTS_IN_FLIGHT,
+    Counter,
+    Histogram,
+    _registry,
+    instrument_engines,
+    record_queries,
+)
+
+
+def test_histogram_and_counter_render():
+    histogram = Histogram("test_latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    counter = Counter("test_requests_total", "Requests.", ("route",))
+    try:
+        histogram.observe(("/a",), 0.05)
+        histogram.observe(("/a",), 0.5)
+        histogram.observe(("/a",), 5)
+        counter.inc(("/a",))
+        counter.inc(("/a",), 2)
+
+        lines = histogram.render() + counter.render()
+        assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'test_latency_seconds_count{route="/a"} 3' in lines
+        assert 'test_requests_total{route="/a"} 3' in lines
+    finally:
+        _registry.remove(histogram)
+        _registry.remove(counter)
+
+
+def test_record_queries_counts_per_block(db_session):
+    instrument_engines()
+    instrument_engines()  # Idempotent, queries are still counted once
+
+    with record_queries() as stats:
+        db_session.execute(text("SELECT 1"))
+        db_session.query(Puzzles).all()
+    assert stats.queries == 2
+    assert stats.seconds > 0
+
+    with record_queries() as other:
+        pass
+    assert other.queries == 0
+
+
+def test_middleware_labels_by_route_template(db_session):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        assert REQUESTS_IN_FLIGHT.value() >= 1
+        db_session.execute(text("SELECT 1"))
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    instrument_engines()
+    client = TestClient(app)
+    ok = REQUESTS.value(("GET", "/items/{item_id}", "200"))
+    missing = REQUESTS.value(("GET", "/items/{item_id}", "404"))
+    unmatched = REQUESTS.value(("GET", "unmatched", "404"))
+    queries = REQUEST_DB_QUERIES.count(("GET", "/items/{item_id}"))
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+    client.get("/nothing/here")
+
+    assert REQUESTS.value(("GET", "/items/{item_id}", "200")) == ok + 2
+    assert REQUESTS.value(("GET", "/items/{item_id}", "404")) == missing + 1
+    assert REQUESTS.value(("GET", "unmatched", "404")) == unmatched + 1
+    assert REQUEST_DB_QUERIES.count(("GET", "/items/{item_id}")) == queries + 3
+    assert REQUESTS_IN_FLIGHT.value() == 0
+
+
+def test_metrics_text_includes_puzzle_pool(db_session):
+    db_session.add_all([
+        Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81, is_used=False),
+        Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81, is_used=True),
+    ])
+    db_session.commit()
+
+    lines = get_metrics_text(db_session).splitlines()
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert 'puzzle_pool_unused{difficulty="easy"} 1' in lines
+    assert 'puzzle_pool_unused{difficulty="hard"} 0' in lines
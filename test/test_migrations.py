@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, Integer, create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from src.Config.database import Base
+from src.Migrations import migrator
+from src.Migrations.migrator import Migration, get_migration_status, run_migrations, stop_migrations
+from src.Models.TableModels import ChallengeRival, Challenges, Games, Puzzles, SchemaMigration, ScoreBucket, User
+
+COMPOSITE_INDEXES = ("ix_games_user", "ix_games_completed_at", "ix_challenges_", "ix_puzzles_difficulty", "ix_leaderboard_cache_", "ix_users_best_score_")
+
+
+@pytest.fixture
+def old_database(tmp_path):
+    """A populated database from before the migrations: every table, none of the composite indexes."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name.startswith(COMPOSITE_INDEXES):
+                index.drop(bind=engine)
+
+    db = sessionmaker(bind=engine)()
+    users = [User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(4)]
+    db.add_all(users)
+    db.flush()
+    now = datetime.utcnow()
+    for i in range(30):
+        puzzle = Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81, is_used=True)
+        db.add(puzzle)
+        db.flush()
+        db.add(Games(
+            user_id=users[i % 4].id, puzzle_id=puzzle.id, was_completed=True,
+            completed_at=now - timedelta(hours=i), final_score=100 + i
+        ))
+        db.add(Challenges(
+            puzzle_id=puzzle.id, challenger_id=users[i % 4].id, opponent_id=users[(i + 1) % 4].id,
+            status="completed", winner_id=users[i % 4].id, expires_at=now, completed_at=now
+        ))
+    db.commit()
+    db.close()
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_upgrade_a_populated_database(old_database):
+    applied = run_migrations(old_database, batch_size=7, pause_seconds=0)
+
+    assert applied == ["0001", "0002", "0003", "0004", "0005"]
+    indexes = {index["name"] for index in inspect(old_database).get_indexes("games")}
+    assert {"ix_games_user_completed_last_played", "ix_games_completed_at"} <= indexes
+    indexes = {index["name"] for index in inspect(old_database).get_indexes("challenges")}
+    assert "ix_challenges_winner_status" in indexes
+    indexes = {index["name"] for index in inspect(old_database).get_indexes("leaderboard_cache")}
+    assert "ix_leaderboard_cache_board_rank" in indexes
+    indexes = {index["name"] for index in inspect(old_database).get_indexes("users")}
+    assert "ix_users_best_score_easy" in indexes
+
+    db = sessionmaker(bind=old_database)()
+    # One bucket per game (each completed in its own hour), both directions of the 4 pairs
+    assert db.query(ScoreBucket).count() == 30
+    assert db.query(ChallengeRival).count() == 8
+    assert all(row.completed_at is not None for row in db.query(SchemaMigration))
+    db.close()
+
+    status = get_migration_status(old_database)
+    assert status["0002"]["state"] == "applied"
+    assert status["0003"]["done"] == 30
+    # Everything is recorded, nothing to do the second time
+    assert run_migrations(old_database, batch_size=7, pause_seconds=0) == []
+
+
+def _double_scores(ctx):
+    ctx.add_column("games", Column("doubled_score", Integer, nullable=True))
+    games = ctx.table("games")
+    ctx.update_in_batches(games, {"doubled_score": games.c.final_score * 2}, where=games.c.doubled_score.is_(None))
+
+
+def test_interrupted_backfill_resumes_where_it_stopped(old_database):
+    def stopped_early(ctx):
+        stop_migrations()  # Stops at the end of the first batch
+        _double_scores(ctx)
+
+    assert run_migrations(old_database, [Migration("9001", "Double scores", stopped_early)], batch_size=8, pause_seconds=0) == []
+    assert migrator._status["9001"]["state"] == "interrupted"
+    assert migrator._status["9001"]["done"] == 8
+
+    assert run_migrations(old_database, [Migration("9001", "Double scores", _double_scores)], batch_size=8, pause_seconds=0) == ["9001"]
+    assert migrator._status["9001"]["done"] == 22  # Only the rows left over
+
+    with old_database.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT final_score, doubled_score FROM games").fetchall()
+    assert len(rows) == 30
+    assert all(doubled == score * 2 for score, doubled in rows)
+
+
+def test_failed_migration_stops_the_run_and_is_retried(old_database):
+    calls = []
+
+    def broken(ctx):
+        calls.append("broken")
+        raise RuntimeError("boom")
+
+    migrations = [Migration("9101", "Broken", broken), Migration("9102", "After", lambda ctx: calls.append("after"))]
+    assert run_migrations(old_database, migrations, pause_seconds=0) == []
+    assert calls == ["broken"]
+    assert migrator._status["9101"]["state"] == "failed"
+
+    migrations[0] = Migration("9101", "Fixed", lambda ctx: calls.append("fixed"))
+    assert run_migrations(old_database, migrations, pause_seconds=0) == ["9101", "9102"]
+    assert calls == ["broken", "fixed", "after"]
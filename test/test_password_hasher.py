@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from src.Security.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def test_outdated_work_factor_is_upgraded_on_verify():
+    old = PasswordHasher(rounds=4, workers=0, max_pending=1, timeout=5)
+    new = PasswordHasher(rounds=5, workers=0, max_pending=1, timeout=5)
+    hashed = old.hash("hunter22")
+
+    assert old.verify_and_update("hunter22", hashed) == (True, None)
+    assert new.verify_and_update("wrong", hashed) == (False, None)
+
+    is_valid, upgraded = new.verify_and_update("hunter22", hashed)
+    assert is_valid and upgraded.startswith("$2b$05$")
+    assert new.verify_and_update("hunter22", upgraded) == (True, None)
+
+
+def test_process_pool_round_trip_and_fast_rejection():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, timeout=30)
+    try:
+        hashed = hasher.hash("hunter22")
+        assert hasher.verify_and_update("hunter22", hashed) == (True, None)
+
+        # With the only slot taken the next caller is turned away without queueing
+        hasher._slots.acquire()
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("hunter22")
+        hasher._slots.release()
+    finally:
+        hasher.shutdown()
+
+
+def test_async_methods_await_the_process_pool():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, timeout=30)
+
+    async def round_trip():
+        hashed = await hasher.hash_async("hunter22")
+        assert await hasher.verify_and_update_async("hunter22", hashed) == (True, None)
+        hasher._slots.acquire()
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash_async("hunter22")
+        hasher._slots.release()
+
+    try:
+        asyncio.run(round_trip())
+    finally:
+        hasher.shutdown()
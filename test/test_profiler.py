@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.API.Middleware import instrumentation
+from src.API.Middleware.instrumentation import InstrumentedRoute
+from src.API.Routes import metrics_routes, system_routes
+from src.Config.database import get_db_session
+from src.Services import profiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def _client(db_session=None) -> TestClient:
+    router = APIRouter(route_class=InstrumentedRoute)
+
+    def busy_controller():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    @router.get("/slow/{item_id}")
+    def slow(item_id: int):
+        busy_controller()
+        return {"id": item_id}
+
+    @router.get("/async")
+    async def fast_async():
+        return {}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.include_router(system_routes.router, prefix="/api/system")
+    app.include_router(metrics_routes.router)
+    app.dependency_overrides[get_db_session] = lambda: db_session
+    return TestClient(app)
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, "settings", instrumentation.settings.model_copy(update={
+        "PROFILER_ENABLED": True, "PROFILER_ADMIN_TOKEN": "secret", "PROFILER_SAMPLE_RATE": 0.0,
+    }))
+    monkeypatch.setattr(profiler, "settings", profiler.settings.model_copy(update={"PROFILER_INTERVAL_SECONDS": 0.001}))
+    profiler._profiles.clear()
+
+
+def test_admin_header_profiles_the_sync_endpoint_in_its_worker(enabled):
+    client = _client()
+    client.get("/api/slow/1")
+    assert client.get("/api/system/profiles", headers=ADMIN).json()["data"] == []
+
+    assert client.get("/api/slow/1", headers={"X-Profile-Request": "wrong"}).status_code == 200
+    assert client.get("/api/slow/2", headers={"X-Profile-Request": "secret"}).json() == {"id": 2}
+    assert client.get("/api/async", headers={"X-Profile-Request": "secret"}).status_code == 200
+
+    profiles = client.get("/api/system/profiles", headers=ADMIN).json()["data"]
+    assert [profile["name"] for profile in profiles] == ["GET /api/async", "GET /api/slow/{item_id}"]
+    slow = profiles[1]
+    assert slow["wall_seconds"] >= 0.1 and slow["samples"] > 10
+
+    collapsed = client.get(f"/api/system/profiles/{slow['id']}", headers=ADMIN)
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    lines = collapsed.text.splitlines()
+    busy = [line for line in lines if ";_client.<locals>.busy_controller (test/test_profiler.py:" in line]
+    # Most samples were taken in the worker thread while the controller ran
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in busy) > slow["samples"] / 2
+
+
+def test_ring_buffer_keeps_the_latest_profiles(enabled, monkeypatch):
+    monkeypatch.setattr(profiler, "_profiles", profiler.deque(maxlen=2))
+    monkeypatch.setattr(instrumentation, "settings", instrumentation.settings.model_copy(update={"PROFILER_SAMPLE_RATE": 1.0}))
+    client = _client()
+    for _ in range(3):
+        client.get("/api/async")
+
+    ids = [profile["id"] for profile in client.get("/api/system/profiles", headers=ADMIN).json()["data"]]
+    assert len(ids) == 2 and ids[0] > ids[1]
+    assert client.get(f"/api/system/profiles/{ids[1] - 1}", headers=ADMIN).status_code == 404
+
+
+def test_disabled_profiler_leaves_routes_untouched():
+    assert not instrumentation.settings.PROFILER_ENABLED
+    client = _client()
+    route = next(route for route in client.app.routes if getattr(route, "path", None) == "/api/slow/{item_id}")
+    assert not getattr(route.endpoint, "follows_profile", False)
+
+    before = len(profiler._profiles)
+    client.get("/api/slow/1", headers={"X-Profile-Request": "secret"})
+    assert len(profiler._profiles) == before
+    assert client.get("/api/system/profiles", headers=ADMIN).status_code == 403
+
+
+def test_system_endpoints_require_the_admin_token(enabled, db_session):
+    client = _client(db_session)
+    assert client.get("/api/system/pool").status_code == 403
+    assert client.get("/api/system/pool", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/system/pool", headers=ADMIN).json()["status"] == "success"
+    assert client.get("/api/system/migrations").status_code == 403
+    # The same pool statistics are exported as gauges
+    assert client.get("/metrics").status_code == 403
+    assert "db_pool" in client.get("/metrics", headers=ADMIN).text
@@ -0,0 +1,162 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.API.Middleware.metrics import MetricsMiddleware
+from src.API.Routes.auth_routes import router as auth_router
+from src.API.Routes.challenges_routes import router as challenges_router
+from src.API.Routes.game_routers import router as game_router
+from src.API.Routes.leaderboard_routes import router as leaderboard_router
+from src.API.Routes.user_routes import router as user_router
+from src.Config.database import get_db_session
+from src.Config.read_replicas import get_read_db_session
+from src.Config.settings import get_settings
+from src.Models.TableModels import Puzzles, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Security.security import validate_user
+from src.Services.query_budget import QueryLog, assert_max_queries, instrument_implicit_loads
+
+settings = get_settings()
+
+
+@pytest.fixture
+def api(db_engine):
+    """The API routers on the test database, with `api.login(user)` choosing the authenticated user."""
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/auth")
+    app.include_router(user_router, prefix="/api/user")
+    app.include_router(game_router, prefix="/api/game")
+    app.include_router(leaderboard_router, prefix="/api/leaderboard")
+    app.include_router(challenges_router, prefix="/api/challenges")
+
+    # A session per request like get_db_session, so nothing is served from a previous request's identity map
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def session():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    current = {}
+    app.dependency_overrides[validate_user] = lambda: current["user"]
+    app.dependency_overrides[get_db_session] = session
+    app.dependency_overrides[get_read_db_session] = session
+
+    client = TestClient(app)
+    client.app_routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    client.exercised = set()
+
+    def login(user: User):
+        current["user"] = TokenPayload(id=user.id, username=user.username, email=user.email)
+    client.login = login
+    return client
+
+
+def call(api, method: str, route: str, path: str = None, **kwargs):
+    """Requests `route` and asserts it stays within its configured query budget."""
+    budget = settings.QUERY_BUDGETS.get(f"{method} {route}", settings.QUERY_BUDGET_DEFAULT)
+    with assert_max_queries(budget):
+        response = api.request(method, path or route, **kwargs)
+    assert response.status_code < 500, response.text
+    api.exercised.add((method, route))
+    return response
+
+
+def test_every_route_stays_within_its_query_budget(api, db_session):
+    db_session.add_all([
+        Puzzles(difficulty=difficulty, board_string="0" * 81, solution_string="1" * 81)
+        for difficulty in ("easy", "medium", "hard") for _ in range(3)
+    ])
+    db_session.commit()
+
+    for name in ("alice", "bob"):
+        body = {"username": name, "email": f"{name}@example.com", "password": "correct horse"}
+        assert call(api, "POST", "/api/auth/register", json=body).status_code == 201
+    alice = db_session.query(User).filter(User.username == "alice").one()
+    bob = db_session.query(User).filter(User.username == "bob").one()
+
+    login = call(api, "POST", "/api/auth/login", json={"email": "alice@example.com", "password": "correct horse"})
+    call(api, "POST", "/api/auth/refresh", json={"refresh_token": login.json()["refresh_token"]})
+
+    api.login(alice)
+    puzzle = call(api, "GET", "/api/game/new_game/{difficulty}", "/api/game/new_game/easy").json()
+    call(api, "GET", "/api/user/in_progress_game")
+    call(api, "PUT", "/api/game/update_game", json={
+        "id": puzzle["gameId"], "difficulty": "easy", "was_completed": True, "duration_seconds": 300,
+        "errors_made": 1, "hints_used": 0, "final_score": 900, "current_state": "1" * 81,
+    })
+
+    challenge = call(api, "POST", "/api/challenges/", json={
+        "puzzle_id": puzzle["id"], "opponent_id": str(bob.id), "challenger_duration": 300
+    }).json()
+    api.login(bob)
+    call(api, "GET", "/api/challenges/")
+    call(api, "POST", "/api/challenges/{challenge_id}/respond", f"/api/challenges/{challenge['id']}/respond",
+         json={"action": "accept"})
+    call(api, "POST", "/api/challenges/{challenge_id}/complete", f"/api/challenges/{challenge['id']}/complete",
+         json={"opponent_duration": 250})
+
+    api.login(alice)
+    call(api, "GET", "/api/user/")
+    call(api, "GET", "/api/user/user_list")
+    history = call(api, "GET", "/api/user/game_history").json()
+    # Challenges have no game of their own
+    assert [item["puzzle"]["gameId"] for item in history if item["is_challenge"]] == [None]
+
+    call(api, "GET", "/api/leaderboard/")
+    call(api, "GET", "/api/leaderboard/board/{difficulty}/{timespan}", "/api/leaderboard/board/easy/all_time")
+    call(api, "GET", "/api/leaderboard/board/{difficulty}/{timespan}/around_me",
+         "/api/leaderboard/board/easy/all_time/around_me")
+    call(api, "GET", "/api/leaderboard/rivals")
+
+    api.login(bob)
+    assert call(api, "DELETE", "/api/user/").status_code == 204
+    assert db_session.query(User).filter(User.username == "bob").count() == 0
+
+    assert api.exercised == api.app_routes
+
+
+def test_over_budget_reports_statements_and_lazy_loads(db_session):
+    instrument_implicit_loads()
+    db_session.add(Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81))
+    db_session.commit()
+
+    with pytest.raises(AssertionError) as failure:
+        with assert_max_queries(1) as log:
+            db_session.execute(text("SELECT 1"))
+            puzzle = db_session.query(Puzzles).first()
+            db_session.commit()
+            puzzle.difficulty  # Expired by the commit
+    assert isinstance(log, QueryLog)
+    message = str(failure.value)
+    assert message.startswith(f"{log.queries} queries, expected at most 1")
+    assert "SELECT 1" in message
+    assert "refresh of expired Puzzles, triggered at:" in message
+    assert "test/test_query_budgets.py" not in message  # Only app frames are reported
+
+
+def test_middleware_logs_requests_over_budget(db_session, caplog):
+    instrument_implicit_loads()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, query_budgets={"GET /cheap": 2}, default_query_budget=0)
+
+    @app.get("/cheap")
+    def cheap():
+        db_session.execute(text("SELECT 1"))
+
+    @app.get("/expensive")
+    def expensive():
+        db_session.execute(text("SELECT 2"))
+
+    client = TestClient(app)
+    client.get("/cheap")
+    assert not caplog.records
+    client.get("/expensive")
+    [record] = caplog.records
+    assert record.levelname == "WARNING"
+    assert "GET /expensive ran 1 queries, over its budget of 0:\n  1. SELECT 2" in record.getMessage()
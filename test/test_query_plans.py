@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.API.Controllers import challenges_controller, game_controller, user_controller
+from src.Models.TableModels import Challenges, Games, Puzzles, User
+
+
+@pytest.fixture
+def populated(db_session):
+    """A few users with puzzles, games and challenges, so the planner has rows to weigh."""
+    users = [User(id=uuid.uuid4(), username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(5)]
+    db_session.add_all(users)
+    now = datetime.utcnow()
+    for i in range(40):
+        puzzle = Puzzles(
+            difficulty=["easy", "medium", "hard"][i % 3],
+            is_used=i % 2 == 0,
+            board_string="0" * 81,
+            solution_string="1" * 81
+        )
+        db_session.add(puzzle)
+        db_session.flush()
+        user = users[i % len(users)]
+        db_session.add(Games(
+            user_id=user.id, puzzle_id=puzzle.id, was_completed=i % 4 == 0,
+            completed_at=now - timedelta(hours=i) if i % 4 == 0 else None,
+            last_played=now - timedelta(minutes=i), final_score=i * 10
+        ))
+        db_session.add(Challenges(
+            challenger_id=user.id, opponent_id=users[(i + 1) % len(users)].id,
+            puzzle_id=puzzle.id, status=["pending", "accepted", "completed"][i % 3],
+            winner_id=user.id if i % 3 == 2 else None,
+            created_at=now - timedelta(minutes=i), expires_at=now + timedelta(days=1),
+            completed_at=now - timedelta(minutes=i) if i % 3 == 2 else None
+        ))
+    db_session.commit()
+    return db_session, users[0].id
+
+
+def explain(db, query):
+    """SQLite's EXPLAIN QUERY PLAN detail lines for the exact SQL the query emits."""
+    connection = db.connection()
+    emitted = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        emitted.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        query.all()
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    statement, parameters = emitted[0]
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def assert_uses_index(plan, table, index):
+    assert not any(line.startswith(f"SCAN {table}") and "INDEX" not in line for line in plan), plan
+    assert any(line.startswith(f"SEARCH {table}") and index in line for line in plan), plan
+
+
+def test_in_progress_game_uses_index(populated):
+    db, user_id = populated
+    plan = explain(db, user_controller._in_progress_game_query(db, user_id))
+    assert_uses_index(plan, "games", "ix_games_user_completed_last_played")
+
+
+def test_completed_games_use_index(populated):
+    db, user_id = populated
+    plan = explain(db, user_controller._completed_games_query(db, user_id))
+    assert_uses_index(plan, "games", "ix_games_user_completed_completed_at")
+
+
+def test_completed_challenges_use_indexes(populated):
+    db, user_id = populated
+    plan = explain(db, user_controller._completed_challenges_query(db, user_id))
+    assert any("ix_challenges_challenger_status_created" in line for line in plan), plan
+    assert any("ix_challenges_opponent_status_created" in line for line in plan), plan
+    assert not any(line.startswith("SCAN challenges") for line in plan), plan
+
+
+def test_challenges_won_uses_index(populated):
+    db, user_id = populated
+    plan = explain(db, user_controller._challenges_won_query(db, user_id))
+    assert_uses_index(plan, "challenges", "ix_challenges_winner_status")
+
+
+def test_my_challenges_use_indexes(populated):
+    db, user_id = populated
+    plan = explain(db, challenges_controller._my_challenges_query(db, user_id))
+    assert any("ix_challenges_challenger_status_created" in line for line in plan), plan
+    assert any("ix_challenges_opponent_status_created" in line for line in plan), plan
+    assert not any(line.startswith("SCAN challenges") for line in plan), plan
+
+
+def test_unused_puzzles_use_index(populated):
+    db, _ = populated
+    plan = explain(db, game_controller._unused_puzzles_query(db, "easy"))
+    assert_uses_index(plan, "puzzles", "ix_puzzles_difficulty_is_used")
+
@@ -0,0 +1,83 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.API.Middleware.rate_limit import MemoryBucketStore, RateLimitMiddleware, parse_rate_limits
+from src.Security.security import create_access_token
+
+
+def _client(limits) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/game/new_game/{difficulty}")
+    def new_game(difficulty: str):
+        return {"difficulty": difficulty}
+
+    @app.post("/api/auth/login")
+    def login():
+        return {"status": "success"}
+
+    app.add_middleware(RateLimitMiddleware, limits=limits, store=MemoryBucketStore(max_keys=100))
+    return TestClient(app)
+
+
+def test_ip_limit_rejects_with_retry_after():
+    client = _client({"POST /api/auth/login": {"rate": 0.5, "burst": 2, "per": "ip"}})
+
+    assert [client.post("/api/auth/login").status_code for _ in range(2)] == [200, 200]
+    rejected = client.post("/api/auth/login")
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "2"
+    # Unlimited routes are untouched
+    assert client.get("/api/game/new_game/easy").status_code == 200
+
+
+def test_user_limit_covers_sub_paths_and_is_per_user():
+    client = _client({"GET /api/game/new_game": {"rate": 0.01, "burst": 1, "per": "user"}})
+    alice = {"Authorization": "Bearer " + create_access_token({"id": str(uuid.uuid4())})}
+    bob = {"Authorization": "Bearer " + create_access_token({"id": str(uuid.uuid4())})}
+
+    assert client.get("/api/game/new_game/easy", headers=alice).status_code == 200
+    assert client.get("/api/game/new_game/hard", headers=alice).status_code == 429
+    assert client.get("/api/game/new_game/easy", headers=bob).status_code == 200
+
+
+def test_memory_store_is_bounded():
+    store = MemoryBucketStore(max_keys=3)
+    for i in range(10):
+        asyncio.run(store.take(f"key{i}", rate=1.0, burst=1))
+    assert len(store._buckets) == 3
+
+
+def test_challenge_rule_covers_creation_and_sub_paths():
+    app = FastAPI()
+
+    @app.post("/api/challenges/")
+    def create_challenge():
+        return {}
+
+    @app.post("/api/challenges/{challenge_id}/respond")
+    def respond(challenge_id: str):
+        return {}
+
+    app.add_middleware(RateLimitMiddleware, limits={"POST /api/challenges/": {"rate": 0.01, "burst": 2, "per": "user"}},
+                       store=MemoryBucketStore(max_keys=100))
+    client = TestClient(app)
+    me = {"Authorization": "Bearer " + create_access_token({"id": str(uuid.uuid4())})}
+
+    assert client.post("/api/challenges/", headers=me).status_code == 200
+    assert client.post("/api/challenges/abc/respond", headers=me).status_code == 200
+    assert client.post("/api/challenges/", headers=me).status_code == 429
+
+
+@pytest.mark.parametrize("limit, message", [
+    ({"rate": 0, "burst": 5}, "rate must be greater than 0"),
+    ({"rate": 1, "burst": 0}, "burst must be at least 1"),
+    ({"rate": 1, "burst": 5, "per": "session"}, "per must be 'ip' or 'user'"),
+])
+def test_invalid_rules_are_rejected_at_startup(limit, message):
+    with pytest.raises(ValueError, match=message):
+        parse_rate_limits({"POST /api/auth/login": limit})
@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.orm import sessionmaker
+
+from src.API.Controllers import auth_controller
+from src.Config import async_database, database, read_replicas
+from src.Config.database import Base
+from src.Config.settings import get_settings
+from src.Models.TableModels import User
+from src.Schemas.auth_schema import CreateUser, TokenPayload
+from src.Security.security import create_access_token
+
+
+def _sqlite_file(path, username, user_id=None):
+    """A database file holding a single user, so each one can be told apart."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(id=user_id or uuid.uuid4(), username=username, email=f"{username}@example.com", hashed_password="x"))
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path, monkeypatch):
+    primary = _sqlite_file(tmp_path / "primary.db", "on-primary")
+    _sqlite_file(tmp_path / "replica.db", "on-replica").dispose()
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=primary))
+    monkeypatch.setattr(read_replicas, "settings", read_replicas.settings.model_copy(update={"DB_REPLICA_URLS": [
+        f"sqlite:///{tmp_path / 'missing' / 'down.db'}",  # Cannot be opened, acts as a dead replica
+        f"sqlite:///{tmp_path / 'replica.db'}"
+    ]}))
+    read_replicas.init_read_replicas()
+    read_replicas._recent_writers.clear()
+    yield
+    read_replicas.close_read_replicas()
+    primary.dispose()
+
+
+def _read_username(user: TokenPayload) -> str:
+    dependency = read_replicas.get_read_db_session(user)
+    db = next(dependency)
+    try:
+        return db.query(User.username).scalar()
+    finally:
+        dependency.close()
+
+
+def test_reads_go_to_a_live_replica(primary_and_replica):
+    user = TokenPayload(id=uuid.uuid4())
+
+    # Both round robin starting points skip the dead replica
+    assert _read_username(user) == "on-replica"
+    assert _read_username(user) == "on-replica"
+    assert read_replicas._down_until[0] > 0
+
+
+def test_recent_writers_read_from_the_primary(primary_and_replica):
+    user = TokenPayload(id=uuid.uuid4())
+    read_replicas.record_primary_write(user.id)
+
+    assert _read_username(user) == "on-primary"
+    assert _read_username(TokenPayload(id=uuid.uuid4())) == "on-replica"
+
+
+def test_falls_back_to_the_primary_when_every_replica_is_down(primary_and_replica, monkeypatch):
+    monkeypatch.setattr(read_replicas, "_down_until", [float("inf")] * len(read_replicas.replica_engines))
+
+    assert _read_username(TokenPayload(id=uuid.uuid4())) == "on-primary"
+
+
+def test_new_users_read_their_profile_from_the_primary(primary_and_replica):
+    db = database.SessionLocal()
+    try:
+        registered = asyncio.run(auth_controller.create_user(
+            CreateUser(username="newcomer", email="newcomer@example.com", password="correct horse"), db
+        ))
+    finally:
+        db.close()
+
+    user = TokenPayload(id=uuid.UUID(registered["userId"]))
+    dependency = read_replicas.get_read_db_session(user)
+    try:
+        # The replica does not have the new user
+        assert next(dependency).query(User.username).filter(User.id == user.id).scalar() == "newcomer"
+    finally:
+        dependency.close()
+
+
+def test_replica_failing_a_query_is_skipped_by_the_next_reads(primary_and_replica, tmp_path):
+    broken = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    with broken.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE users")
+    broken.dispose()
+    user = TokenPayload(id=uuid.uuid4())
+
+    dependency = read_replicas.get_read_db_session(user)
+    db = next(dependency)
+    with pytest.raises(sa_exc.OperationalError):
+        try:
+            db.query(User.username).scalar()
+        except sa_exc.DBAPIError as error:
+            # What FastAPI does with an exception raised by the route
+            dependency.throw(error)
+
+    assert read_replicas._down_until[1] > 0
+    assert _read_username(user) == "on-primary"
+
+
+def test_async_profile_route_reads_from_a_replica_by_default(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from src.API.Routes import async_routes
+
+    # The default settings register the async routes ahead of the sync ones
+    assert get_settings().ASYNC_DB_ENABLED
+
+    user_id = uuid.uuid4()
+    _sqlite_file(tmp_path / "primary.db", "on-primary", user_id).dispose()
+    _sqlite_file(tmp_path / "replica.db", "on-replica", user_id).dispose()
+    primary = create_async_engine(async_database.to_async_url(f"sqlite:///{tmp_path / 'primary.db'}"))
+    monkeypatch.setattr(async_database, "AsyncSessionLocal", async_sessionmaker(primary, expire_on_commit=False))
+    monkeypatch.setattr(read_replicas, "settings", read_replicas.settings.model_copy(update={
+        "DB_REPLICA_URLS": f"sqlite:///{tmp_path / 'replica.db'}"
+    }))
+    read_replicas._recent_writers.clear()
+
+    app = FastAPI()
+    app.include_router(async_routes.user_router, prefix="/api/user")
+    headers = {"Authorization": "Bearer " + create_access_token({"id": str(user_id)})}
+
+    with TestClient(app) as client:
+        client.portal.call(read_replicas.init_async_read_replicas)
+        try:
+            assert client.get("/api/user/", headers=headers).json()["message"]["username"] == "on-replica"
+            read_replicas.record_primary_write(user_id)
+            assert client.get("/api/user/", headers=headers).json()["message"]["username"] == "on-primary"
+        finally:
+            client.portal.call(read_replicas.close_async_read_replicas)
+            client.portal.call(primary.dispose)
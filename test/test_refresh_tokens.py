@@ -0,0 +1,52 @@
+import uuid
+
+import pytest
+from jose import JWTError
+
+from src.Models.TableModels import RefreshToken, User
+from src.Security import security
+from src.Security.refresh_tokens import RefreshTokenError, create_refresh_token, rotate_refresh_token
+
+
+@pytest.fixture
+def claims(db_session):
+    user = User(id=uuid.uuid4(), username="player", email="player@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return {"email": user.email, "username": user.username, "id": str(user.id)}
+
+
+def test_rotation_issues_a_new_token_and_stores_only_hashes(db_session, claims):
+    token = create_refresh_token(db_session, claims)
+    db_session.commit()
+
+    access_claims, rotated = rotate_refresh_token(db_session, token)
+
+    assert access_claims == claims
+    assert rotated != token
+    stored = db_session.query(RefreshToken).all()
+    assert len(stored) == 2
+    assert all(token not in (row.token_hash, rotated) for row in stored)
+    assert rotate_refresh_token(db_session, rotated)[0] == claims
+
+
+def test_reuse_revokes_the_whole_family(db_session, claims):
+    token = create_refresh_token(db_session, claims)
+    db_session.commit()
+    _, rotated = rotate_refresh_token(db_session, token)
+
+    with pytest.raises(RefreshTokenError):
+        rotate_refresh_token(db_session, token)
+    # The legitimate successor is revoked as well
+    with pytest.raises(RefreshTokenError):
+        rotate_refresh_token(db_session, rotated)
+
+
+def test_token_types_are_not_interchangeable(db_session, claims):
+    refresh = create_refresh_token(db_session, claims)
+    db_session.commit()
+
+    with pytest.raises(JWTError):
+        security.decode_access_token(refresh)
+    with pytest.raises(RefreshTokenError):
+        rotate_refresh_token(db_session, security.create_access_token(claims))
@@ -0,0 +1,96 @@
+from sqlalchemy.orm import sessionmaker
+
+from src.API.Controllers import challenges_controller, leaderboard_controller
+from src.Config import database
+from src.Models.TableModels import ChallengeRival, Puzzles, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Schemas.challenges_schema import ChallengeCreate, ChallengeRespond, ChallengeComplete
+from src.Services.rivals_service import backfill_rival_index
+
+
+def _setup(db):
+    users = {}
+    for name, score in [("me", 500), ("ann", 900), ("bob", 300)]:
+        users[name] = User(username=name, email=f"{name}@example.com", hashed_password="x", best_score_easy=score)
+        db.add(users[name])
+    puzzle = Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81)
+    db.add(puzzle)
+    db.commit()
+    return users, puzzle
+
+
+def _play(db, challenger, opponent, puzzle, challenger_duration, opponent_duration):
+    created = challenges_controller.create_challenge(
+        TokenPayload(id=challenger.id), db,
+        ChallengeCreate(puzzle_id=puzzle.id, opponent_id=opponent.id, challenger_duration=challenger_duration)
+    )
+    challenges_controller.respond_to_challenge(TokenPayload(id=opponent.id), db, created.id, ChallengeRespond(action="accept"))
+    challenges_controller.complete_challenge(TokenPayload(id=opponent.id), db, created.id, ChallengeComplete(opponent_duration=opponent_duration))
+
+
+def test_rivals_ranked_by_score_and_wins(db_session):
+    users, puzzle = _setup(db_session)
+    # ann beats me once, I beat bob twice
+    _play(db_session, users["me"], users["ann"], puzzle, 200, 100)
+    _play(db_session, users["me"], users["bob"], puzzle, 100, 200)
+    _play(db_session, users["bob"], users["me"], puzzle, 200, 100)
+
+    me = TokenPayload(id=users["me"].id)
+    by_score = leaderboard_controller.get_rivals_leaderboard(db_session, me, "easy", "score", 10)
+    assert [(entry.username, entry.rank, entry.is_self) for entry in by_score.entries] == [
+        ("ann", 1, False), ("me", 2, True), ("bob", 3, False)
+    ]
+
+    by_wins = leaderboard_controller.get_rivals_leaderboard(db_session, me, "easy", "wins", 10)
+    assert [(entry.username, entry.wins, entry.losses, entry.challenges) for entry in by_wins.entries] == [
+        ("ann", 1, 0, 1), ("bob", 0, 2, 2)
+    ]
+
+
+def test_backfill_matches_incremental_index(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(database, "getSessionLocal", lambda: sessionmaker(bind=db_engine))
+    users, puzzle = _setup(db_session)
+    _play(db_session, users["me"], users["ann"], puzzle, 200, 100)
+    _play(db_session, users["bob"], users["me"], puzzle, 200, 100)
+
+    def snapshot():
+        return sorted(
+            (str(edge.user_id), str(edge.rival_id), edge.challenges_count, edge.wins, edge.losses)
+            for edge in db_session.query(ChallengeRival).all()
+        )
+
+    incremental = snapshot()
+    db_session.query(ChallengeRival).delete()
+    db_session.commit()
+    backfill_rival_index()
+    db_session.expire_all()
+    assert snapshot() == incremental
+
+
+def test_backfill_merges_with_live_edges(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(database, "getSessionLocal", lambda: sessionmaker(bind=db_engine))
+    users, puzzle = _setup(db_session)
+    _play(db_session, users["me"], users["ann"], puzzle, 200, 100)
+    _play(db_session, users["me"], users["bob"], puzzle, 100, 200)
+
+    def snapshot():
+        return sorted(
+            (str(edge.user_id), str(edge.rival_id), edge.challenges_count, edge.wins, edge.losses)
+            for edge in db_session.query(ChallengeRival).all()
+        )
+
+    # History from before the deploy, then a challenge recorded live before the backfill runs
+    db_session.query(ChallengeRival).delete()
+    db_session.commit()
+    _play(db_session, users["bob"], users["me"], puzzle, 200, 100)
+    assert len(snapshot()) == 2
+
+    for _ in range(2):
+        backfill_rival_index()
+    db_session.expire_all()
+    edges = {(edge.user_id, edge.rival_id): (edge.challenges_count, edge.wins, edge.losses)
+             for edge in db_session.query(ChallengeRival).all()}
+    assert edges[(users["me"].id, users["bob"].id)] == (2, 2, 0)
+    assert edges[(users["bob"].id, users["me"].id)] == (2, 0, 2)
+    assert edges[(users["ann"].id, users["me"].id)] == (1, 1, 0)
+    assert len(edges) == 4
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+from src.Config.scheduler import run_blocking, get_job_metrics
+
+
+def test_run_blocking_does_not_block_event_loop():
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(
+            run_blocking("test_sleeping_job", time.sleep, 0.2),
+            ticker()
+        )
+
+    asyncio.run(main())
+    # The ticker kept running while the job slept in the pool
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.2
+    assert get_job_metrics()["test_sleeping_job"]["success"] == 1
+
+
+def test_run_blocking_timeout_prevents_overlap():
+    release = threading.Event()
+
+    async def main():
+        timed_out = await run_blocking("test_stuck_job", release.wait, timeout=0.05)
+        # The timed out body is still running, a second run must be skipped
+        skipped = await run_blocking("test_stuck_job", release.wait, timeout=0.05)
+        release.set()
+        await asyncio.sleep(0.05)
+        finished = await run_blocking("test_stuck_job", lambda: None)
+        return timed_out, skipped, finished
+
+    timed_out, skipped, finished = asyncio.run(main())
+    metrics = get_job_metrics()["test_stuck_job"]
+    assert (timed_out, skipped, finished) == (False, False, True)
+    assert metrics["timeout"] == 1
+    assert metrics["skipped"] == 1
+    assert metrics["success"] == 1
+
+
+def test_run_blocking_records_failures():
+    def broken():
+        raise ValueError("boom")
+
+    assert asyncio.run(run_blocking("test_broken_job", broken)) is False
+    assert get_job_metrics()["test_broken_job"]["failure"] == 1
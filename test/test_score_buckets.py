@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from src.Config import database
+from src.Models.TableModels import Games, Leaderboard, Puzzles, ScoreBucket, User
+from src.Services import leaderboard_services
+from src.Services.leaderboard_services import build_score_buckets, record_score_bucket, get_window_start
+
+
+def _add_user(db, username):
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    return user
+
+
+def test_bucket_keeps_the_best_score_of_the_hour(db_session):
+    user = _add_user(db_session, "alice")
+    played_at = datetime(2026, 10, 19, 14, 5)
+    record_score_bucket(db_session, user.id, "easy", 300, played_at)
+    record_score_bucket(db_session, user.id, "easy", 500, played_at + timedelta(minutes=20))
+    record_score_bucket(db_session, user.id, "easy", 400, played_at + timedelta(minutes=40))
+    db_session.commit()
+
+    buckets = db_session.query(ScoreBucket).all()
+    assert len(buckets) == 1
+    assert buckets[0].best_score == 500
+    assert buckets[0].bucket_start == datetime(2026, 10, 19, 14, 0)
+
+
+def test_backfill_merges_with_live_buckets(db_session):
+    user = _add_user(db_session, "alice")
+    hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    for offset, score in [(0, 300), (1, 800)]:
+        puzzle = Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81, is_used=True)
+        db_session.add(puzzle)
+        db_session.flush()
+        db_session.add(Games(user_id=user.id, puzzle_id=puzzle.id, was_completed=True,
+                             completed_at=hour + timedelta(hours=offset, minutes=10), final_score=score))
+    # A game finished after the deploy, before the backfill ran
+    record_score_bucket(db_session, user.id, "easy", 500, hour + timedelta(minutes=50))
+    db_session.commit()
+
+    for _ in range(2):
+        build_score_buckets(db_session, batch_size=1)
+        db_session.commit()
+
+    buckets = db_session.query(ScoreBucket).order_by(ScoreBucket.bucket_start).all()
+    assert [bucket.best_score for bucket in buckets] == [500, 800]
+
+
+def test_rolling_windows_count_back_whole_hours():
+    now = datetime(2026, 10, 19, 14, 35)
+    assert get_window_start("last_24h", now) == datetime(2026, 10, 18, 15, 0)
+    assert get_window_start("last_7d", now) == datetime(2026, 10, 12, 15, 0)
+    assert get_window_start("daily", now) == datetime(2026, 10, 19, 0, 0)
+    assert get_window_start("weekly", now) == datetime(2026, 10, 19, 0, 0)
+    assert get_window_start("yearly", now) is None
+
+
+def test_rolling_leaderboard_is_built_from_buckets(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(database, "getSessionLocal", lambda: sessionmaker(bind=db_engine))
+    alice = _add_user(db_session, "alice")
+    bob = _add_user(db_session, "bob")
+    now = datetime.utcnow()
+    record_score_bucket(db_session, alice.id, "easy", 700, now - timedelta(hours=2))
+    record_score_bucket(db_session, bob.id, "easy", 900, now - timedelta(hours=1))
+    # Outside the last 24 hours, must be ignored
+    record_score_bucket(db_session, alice.id, "easy", 2000, now - timedelta(days=3))
+    db_session.commit()
+
+    leaderboard_services.update_periodic_leaderboard("last_24h")
+
+    rows = db_session.query(Leaderboard).filter(Leaderboard.timespan == "last_24h").order_by(Leaderboard.rank).all()
+    assert [(row.username, row.total_score, row.rank) for row in rows] == [("bob", 900, 1), ("alice", 700, 2)]
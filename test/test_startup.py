@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+from benchmarks import profile_startup
+from benchmarks.profile_startup import IMPORT_BUDGET_SECONDS, ROOT, child_env, import_profile, import_seconds
+from src.Config.settings import get_settings, reload_settings
+from src.Security import security
+from src.Services import leaderboard_response_cache
+
+
+def test_settings_are_cached_and_immutable():
+    settings = get_settings()
+    assert get_settings() is settings
+    with pytest.raises(ValidationError):
+        settings.APP_NAME = "changed"
+
+
+def test_reload_rebinds_the_module_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setenv("LEADERBOARD_VERSION_CHECK_SECONDS", "42")
+    try:
+        reloaded = reload_settings()
+        assert reloaded is not settings and get_settings() is reloaded
+        assert leaderboard_response_cache.settings.LEADERBOARD_VERSION_CHECK_SECONDS == 42
+        assert security.settings is reloaded
+    finally:
+        monkeypatch.delenv("LEADERBOARD_VERSION_CHECK_SECONDS")
+        reload_settings()
+
+
+def test_heavy_optional_modules_are_lazy(tmp_path):
+    env = dict(child_env(str(tmp_path / "lazy.db")), ASYNC_DB_ENABLED="false")
+    lazy = ["passlib", "sqlalchemy.ext.asyncio", "src.API.Routes.async_routes"]
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, src.main; print([m for m in {lazy!r} if m in sys.modules])"],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+
+def test_import_within_budget(tmp_path):
+    modules = import_profile(child_env(str(tmp_path / "import.db")))
+    assert import_seconds(modules) < IMPORT_BUDGET_SECONDS
+
+
+def test_cold_start_budget_is_enforced(monkeypatch, capsys):
+    # Fixed measurements in place of the fresh interpreters
+    modules = [("src.main", 1000, 1_200_000)]
+    monkeypatch.setattr(profile_startup, "import_profile", lambda env: modules)
+    phases = {"interpreter": 0.1, "import": 1.2, "startup": 0.3, "first_request": 0.05, "time_to_first_request": 1.7}
+    monkeypatch.setattr(profile_startup, "measure_cold_start", lambda env: phases)
+
+    monkeypatch.setattr(sys, "argv", ["profile_startup", "--runs", "1", "--budget", "2.0", "--import-budget", "1.5"])
+    profile_startup.main()
+    assert "Over budget" not in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["profile_startup", "--runs", "1", "--budget", "1.5", "--import-budget", "1.0"])
+    with pytest.raises(SystemExit) as exit_info:
+        profile_startup.main()
+    assert exit_info.value.code == 1
+    out = capsys.readouterr().out
+    assert "1.20s to import src.main" in out and "1.70s to the first request" in out
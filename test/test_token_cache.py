@@ -0,0 +1,39 @@
+import base64
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from src.Security import security
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    security._decoded_tokens.clear()
+    yield
+    security._decoded_tokens.clear()
+
+
+def test_decoded_token_is_cached_until_exp():
+    token = security.create_access_token({"sub": "player", "id": str(uuid.uuid4())}, timedelta(minutes=5))
+
+    first = security.decode_access_token(token)
+    assert security.decode_access_token(token) is first
+    assert len(security._decoded_tokens) == 1
+
+
+def test_known_signature_with_forged_payload_is_rejected():
+    user_id = str(uuid.uuid4())
+    token = security.create_access_token({"sub": "player", "id": user_id})
+    security.decode_access_token(token)
+
+    header, payload, signature = token.split(".")
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    claims["id"] = str(uuid.uuid4())
+    forged_payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+
+    with pytest.raises(JWTError):
+        security.decode_access_token(f"{header}.{forged_payload}.{signature}")
+    assert str(security.decode_access_token(token).id) == user_id
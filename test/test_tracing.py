@@ -0,0 +1,93 @@
+import pytest
+from fastapi import APIRouter, BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.API.Middleware import instrumentation
+from src.API.Middleware.instrumentation import InstrumentedRoute
+from src.Services import tracing
+from src.Services.tracing import InMemoryExporter, JsonLinesExporter, add_traced_task, traced
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    monkeypatch.setattr(instrumentation, "settings", instrumentation.settings.model_copy(update={"TRACING_ENABLED": True}))
+    tracing.instrument_sql_spans()
+    exporter = InMemoryExporter()
+    tracing.set_exporter(exporter)
+    yield exporter
+    tracing.set_exporter(None)
+
+
+def _client(db_engine) -> TestClient:
+    router = APIRouter(route_class=InstrumentedRoute)
+
+    def refill(count: int):
+        with db_engine.connect() as conn:
+            conn.execute(text("SELECT :count"), {"count": count})
+
+    @traced()
+    def controller(background_tasks: BackgroundTasks):
+        with db_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        add_traced_task(background_tasks, refill, 2)
+        return {"ok": True}
+
+    @router.get("/work")
+    def work(background_tasks: BackgroundTasks):
+        return controller(background_tasks)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def test_request_trace_covers_controller_sql_and_background_task(exporter, db_engine):
+    response = _client(db_engine).get("/api/work")
+    trace_id = response.headers["X-Trace-Id"]
+    spans = {span.name: span for span in exporter.trace(trace_id)}
+
+    route = spans["GET /api/work"]
+    assert route.parent_id is None and route.attributes["status"] == 200
+    controller = spans["test_tracing._client.<locals>.controller"]
+    assert controller.parent_id == route.span_id
+
+    sql = [span for span in exporter.trace(trace_id) if span.name == "sql"]
+    assert [span.attributes["statement"] for span in sql] == ["SELECT 1", "SELECT ?"]
+    assert sql[0].parent_id == controller.span_id
+
+    background = spans["background _client.<locals>.refill"]
+    assert background.parent_id == controller.span_id
+    assert sql[1].parent_id == background.span_id
+
+
+def test_traceparent_continues_the_callers_trace(exporter, db_engine):
+    caller = "0af7651916cd43dd8448eb211c80319c"
+    response = _client(db_engine).get("/api/work", headers={"traceparent": f"00-{caller}-b7ad6b7169203331-01"})
+    assert response.headers["X-Trace-Id"] == caller
+    route = next(span for span in exporter.trace(caller) if span.name == "GET /api/work")
+    assert route.parent_id == "b7ad6b7169203331"
+
+    # A malformed header starts a new trace
+    response = _client(db_engine).get("/api/work", headers={"traceparent": "garbage"})
+    assert response.headers["X-Trace-Id"] != caller
+
+
+def test_json_lines_exporter_and_disabled_tracing(db_engine, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.set_exporter(JsonLinesExporter(str(path)))
+    try:
+        for _ in range(200):
+            with tracing.span("job cleanup", job="cleanup"):
+                pass
+    finally:
+        # Closing the exporter writes out the queued spans
+        tracing.set_exporter(None)
+    lines = path.read_text().splitlines()
+    assert len(lines) == 200 and '"name": "job cleanup"' in lines[-1]
+
+    # Off, no spans are recorded and no header is set
+    response = _client(db_engine).get("/api/work")
+    assert response.status_code == 200 and "X-Trace-Id" not in response.headers
+    with tracing.span("nothing") as current:
+        assert current is None
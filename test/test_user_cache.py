@@ -0,0 +1,109 @@
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import sessionmaker
+
+from src.API.Controllers import user_controller
+from src.Models.TableModels import Games, Leaderboard, Puzzles, User
+from src.Schemas.auth_schema import TokenPayload
+from src.Security import security
+from src.Services.leaderboard_response_cache import bump_leaderboard_version, get_leaderboard_version, invalidate_leaderboard_cache
+from src.Services.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def session_counter(db_engine, monkeypatch):
+    """Routes validate_user's lookups to the test database and counts the sessions opened."""
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    opened = []
+
+    def session_local():
+        opened.append(1)
+        return factory()
+
+    monkeypatch.setattr(security, "getSessionLocal", lambda: session_local)
+    security._verified_users.clear()
+    yield opened
+    security._verified_users.clear()
+
+
+def _credentials(user_id) -> HTTPAuthorizationCredentials:
+    token = security.create_access_token({"sub": "player", "id": str(user_id)})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _add_user(db_session) -> User:
+    user = User(id=uuid.uuid4(), username=f"player-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex}@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_verified_user_is_served_from_cache(db_session, session_counter):
+    user = _add_user(db_session)
+
+    for _ in range(3):
+        assert security.validate_user(_credentials(user.id)).id == user.id
+
+    assert len(session_counter) == 1
+
+
+def test_unknown_user_is_negatively_cached(db_session, session_counter):
+    unknown = uuid.uuid4()
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            security.validate_user(_credentials(unknown))
+        assert error.value.status_code == 401
+
+    assert len(session_counter) == 1
+
+
+def test_denied_user_is_rejected_at_once(db_session, session_counter):
+    user = _add_user(db_session)
+    credentials = _credentials(user.id)
+    security.validate_user(credentials)
+
+    security.deny_cached_user(user.id)
+    assert security._decoded_tokens.get(credentials.credentials.rpartition(".")[2]) is None
+    with pytest.raises(HTTPException):
+        security.validate_user(credentials)
+
+
+def test_account_removal_invalidates_the_caches(db_session, session_counter):
+    user = _add_user(db_session)
+    puzzle = Puzzles(difficulty="easy", board_string="0" * 81, solution_string="1" * 81, is_used=True)
+    db_session.add(puzzle)
+    db_session.flush()
+    db_session.add(Games(user_id=user.id, puzzle_id=puzzle.id, was_completed=True, final_score=500))
+    db_session.add(Leaderboard(user_id=user.id, username=user.username, difficulty="easy", timespan="weekly", total_score=500, rank=1))
+    bump_leaderboard_version(db_session, "weekly")
+    db_session.commit()
+    invalidate_leaderboard_cache()
+    credentials = _credentials(user.id)
+    security.validate_user(credentials)
+    version = get_leaderboard_version(db_session)
+
+    user_controller.delete_user(db_session, TokenPayload(id=user.id))
+
+    assert db_session.query(User).count() == 0 and db_session.query(Games).count() == 0
+    assert get_leaderboard_version(db_session) != version
+    with pytest.raises(HTTPException):
+        security.validate_user(credentials)
+
+
+def test_deleted_user_is_rejected_once_the_entry_expires(db_session, session_counter, monkeypatch):
+    monkeypatch.setattr(security, "_verified_users", TTLCache(maxsize=10, ttl=0.05))
+    user = _add_user(db_session)
+    security.validate_user(_credentials(user.id))
+
+    db_session.delete(user)
+    db_session.commit()
+    # Still accepted until the TTL, the revocation bound, has passed
+    assert security.validate_user(_credentials(user.id)).id == user.id
+    time.sleep(0.06)
+    with pytest.raises(HTTPException):
+        security.validate_user(_credentials(user.id))
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.API.Routes.health_routes import router as health_router
+from src.Config import warmup
+from src.Config.scheduler import last_due_time
+from src.Config.warmup import Warmup, get_warmup_status, is_ready, mark_startup_complete, start_warmups, stop_warmups
+
+
+def test_warmups_run_in_order_and_gate_readiness(monkeypatch):
+    monkeypatch.setattr(warmup, "is_leader", lambda: False)
+    monkeypatch.setattr(warmup, "REQUIRED_RETRY_SECONDS", 0)
+    calls = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("database not reachable yet")
+        calls.append("flaky")
+
+    async def async_step():
+        calls.append("async")
+
+    async def main():
+        mark_startup_complete()
+        task = start_warmups([
+            Warmup("cache", flaky, required=True),
+            Warmup("jobs", async_step),
+            Warmup("seed", lambda: calls.append("seed"), leader_only=True),
+            Warmup("broken", lambda: 1 / 0),
+        ])
+        assert not is_ready()
+        await task
+        return is_ready()
+
+    assert asyncio.run(main())
+    # The required warm-up was retried until it succeeded, the others ran after it
+    assert calls == ["flaky", "async"]
+    status = get_warmup_status()
+    assert status["cache"]["state"] == "done"
+    assert status["seed"]["state"] == "skipped"
+    assert status["broken"]["state"] == "failed"
+    stop_warmups()
+    assert not is_ready()
+
+
+def test_health_probes():
+    app = FastAPI()
+    app.include_router(health_router, prefix="/health")
+    client = TestClient(app)
+
+    async def main():
+        mark_startup_complete()
+        await start_warmups([Warmup("cache", lambda: None, required=True)])
+
+    assert client.get("/health/live").status_code == 200
+    stop_warmups()
+    assert client.get("/health/ready").status_code == 503
+
+    asyncio.run(main())
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["warmups"]["cache"]["state"] == "done"
+    stop_warmups()
+
+
+def test_last_due_time():
+    now = datetime(2026, 3, 4, 12, 30, tzinfo=timezone.utc)  # A Wednesday
+    hourly = SimpleNamespace(trigger=CronTrigger(minute=10, timezone="UTC"))
+    weekly = SimpleNamespace(trigger=CronTrigger(day_of_week="mon", hour=1, minute=5, timezone="UTC"))
+    every_4h = SimpleNamespace(trigger=IntervalTrigger(hours=4, timezone="UTC"))
+
+    assert last_due_time(hourly, now) == datetime(2026, 3, 4, 12, 10, tzinfo=timezone.utc)
+    assert last_due_time(weekly, now) == datetime(2026, 3, 2, 1, 5, tzinfo=timezone.utc)
+    assert last_due_time(every_4h, now) == datetime(2026, 3, 4, 8, 30, tzinfo=timezone.utc)